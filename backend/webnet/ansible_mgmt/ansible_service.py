@@ -11,7 +11,7 @@ from pathlib import Path
 from typing import Any
 from urllib.parse import urlparse, urlunparse
 
-from webnet.devices.models import Device
+from webnet.devices.targeting import devices_by_ids, filter_devices
 
 logger = logging.getLogger(__name__)
 
@@ -118,25 +118,21 @@ def fetch_playbook_from_git(
 
 
 def generate_ansible_inventory(
-    filters: dict | None = None, customer_id: int | None = None
+    filters: dict | None = None,
+    customer_id: int | None = None,
+    device_ids: list[int] | None = None,
 ) -> dict[str, Any]:
     """Generate Ansible inventory from webnet devices.
 
     Returns inventory in JSON format compatible with Ansible.
-    Devices are grouped by site, role, and vendor.
+    Devices are grouped by site, role, and vendor. ``device_ids`` (a job's
+    resolved targets) takes precedence over ``filters``.
     """
-    qs = Device.objects.select_related("credential", "customer").filter(enabled=True)
-    if customer_id:
-        qs = qs.filter(customer_id=customer_id)
-    if filters:
-        if filters.get("device_ids"):
-            qs = qs.filter(id__in=filters["device_ids"])
-        if filters.get("vendor"):
-            qs = qs.filter(vendor=filters["vendor"])
-        if filters.get("site"):
-            qs = qs.filter(site=filters["site"])
-        if filters.get("role"):
-            qs = qs.filter(role=filters["role"])
+    if device_ids is not None:
+        qs = devices_by_ids(device_ids, customer_id)
+    else:
+        qs = filter_devices(filters, customer_id)
+    qs = qs.select_related("credential", "customer")
 
     inventory: dict[str, Any] = {
         "_meta": {"hostvars": {}},
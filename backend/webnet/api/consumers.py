@@ -21,7 +21,7 @@ class UpdatesConsumer(AsyncJsonWebsocketConsumer):
     {
         "type": "update",
         "entity": "job" | "device" | "config" | "compliance" | "topology",
-        "action": "created" | "updated" | "deleted",
+        "action": "created" | "updated" | "deleted" | "progress",
         "id": <entity_id>,
         "html": "<rendered partial html>" (optional, for HTMX swap)
     }
@@ -103,6 +103,11 @@ class JobLogConsumer(AsyncJsonWebsocketConsumer):
     async def job_log(self, event: dict[str, Any]):
         await self.send_json(event["data"])
 
+    async def job_log_batch(self, event: dict[str, Any]):
+        # Buffered job logs arrive as one channel message; clients still get one frame per entry
+        for entry in event["data"]:
+            await self.send_json(entry)
+
     async def _send_initial_logs(self):
         logs = await self._get_recent_logs(self.job_id, limit=200)
         for log in logs:
@@ -21,6 +21,7 @@ from webnet.devices.models import (
 )
 from webnet.jobs.models import Job, JobLog, Schedule
 from webnet.config_mgmt.models import ConfigSnapshot, ConfigTemplate, ConfigDrift, DriftAlert
+from webnet.compliance.engine import PolicyError, compile_policy
 from webnet.compliance.models import (
     CompliancePolicy,
     ComplianceResult,
@@ -301,6 +302,26 @@ class ConfigSnapshotSerializer(serializers.ModelSerializer):
         read_only_fields = ["hash", "created_at"]
 
 
+class ConfigSnapshotListSerializer(serializers.ModelSerializer):
+    """Snapshot metadata without the config body, so lists never decompress blobs."""
+
+    size = serializers.IntegerField(source="blob.size", read_only=True)
+
+    class Meta:
+        model = ConfigSnapshot
+        fields = [
+            "id",
+            "device",
+            "job",
+            "created_at",
+            "source",
+            "hash",
+            "size",
+            "custom_fields",
+        ]
+        read_only_fields = fields
+
+
 class ConfigDriftSerializer(serializers.ModelSerializer):
     device_hostname = serializers.CharField(source="device.hostname", read_only=True)
     change_magnitude = serializers.CharField(source="get_change_magnitude", read_only=True)
@@ -330,6 +351,7 @@ class ConfigDriftSerializer(serializers.ModelSerializer):
             "has_changes",
             "change_magnitude",
             "diff_summary",
+            "section_changes",
             "triggered_by",
             "triggered_by_username",
         ]
@@ -376,6 +398,13 @@ class CompliancePolicySerializer(serializers.ModelSerializer):
             "custom_fields",
         ]
 
+    def validate_definition_yaml(self, value):
+        try:
+            compile_policy(value)
+        except PolicyError as exc:
+            raise serializers.ValidationError(str(exc))
+        return value
+
 
 class ComplianceResultSerializer(serializers.ModelSerializer):
     class Meta:
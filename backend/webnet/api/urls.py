@@ -102,6 +102,7 @@ urlpatterns = [
     ),
     path("config/drift/detect", views.DriftViewSet.as_view({"post": "detect_drift"})),
     path("config/drift/analyze-device", views.DriftViewSet.as_view({"post": "analyze_device"})),
+    path("config/drift/analyze-fleet", views.DriftViewSet.as_view({"post": "analyze_fleet"})),
     path(
         "config/drift/device/<int:device_id>",
         views.DriftViewSet.as_view({"get": "device_drifts"}),
@@ -110,6 +111,11 @@ urlpatterns = [
         "config/drift/device/<int:device_id>/frequency",
         views.DriftViewSet.as_view({"get": "change_frequency"}),
     ),
+    path(
+        "config/drift/fleet/top-devices",
+        views.DriftViewSet.as_view({"get": "top_devices"}),
+    ),
+    path("config/drift/fleet/heatmap", views.DriftViewSet.as_view({"get": "heatmap"})),
     path("config/drift/<int:pk>", views.DriftViewSet.as_view({"get": "detail"})),
     path("devices/import", views.DeviceImportView.as_view()),
     path("devices/<int:pk>/jobs", views.DeviceViewSet.as_view({"get": "jobs"})),
@@ -3,7 +3,6 @@
 from __future__ import annotations
 
 import csv
-import difflib
 import hashlib
 import io
 import logging
@@ -14,6 +13,7 @@ from typing import Optional
 from django.contrib.auth import authenticate
 from django.db.models import Count
 from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
 from django.utils.text import slugify
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
@@ -45,6 +45,7 @@ from webnet.devices.models import (
 from webnet.jobs.models import Job, JobLog, Schedule
 from webnet.workflows.models import Workflow, WorkflowRun
 from webnet.jobs.services import JobService
+from webnet.config_mgmt import diff_cache
 from webnet.config_mgmt.models import ConfigSnapshot, ConfigTemplate, ConfigDrift, DriftAlert
 from webnet.compliance.models import (
     CompliancePolicy,
@@ -67,6 +68,7 @@ from .serializers import (
     JobSerializer,
     JobLogSerializer,
     ScheduleSerializer,
+    ConfigSnapshotListSerializer,
     ConfigSnapshotSerializer,
     ConfigDriftSerializer,
     DriftAlertSerializer,
@@ -343,10 +345,11 @@ class DeviceViewSet(CustomerScopedQuerysetMixin, viewsets.ModelViewSet):
         device = self.get_object()
         snaps = (
             ConfigSnapshot.objects.filter(device=device)
-            .select_related("device", "job")
+            .select_related("device", "job", "blob")
+            .defer("blob__data")
             .order_by("-created_at")
         )
-        return Response(ConfigSnapshotSerializer(snaps, many=True).data)
+        return Response(ConfigSnapshotListSerializer(snaps, many=True).data)
 
     @action(detail=True, methods=["get"])
     def topology(self, request, pk=None):  # pragma: no cover
@@ -657,13 +660,14 @@ class CommandViewSet(viewsets.ViewSet):
         commands = request.data.get("commands") or []
         targets = request.data.get("targets") or {}
         timeout = request.data.get("timeout") or 30
+        pipeline = request.data.get("pipeline", True) not in (False, "false", "0", 0)
         js = JobService()
         job = js.create_job(
             job_type="run_commands",
             user=request.user,
             customer=customer,
             target_summary={"filters": targets},
-            payload={"commands": commands, "timeout": timeout},
+            payload={"commands": commands, "timeout": timeout, "pipeline": pipeline},
         )
         return Response({"job_id": job.id, "status": job.status}, status=status.HTTP_202_ACCEPTED)
 
@@ -817,7 +821,7 @@ class ConfigViewSet(viewsets.ViewSet):
         return Response({"job_id": job.id, "status": job.status}, status=status.HTTP_202_ACCEPTED)
 
     def snapshot(self, request, pk=None):
-        snap = ConfigSnapshot.objects.select_related("device").filter(pk=pk).first()
+        snap = ConfigSnapshot.objects.select_related("device", "blob").filter(pk=pk).first()
         if not snap or not user_has_customer_access(request.user, snap.device.customer_id):
             return Response(status=status.HTTP_404_NOT_FOUND)
         return Response(ConfigSnapshotSerializer(snap).data)
@@ -826,8 +830,12 @@ class ConfigViewSet(viewsets.ViewSet):
         device = Device.objects.select_related("customer").filter(pk=device_id).first()
         if not device or not user_has_customer_access(request.user, device.customer_id):
             return Response(status=status.HTTP_404_NOT_FOUND)
-        snaps = ConfigSnapshot.objects.filter(device=device).select_related("device", "job")
-        return Response(ConfigSnapshotSerializer(snaps, many=True).data)
+        snaps = (
+            ConfigSnapshot.objects.filter(device=device)
+            .select_related("device", "job", "blob")
+            .defer("blob__data")
+        )
+        return Response(ConfigSnapshotListSerializer(snaps, many=True).data)
 
     def diff(self, request, device_id=None):
         from_id = request.query_params.get("from")
@@ -840,23 +848,36 @@ class ConfigViewSet(viewsets.ViewSet):
         if not device or not user_has_customer_access(request.user, device.customer_id):
             return Response(status=status.HTTP_404_NOT_FOUND)
         try:
-            snap_from = ConfigSnapshot.objects.select_related("device").get(
+            snap_from = ConfigSnapshot.objects.select_related("device", "blob").get(
                 pk=from_id, device=device
             )
-            snap_to = ConfigSnapshot.objects.select_related("device").get(pk=to_id, device=device)
+            snap_to = ConfigSnapshot.objects.select_related("device", "blob").get(
+                pk=to_id, device=device
+            )
         except ConfigSnapshot.DoesNotExist:
             return Response(
                 {"detail": "snapshot not found for device"}, status=status.HTTP_404_NOT_FOUND
             )
-        diff_lines = difflib.unified_diff(
-            snap_from.config_text.splitlines(),
-            snap_to.config_text.splitlines(),
-            fromfile=f"snapshot-{snap_from.id}",
-            tofile=f"snapshot-{snap_to.id}",
-            lineterm="",
-        )
-        diff_text = "\n".join(diff_lines)
-        return Response({"from": snap_from.id, "to": snap_to.id, "diff": diff_text})
+        try:
+            context = int(request.query_params.get("context", diff_cache.DEFAULT_CONTEXT))
+        except ValueError:
+            return Response(
+                {"detail": "context must be an integer"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        context = min(max(context, 0), diff_cache.MAX_CONTEXT)
+
+        # The ETag comes from the two config hashes, so a repeat view is answered
+        # without loading or diffing either config
+        mode = diff_cache.diff_mode(context=context)
+        etag = diff_cache.diff_etag(snap_from, snap_to, mode, request.accepted_renderer.format)
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+        diff = diff_cache.unified_diff(snap_from, snap_to, context=context)
+        response = Response({"from": snap_from.id, "to": snap_to.id, "diff": diff})
+        response["ETag"] = etag
+        patch_cache_control(response, private=True)
+        return response
 
 
 class DriftViewSet(viewsets.ViewSet):
@@ -921,6 +942,24 @@ class DriftViewSet(viewsets.ViewSet):
             }
         )
 
+    @action(detail=False, methods=["post"], url_path="analyze-fleet")
+    def analyze_fleet(self, request):
+        """Queue background drift analysis for all of a customer's devices."""
+        customer = resolve_customer_for_request(request)
+        if not customer:
+            return Response(
+                {"detail": "customer_id required or no access"}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        from webnet.jobs.tasks import drift_analysis_job
+
+        drift_analysis_job.delay(customer.id, request.user.id)
+
+        return Response(
+            {"detail": "Drift analysis queued", "customer_id": customer.id},
+            status=status.HTTP_202_ACCEPTED,
+        )
+
     @action(detail=False, methods=["get"], url_path="device/(?P<device_id>[^/.]+)")
     def device_drifts(self, request, device_id=None):
         """Get drift timeline for a device."""
@@ -951,6 +990,50 @@ class DriftViewSet(viewsets.ViewSet):
 
         return Response(stats)
 
+    @action(detail=False, methods=["get"], url_path="fleet/top-devices")
+    def top_devices(self, request):
+        """Get the devices with the most changed config lines."""
+        customer = resolve_customer_for_request(request)
+        if not customer:
+            return Response(
+                {"detail": "customer_id required or no access"}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            days = int(request.query_params.get("days", 30))
+            limit = int(request.query_params.get("limit", 10))
+        except ValueError:
+            return Response(
+                {"detail": "days and limit must be integers"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        days = min(max(days, 1), 366)
+        limit = min(max(limit, 1), 100)
+        from webnet.config_mgmt.drift_service import DriftService
+
+        ds = DriftService()
+        return Response(ds.top_churning_devices(customer.id, days, limit))
+
+    @action(detail=False, methods=["get"], url_path="fleet/heatmap")
+    def heatmap(self, request):
+        """Get changed config lines per site per day."""
+        customer = resolve_customer_for_request(request)
+        if not customer:
+            return Response(
+                {"detail": "customer_id required or no access"}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            days = int(request.query_params.get("days", 30))
+        except ValueError:
+            return Response(
+                {"detail": "days must be an integer"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        days = min(max(days, 1), 366)
+        from webnet.config_mgmt.drift_service import DriftService
+
+        ds = DriftService()
+        return Response(ds.churn_heatmap(customer.id, days))
+
     @action(detail=True, methods=["get"])
     def detail(self, request, pk=None):
         """Get drift details."""
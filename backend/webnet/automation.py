@@ -2,7 +2,8 @@
 
 from __future__ import annotations
 
-from typing import Dict
+import threading
+from typing import Any, Dict
 
 
 try:  # pragma: no cover - optional dependency for tests
@@ -58,40 +59,133 @@ except ImportError:  # pragma: no cover - lightweight fallback for tests
             self.defaults = defaults or {}
 
 
-from webnet.devices.models import Device
+from webnet.core.crypto import decrypt_text
+from webnet.devices.models import Credential
+from webnet.devices.targeting import devices_by_ids, filter_devices
 
+# Connection options are identical for every host, so all hosts share one instance
+NETMIKO_OPTIONS = ConnectionOptions(extras={"fast_cli": True})
+NAPALM_OPTIONS = ConnectionOptions(extras={"optional_args": {"timeout": 30}})
 
-def build_inventory(filters: dict | None = None, customer_id: int | None = None) -> Inventory:
-    qs = Device.objects.select_related("credential", "customer").filter(enabled=True)
-    if customer_id:
-        qs = qs.filter(customer_id=customer_id)
-    if filters:
-        if filters.get("device_ids"):
-            qs = qs.filter(id__in=filters["device_ids"])
-        if filters.get("vendor"):
-            qs = qs.filter(vendor=filters["vendor"])
-        if filters.get("site"):
-            qs = qs.filter(site=filters["site"])
+_DEVICE_FIELDS = (
+    "id",
+    "hostname",
+    "mgmt_ip",
+    "platform",
+    "role",
+    "site",
+    "vendor",
+    "customer_id",
+    "credential_id",
+    "updated_at",
+)
+
+
+class InventoryCache:
+    """Per-process cache of decrypted credentials and per-device host specs.
+
+    Credentials are keyed by id and stored ciphertext, so a changed password
+    is picked up even when the invalidating signal fired in another process.
+    Host specs are keyed by device id and ``updated_at``. ``Host`` objects
+    themselves are built per inventory because they carry a run's live
+    connections.
+    """
+
+    def __init__(self) -> None:
+        self._credentials: dict[int, tuple[str, str, str]] = {}
+        self._hosts: dict[int, tuple[tuple, dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def credentials(self, credential_ids: set[int]) -> dict[int, tuple[str, str]]:
+        """Return ``{id: (username, password)}``, decrypting each changed secret once."""
+        rows = Credential.objects.filter(id__in=credential_ids).values_list(
+            "id", "username", "_password"
+        )
+        resolved: dict[int, tuple[str, str]] = {}
+        for cred_id, username, ciphertext in rows:
+            cached = self._credentials.get(cred_id)
+            if cached is None or cached[0] != ciphertext:
+                cached = (ciphertext, username, decrypt_text(ciphertext) or "")
+                with self._lock:
+                    self._credentials[cred_id] = cached
+            resolved[cred_id] = (username, cached[2])
+        return resolved
+
+    def host_spec(self, row: dict[str, Any], username: str, password: str) -> dict[str, Any]:
+        stamp = (row["updated_at"], row["credential_id"], username, password)
+        cached = self._hosts.get(row["id"])
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        spec = {
+            "name": row["hostname"],
+            "hostname": row["mgmt_ip"],
+            "platform": row["platform"],
+            "username": username,
+            "password": password,
+            "extras": {
+                "customer_id": row["customer_id"],
+                "device_id": row["id"],
+                "credential_id": row["credential_id"],
+                "role": row["role"],
+                "site": row["site"],
+                "vendor": row["vendor"],
+            },
+        }
+        with self._lock:
+            self._hosts[row["id"]] = (stamp, spec)
+        return spec
+
+    def invalidate_device(self, device_id: int) -> None:
+        with self._lock:
+            self._hosts.pop(device_id, None)
+
+    def invalidate_credential(self, credential_id: int) -> None:
+        with self._lock:
+            self._credentials.pop(credential_id, None)
+            for device_id in [
+                device_id
+                for device_id, (stamp, _) in self._hosts.items()
+                if stamp[1] == credential_id
+            ]:
+                del self._hosts[device_id]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._credentials.clear()
+            self._hosts.clear()
+
+
+inventory_cache = InventoryCache()
+
+
+def build_inventory(
+    filters: dict | None = None,
+    customer_id: int | None = None,
+    device_ids: list[int] | None = None,
+) -> Inventory:
+    """Build a Nornir inventory for the devices matching ``filters``.
+
+    When ``device_ids`` is given (e.g. a job's resolved targets) it is used
+    as-is instead of evaluating ``filters`` again.
+    """
+    if device_ids is not None:
+        qs = devices_by_ids(device_ids, customer_id)
+    else:
+        qs = filter_devices(filters, customer_id)
+    rows = list(qs.values(*_DEVICE_FIELDS))
+    credentials = inventory_cache.credentials({row["credential_id"] for row in rows})
     hosts: Dict[str, Host] = {}
-    for dev in qs:
-        cred = dev.credential
-        hosts[dev.hostname] = Host(
-            name=dev.hostname,
-            hostname=dev.mgmt_ip,
-            platform=dev.platform,
+    for row in rows:
+        username, password = credentials[row["credential_id"]]
+        spec = inventory_cache.host_spec(row, username, password)
+        hosts[spec["name"]] = Host(
+            name=spec["name"],
+            hostname=spec["hostname"],
+            platform=spec["platform"],
             groups=set(),
-            username=cred.username,
-            password=cred.password or "",
-            extras={
-                "customer_id": dev.customer_id,
-                "device_id": dev.id,
-                "role": dev.role,
-                "site": dev.site,
-                "vendor": dev.vendor,
-            },
-            connection_options={
-                "netmiko": ConnectionOptions(extras={"fast_cli": True}),
-                "napalm": ConnectionOptions(extras={"optional_args": {"timeout": 30}}),
-            },
+            username=spec["username"],
+            password=spec["password"],
+            extras=dict(spec["extras"]),
+            connection_options={"netmiko": NETMIKO_OPTIONS, "napalm": NAPALM_OPTIONS},
         )
     return Inventory(Hosts(hosts), Groups({}), Defaults())
@@ -5,7 +5,7 @@ from __future__ import annotations
 import logging
 from typing import Any
 
-from django.db.models import Q
+from django.db.models import OuterRef, Q, Subquery
 
 from webnet.chatops.models import SlackWorkspace, ChatOpsCommand
 from webnet.chatops.slack_service import SlackService
@@ -239,10 +239,27 @@ class SearchCommandHandler(CommandHandler):
             # Import here to avoid circular dependency
             from webnet.config_mgmt.models import ConfigSnapshot
 
-            # Search in config snapshots
-            snapshots = ConfigSnapshot.objects.filter(
-                device__customer=self.workspace.customer, content__icontains=query
-            ).select_related("device")[:5]
+            # Config bodies are stored compressed, so match the latest snapshot
+            # of each device in Python rather than with a SQL LIKE
+            latest_ids = (
+                ConfigSnapshot.objects.filter(device=OuterRef("device"))
+                .order_by("-created_at")
+                .values("id")[:1]
+            )
+            candidates = (
+                ConfigSnapshot.objects.filter(
+                    device__customer=self.workspace.customer, id=Subquery(latest_ids)
+                )
+                .select_related("device", "blob")
+                .order_by("device__hostname")
+            )
+            needle = query.lower()
+            snapshots = []
+            for snapshot in candidates.iterator(chunk_size=50):
+                if needle in snapshot.config_text.lower():
+                    snapshots.append(snapshot)
+                    if len(snapshots) == 5:
+                        break
 
             if not snapshots:
                 self.log_command(f"search {query}", "success", "No results found")
@@ -392,6 +392,65 @@ def notify_compliance_violation(compliance_result) -> None:
         logger.error(f"Failed to send compliance violation notification: {e}")
 
 
+def notify_compliance_violation_digest(digest) -> None:
+    """Send one message summarising a policy's violations to configured Slack channels.
+
+    ``digest`` is a ``webnet.compliance.violations.ViolationDigest``.
+    """
+    try:
+        channels = list(
+            SlackChannel.objects.filter(
+                workspace__customer=digest.policy.customer,
+                workspace__enabled=True,
+                notify_compliance_violations=True,
+            ).select_related("workspace")
+        )
+        if not channels:
+            return
+
+        devices_text = ", ".join(digest.hostnames())
+        if digest.unlisted:
+            devices_text += f" and {digest.unlisted} more"
+        blocks = [
+            {
+                "type": "header",
+                "text": {
+                    "type": "plain_text",
+                    "text": ":warning: Compliance Violations Detected",
+                },
+            },
+            {
+                "type": "section",
+                "fields": [
+                    {"type": "mrkdwn", "text": f"*Policy:*\n{digest.policy.name}"},
+                    {"type": "mrkdwn", "text": f"*Devices:*\n{digest.count}"},
+                ],
+            },
+            {
+                "type": "section",
+                "text": {"type": "mrkdwn", "text": f"*Affected devices:*\n{devices_text}"},
+            },
+        ]
+        top_rules = digest.top_rules()
+        if top_rules:
+            rules_text = "\n".join(f"• {rule}: {count}" for rule, count in top_rules)
+            blocks.append(
+                {
+                    "type": "section",
+                    "text": {"type": "mrkdwn", "text": f"*Failing rules:*\n{rules_text}"},
+                }
+            )
+
+        text = f"Compliance violations: {digest.summary()}"
+        for channel in channels:
+            slack_service = SlackService(channel.workspace)
+            slack_service.send_message(channel.channel_id, text, blocks)
+            logger.info(f"Sent compliance violation digest to {channel.channel_name}")
+
+    except Exception as e:
+        logger.error(f"Failed to send compliance violation digest: {e}")
+
+
 def notify_drift_detected(drift) -> None:
     """Send configuration drift notification to configured Slack channels."""
     try:
@@ -483,3 +542,56 @@ def notify_drift_detected(drift) -> None:
 
     except Exception as e:
         logger.error(f"Failed to send drift notification: {e}")
+
+
+def notify_drift_digest(digest) -> None:
+    """Send one message summarising a backup's config drift to configured Slack channels.
+
+    ``digest`` is a ``webnet.config_mgmt.drift_service.DriftDigest``.
+    """
+    try:
+        channels = list(
+            SlackChannel.objects.filter(
+                workspace__customer_id=digest.customer_id,
+                workspace__enabled=True,
+                notify_drift_detected=True,
+            ).select_related("workspace")
+        )
+        if not channels:
+            return
+
+        devices_text = ", ".join(digest.hostnames())
+        if digest.unlisted:
+            devices_text += f" and {digest.unlisted} more"
+        blocks = [
+            {
+                "type": "header",
+                "text": {
+                    "type": "plain_text",
+                    "text": ":warning: Configuration Drift Detected",
+                },
+            },
+            {
+                "type": "section",
+                "fields": [
+                    {"type": "mrkdwn", "text": f"*Devices:*\n{digest.count}"},
+                    {
+                        "type": "mrkdwn",
+                        "text": f"*Changes:*\n+{digest.additions} / -{digest.deletions}",
+                    },
+                ],
+            },
+            {
+                "type": "section",
+                "text": {"type": "mrkdwn", "text": f"*Affected devices:*\n{devices_text}"},
+            },
+        ]
+
+        text = f"Configuration drift: {digest.summary()}"
+        for channel in channels:
+            slack_service = SlackService(channel.workspace)
+            slack_service.send_message(channel.channel_id, text, blocks)
+            logger.info(f"Sent drift digest to {channel.channel_name}")
+
+    except Exception as e:
+        logger.error(f"Failed to send drift digest: {e}")
@@ -355,6 +355,78 @@ def notify_compliance_violation_teams(compliance_result) -> None:
         logger.error(f"Failed to send Teams compliance violation notification: {e}")
 
 
+def notify_compliance_violation_digest_teams(digest) -> None:
+    """Send one card summarising a policy's violations to configured Teams channels.
+
+    ``digest`` is a ``webnet.compliance.violations.ViolationDigest``.
+    """
+    try:
+        channels = list(
+            TeamsChannel.objects.filter(
+                workspace__customer=digest.policy.customer,
+                workspace__enabled=True,
+                notify_compliance_violations=True,
+            ).select_related("workspace")
+        )
+        if not channels:
+            return
+
+        devices_text = ", ".join(digest.hostnames())
+        if digest.unlisted:
+            devices_text += f" and {digest.unlisted} more"
+        body_items = [
+            {
+                "type": "TextBlock",
+                "text": "⚠️ Compliance Violations Detected",
+                "size": "Large",
+                "weight": "Bolder",
+                "color": "Warning",
+            },
+            {
+                "type": "FactSet",
+                "facts": [
+                    {"title": "Policy", "value": digest.policy.name},
+                    {"title": "Devices", "value": str(digest.count)},
+                    {"title": "Affected", "value": devices_text},
+                ],
+            },
+        ]
+        top_rules = digest.top_rules()
+        if top_rules:
+            body_items.append(
+                {
+                    "type": "FactSet",
+                    "facts": [{"title": rule, "value": str(count)} for rule, count in top_rules],
+                }
+            )
+
+        card = {
+            "type": "message",
+            "attachments": [
+                {
+                    "contentType": "application/vnd.microsoft.card.adaptive",
+                    "content": {
+                        "$schema": "http://adaptivecards.io/schemas/adaptive-card.json",
+                        "type": "AdaptiveCard",
+                        "version": "1.2",
+                        "body": body_items,
+                    },
+                }
+            ],
+        }
+
+        for channel in channels:
+            if channel.webhook_url:
+                teams_service = TeamsService(channel.workspace)
+                teams_service.send_message_via_webhook(channel.webhook_url, card)
+                logger.info(
+                    f"Sent compliance violation digest to Teams channel {channel.channel_name}"
+                )
+
+    except Exception as e:
+        logger.error(f"Failed to send Teams compliance violation digest: {e}")
+
+
 def notify_drift_detected_teams(drift) -> None:
     """Send configuration drift notification to configured Teams channels."""
     try:
@@ -439,3 +511,65 @@ def notify_drift_detected_teams(drift) -> None:
 
     except Exception as e:
         logger.error(f"Failed to send Teams drift notification: {e}")
+
+
+def notify_drift_digest_teams(digest) -> None:
+    """Send one card summarising a backup's config drift to configured Teams channels.
+
+    ``digest`` is a ``webnet.config_mgmt.drift_service.DriftDigest``.
+    """
+    try:
+        channels = list(
+            TeamsChannel.objects.filter(
+                workspace__customer_id=digest.customer_id,
+                workspace__enabled=True,
+                notify_drift_detected=True,
+            ).select_related("workspace")
+        )
+        if not channels:
+            return
+
+        devices_text = ", ".join(digest.hostnames())
+        if digest.unlisted:
+            devices_text += f" and {digest.unlisted} more"
+        card = {
+            "type": "message",
+            "attachments": [
+                {
+                    "contentType": "application/vnd.microsoft.card.adaptive",
+                    "content": {
+                        "$schema": "http://adaptivecards.io/schemas/adaptive-card.json",
+                        "type": "AdaptiveCard",
+                        "version": "1.2",
+                        "body": [
+                            {
+                                "type": "TextBlock",
+                                "text": "⚠️ Configuration Drift Detected",
+                                "size": "Large",
+                                "weight": "Bolder",
+                            },
+                            {
+                                "type": "FactSet",
+                                "facts": [
+                                    {"title": "Devices", "value": str(digest.count)},
+                                    {
+                                        "title": "Changes",
+                                        "value": f"+{digest.additions} / -{digest.deletions}",
+                                    },
+                                    {"title": "Affected", "value": devices_text},
+                                ],
+                            },
+                        ],
+                    },
+                }
+            ],
+        }
+
+        for channel in channels:
+            if channel.webhook_url:
+                teams_service = TeamsService(channel.workspace)
+                teams_service.send_message_via_webhook(channel.webhook_url, card)
+                logger.info(f"Sent drift digest to Teams channel {channel.channel_name}")
+
+    except Exception as e:
+        logger.error(f"Failed to send Teams drift digest: {e}")
@@ -5,3 +5,6 @@ class ComplianceConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "webnet.compliance"
     verbose_name = "Compliance"
+
+    def ready(self):
+        import webnet.compliance.signals  # noqa: F401
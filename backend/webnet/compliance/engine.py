@@ -0,0 +1,257 @@
+"""Compiled compliance rules evaluated against stored config text.
+
+A policy definition is YAML with a ``rules`` list::
+
+    rules:
+      - name: ntp-configured
+        match: '^ntp server \\S+'
+      - name: vty-ssh-only
+        section: '^line vty'
+        match: '^transport input ssh$'
+        not_match: telnet
+        severity: high
+      - name: interfaces-described
+        section: '^interface (Gig|Ten)'
+        match: '^description '
+        require_section: true
+
+Every ``match`` pattern (a string or a list) must find a line and no
+``not_match`` pattern may. Without ``section`` the patterns run over the
+whole config with ``re.MULTILINE``, so nested lines keep their indentation.
+With ``section`` they run over the dedented lines nested under each
+top-level section whose header matches, and every such section must pass.
+A rule whose section is absent passes unless ``require_section`` is set.
+``ignore_case: true`` makes a rule's patterns case-insensitive.
+
+A definition is compiled once into a ``CompiledPolicy``. Evaluation needs
+nothing but config text, so this module does not import Django and large
+runs can be spread over worker processes with ``evaluate_many``.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import re
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from functools import lru_cache
+from multiprocessing.context import BaseContext
+from typing import Any, Iterable, Iterator
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+SEVERITIES = ("low", "medium", "high", "critical")
+DEFAULT_SEVERITY = "medium"
+
+# Offending lines or sections reported per failed rule
+MAX_FINDINGS = 5
+
+# Top-level lines start sections; comments and closing braces stay with the section above
+_SECTION_SPLIT = re.compile(r"\n(?=[^\s!#}])")
+_INDENT = re.compile(r"^[ \t]+", re.MULTILINE)
+
+# One device's evaluation: (device_id, passed, per-rule results)
+Evaluation = tuple[int, bool, list[dict[str, Any]]]
+
+
+class PolicyError(ValueError):
+    """Raised when a policy definition cannot be compiled."""
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    name: str
+    severity: str
+    match: tuple[re.Pattern, ...]
+    not_match: tuple[re.Pattern, ...]
+    section: re.Pattern | None = None
+    require_section: bool = False
+
+    def evaluate(self, text: str, sections: list[tuple[str, str]] | None) -> dict[str, Any]:
+        if self.section is None:
+            findings = self._check(text)
+        else:
+            findings = []
+            matched = False
+            for header, body in sections or ():
+                if not self.section.search(header):
+                    continue
+                matched = True
+                problems = self._check(dedent(body))
+                if problems:
+                    findings.extend(f"{header}: {problem}" for problem in problems)
+                    if len(findings) >= MAX_FINDINGS:
+                        break
+            if not matched and self.require_section:
+                findings.append(f"no section matching {self.section.pattern!r}")
+        result: dict[str, Any] = {"rule": self.name, "severity": self.severity}
+        result["passed"] = not findings
+        if findings:
+            result["findings"] = findings[:MAX_FINDINGS]
+        return result
+
+    def _check(self, text: str) -> list[str]:
+        problems = []
+        for pattern in self.match:
+            if not pattern.search(text):
+                problems.append(f"missing {pattern.pattern!r}")
+        for pattern in self.not_match:
+            found = pattern.search(text)
+            if found:
+                problems.append(f"forbidden {_line_at(text, found.start())!r}")
+        return problems
+
+
+@dataclass(frozen=True)
+class CompiledPolicy:
+    rules: tuple[CompiledRule, ...]
+
+    @property
+    def needs_sections(self) -> bool:
+        return any(rule.section is not None for rule in self.rules)
+
+    def evaluate(self, text: str) -> tuple[bool, list[dict[str, Any]]]:
+        """Return ``(passed, rule_results)`` for one config."""
+        sections = split_sections(text) if self.needs_sections else None
+        results = [rule.evaluate(text, sections) for rule in self.rules]
+        return all(result["passed"] for result in results), results
+
+
+def _line_at(text: str, pos: int) -> str:
+    start = text.rfind("\n", 0, pos) + 1
+    end = text.find("\n", pos)
+    return text[start : end if end != -1 else len(text)].strip()
+
+
+def split_sections(text: str) -> list[tuple[str, str]]:
+    """Split a config into ``(header, body)`` for every top-level line.
+
+    Bodies keep their indentation; ``dedent`` them before matching.
+    """
+    sections = []
+    for chunk in _SECTION_SPLIT.split(text.replace("\r\n", "\n")):
+        header, _, body = chunk.partition("\n")
+        header = header.strip()
+        if header and header[0] not in "!#}":
+            sections.append((header, body))
+    return sections
+
+
+def dedent(body: str) -> str:
+    return _INDENT.sub("", body)
+
+
+def _patterns(value: Any, flags: int, where: str) -> tuple[re.Pattern, ...]:
+    if value is None:
+        return ()
+    values = value if isinstance(value, list) else [value]
+    compiled = []
+    for pattern in values:
+        if not isinstance(pattern, str):
+            raise PolicyError(f"{where}: patterns must be strings")
+        try:
+            compiled.append(re.compile(pattern, flags))
+        except re.error as exc:
+            raise PolicyError(f"{where}: invalid pattern {pattern!r}: {exc}") from exc
+    return tuple(compiled)
+
+
+def _compile_rule(index: int, spec: Any) -> CompiledRule:
+    if not isinstance(spec, dict):
+        raise PolicyError(f"rule {index}: expected a mapping")
+    name = str(spec.get("name") or f"rule-{index}")
+    flags = re.MULTILINE | (re.IGNORECASE if spec.get("ignore_case") else 0)
+    match = _patterns(spec.get("match"), flags, name)
+    not_match = _patterns(spec.get("not_match"), flags, name)
+    if not match and not not_match:
+        raise PolicyError(f"{name}: needs 'match' or 'not_match'")
+    section = _patterns(spec.get("section"), flags, name)
+    if len(section) > 1:
+        raise PolicyError(f"{name}: 'section' takes a single pattern")
+    severity = str(spec.get("severity") or DEFAULT_SEVERITY).lower()
+    if severity not in SEVERITIES:
+        raise PolicyError(f"{name}: unknown severity {severity!r}")
+    return CompiledRule(
+        name=name,
+        severity=severity,
+        match=match,
+        not_match=not_match,
+        section=section[0] if section else None,
+        require_section=bool(spec.get("require_section")),
+    )
+
+
+@lru_cache(maxsize=64)
+def compile_policy(definition: str) -> CompiledPolicy:
+    """Parse and compile a policy definition (cached per process)."""
+    try:
+        data = yaml.safe_load(definition or "") or {}
+    except yaml.YAMLError as exc:
+        raise PolicyError(f"invalid YAML: {exc}") from exc
+    if not isinstance(data, dict) or not isinstance(data.get("rules", []), list):
+        raise PolicyError("definition must be a mapping with a 'rules' list")
+    return CompiledPolicy(
+        tuple(_compile_rule(i, spec) for i, spec in enumerate(data.get("rules") or [], 1))
+    )
+
+
+def evaluate_chunk(definition: str, configs: list[tuple[int, str]]) -> list[Evaluation]:
+    """Evaluate ``(device_id, config_text)`` pairs; runs inside pool workers."""
+    policy = compile_policy(definition)
+    return [(device_id, *policy.evaluate(text)) for device_id, text in configs]
+
+
+def _pool_context() -> BaseContext:
+    # Workers only need this module; forkserver keeps them from inheriting the
+    # caller's database connections and threads
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+def _next_result(futures: deque[Future[list[Evaluation]]], pending: deque) -> list[Evaluation]:
+    # A chunk leaves ``pending`` only once its result is in hand
+    result = futures[0].result()
+    futures.popleft()
+    pending.popleft()
+    return result
+
+
+def evaluate_many(
+    definition: str,
+    chunks: Iterable[list[tuple[int, str]]],
+    workers: int = 1,
+) -> Iterator[list[Evaluation]]:
+    """Evaluate chunks of configs, in ``workers`` processes when more than one.
+
+    Chunks are consumed lazily, at most two per worker in flight, and results
+    are yielded per chunk in order. If the process pool cannot be started or
+    breaks (e.g. inside a daemonic worker), the pending and remaining chunks
+    are evaluated in this process.
+    """
+    compile_policy(definition)  # fail fast on a bad definition
+    chunks = iter(chunks)
+    pending: deque[list[tuple[int, str]]] = deque()
+    if workers > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context()) as pool:
+                futures: deque[Future[list[Evaluation]]] = deque()
+                for chunk in chunks:
+                    pending.append(chunk)
+                    futures.append(pool.submit(evaluate_chunk, definition, chunk))
+                    if len(futures) < workers * 2:
+                        continue
+                    yield _next_result(futures, pending)
+                while futures:
+                    yield _next_result(futures, pending)
+        except (AssertionError, BrokenProcessPool, OSError) as exc:
+            logger.warning("Compliance process pool unavailable, evaluating serially: %s", exc)
+    for chunk in pending:
+        yield evaluate_chunk(definition, chunk)
+    for chunk in chunks:
+        yield evaluate_chunk(definition, chunk)
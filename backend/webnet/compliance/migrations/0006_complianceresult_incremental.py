@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-17 09:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("compliance", "0005_merge_20251202_1458"),
+        ("jobs", "0008_job_target_device_ids"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="complianceresult",
+            name="job",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="compliance_results",
+                to="jobs.job",
+            ),
+        ),
+        migrations.AddField(
+            model_name="complianceresult",
+            name="config_hash",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+        migrations.AddField(
+            model_name="complianceresult",
+            name="definition_hash",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name="complianceresult",
+            index=models.Index(
+                fields=["policy", "device", "-ts"], name="compliance__policy__6de976_idx"
+            ),
+        ),
+    ]
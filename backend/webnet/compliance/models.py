@@ -1,3 +1,5 @@
+import hashlib
+
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
 from webnet.core.custom_fields import CustomFieldMixin
@@ -24,22 +26,38 @@ class CompliancePolicy(CustomFieldMixin, models.Model):
     def __str__(self) -> str:  # pragma: no cover
         return self.name
 
+    @property
+    def definition_hash(self) -> str:
+        """Identifies the rule set; results are reused only while it is unchanged."""
+        return hashlib.sha256((self.definition_yaml or "").encode()).hexdigest()
+
 
 class ComplianceResult(models.Model):
     policy = models.ForeignKey(CompliancePolicy, on_delete=models.CASCADE, related_name="results")
     device = models.ForeignKey(
         "devices.Device", on_delete=models.CASCADE, related_name="compliance_results"
     )
-    job = models.ForeignKey("jobs.Job", on_delete=models.CASCADE, related_name="compliance_results")
+    # Null for results recorded when a new snapshot was evaluated outside a job
+    job = models.ForeignKey(
+        "jobs.Job",
+        on_delete=models.CASCADE,
+        related_name="compliance_results",
+        null=True,
+        blank=True,
+    )
     ts = models.DateTimeField(auto_now_add=True)
     status = models.CharField(max_length=20)
     details_json = models.JSONField()
+    # The evaluated config and rule set; a device whose latest result matches both is skipped
+    config_hash = models.CharField(max_length=64, blank=True, default="")
+    definition_hash = models.CharField(max_length=64, blank=True, default="")
 
     class Meta:
         indexes = [
             models.Index(fields=["policy"]),
             models.Index(fields=["device"]),
             models.Index(fields=["ts"]),
+            models.Index(fields=["policy", "device", "-ts"]),
         ]
         ordering = ["-ts"]
 
@@ -0,0 +1,239 @@
+"""Compliance policy runs against stored config snapshots.
+
+A run evaluates a policy's compiled rules against the latest
+``ConfigSnapshot`` of every target device; no device is contacted. Devices
+are processed in chunks of ``COMPLIANCE_CHUNK_SIZE``: each chunk's latest
+snapshots and config texts are loaded with a fixed number of queries, the
+chunk is evaluated (in a process pool for large runs, see
+``engine.evaluate_many``) and its results are written with one
+``bulk_create``.
+
+Runs are incremental. A result records the config hash and policy
+definition hash it was computed from, and a device whose latest result
+matches its current pair is skipped: its previous result stays current and
+no config text is loaded for it. Re-running a policy therefore costs in
+proportion to the devices whose config (or the policy) changed.
+``evaluate_devices`` re-checks a batch of devices against the policies whose
+scope includes them, running each policy once for the whole batch; it runs
+for every snapshot stored outside a job and once per backup job for the
+devices whose config changed. ``verify_config``
+checks a config text directly, e.g. to verify a remediation from its
+after-snapshot without another device login.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Iterable, Iterator
+
+from django.conf import settings
+from django.db.models import OuterRef, Subquery
+
+from webnet.compliance.engine import PolicyError, compile_policy, evaluate_many
+from webnet.compliance.models import CompliancePolicy, ComplianceResult
+from webnet.config_mgmt.models import ConfigBlob, ConfigSnapshot
+from webnet.devices.models import Device
+from webnet.devices.targeting import filter_devices
+
+if TYPE_CHECKING:
+    from webnet.jobs.models import Job
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PolicyRun:
+    """Outcome of one policy run."""
+
+    passed: int = 0
+    failed: int = 0
+    unchanged: int = 0
+    no_config: list[int] = field(default_factory=list)
+    failed_ids: list[int] = field(default_factory=list)
+
+    @property
+    def evaluated(self) -> int:
+        return self.passed + self.failed
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "evaluated": self.evaluated,
+            "passed": self.passed,
+            "failed": self.failed,
+            "unchanged": self.unchanged,
+            "no_config": len(self.no_config),
+        }
+
+
+def _latest_snapshots(
+    device_ids: list[int], policy: CompliancePolicy
+) -> dict[int, tuple[int, str, str, str]]:
+    """Return ``{device_id: (snapshot_id, config_hash, result_config, result_definition)}``.
+
+    Only devices with a snapshot are included. The last two items are the
+    hashes recorded on the device's latest result for ``policy`` (``None``
+    without one).
+    """
+    latest = ConfigSnapshot.objects.filter(device=OuterRef("pk")).order_by("-created_at", "-id")
+    previous = ComplianceResult.objects.filter(policy=policy, device=OuterRef("pk")).order_by(
+        "-ts", "-id"
+    )
+    rows = (
+        Device.objects.filter(id__in=device_ids)
+        .annotate(
+            snapshot_id=Subquery(latest.values("id")[:1]),
+            config_hash=Subquery(latest.values("blob_id")[:1]),
+            result_config=Subquery(previous.values("config_hash")[:1]),
+            result_definition=Subquery(previous.values("definition_hash")[:1]),
+        )
+        .values_list("id", "snapshot_id", "config_hash", "result_config", "result_definition")
+    )
+    return {row[0]: row[1:] for row in rows if row[2]}
+
+
+def _pool_size(device_count: int, chunk_size: int) -> int:
+    if device_count < getattr(settings, "COMPLIANCE_PARALLEL_MIN_DEVICES", 500):
+        return 1
+    workers = getattr(settings, "COMPLIANCE_WORKERS", 0) or os.cpu_count() or 1
+    return max(1, min(workers, -(-device_count // chunk_size)))
+
+
+def _stale_devices(
+    policy: CompliancePolicy, device_ids: list[int], chunk_size: int, full: bool, run: PolicyRun
+) -> list[tuple[int, int, str]]:
+    """Return ``(device_id, snapshot_id, config_hash)`` for devices needing evaluation."""
+    definition_hash = policy.definition_hash
+    stale = []
+    for start in range(0, len(device_ids), chunk_size):
+        batch = device_ids[start : start + chunk_size]
+        latest = _latest_snapshots(batch, policy)
+        run.no_config.extend(device_id for device_id in batch if device_id not in latest)
+        for device_id, (snapshot_id, digest, result_config, result_definition) in latest.items():
+            if not full and (result_config, result_definition) == (digest, definition_hash):
+                run.unchanged += 1
+            else:
+                stale.append((device_id, snapshot_id, digest))
+    return stale
+
+
+def run_policy(
+    policy: CompliancePolicy,
+    job: "Job | None",
+    device_ids: list[int],
+    full: bool = False,
+) -> PolicyRun:
+    """Evaluate ``policy`` against the latest config of each device and store results.
+
+    Devices whose latest result already covers their current config and the
+    current definition are counted in ``PolicyRun.unchanged`` and skipped
+    unless ``full`` is set. Raises ``engine.PolicyError`` before anything is
+    written if the definition does not compile. Devices without a snapshot
+    get no result and are listed in ``PolicyRun.no_config``.
+    """
+    definition = policy.definition_yaml
+    definition_hash = policy.definition_hash
+    compile_policy(definition)
+    chunk_size = max(1, getattr(settings, "COMPLIANCE_CHUNK_SIZE", 250))
+    run = PolicyRun()
+    stale = _stale_devices(policy, device_ids, chunk_size, full, run)
+    snapshots = {device_id: (snapshot_id, digest) for device_id, snapshot_id, digest in stale}
+
+    def chunks() -> Iterator[list[tuple[int, str]]]:
+        for start in range(0, len(stale), chunk_size):
+            batch = stale[start : start + chunk_size]
+            texts = ConfigBlob.load_texts({digest for _, _, digest in batch})
+            yield [(device_id, texts.get(digest, "")) for device_id, _, digest in batch]
+
+    workers = _pool_size(len(stale), chunk_size)
+    for evaluations in evaluate_many(definition, chunks(), workers):
+        results = []
+        for device_id, passed, rules in evaluations:
+            snapshot_id, digest = snapshots[device_id]
+            results.append(
+                ComplianceResult(
+                    policy=policy,
+                    device_id=device_id,
+                    job=job,
+                    status="passed" if passed else "failed",
+                    config_hash=digest,
+                    definition_hash=definition_hash,
+                    details_json={
+                        "snapshot_id": snapshot_id,
+                        "config_hash": digest,
+                        "failed_rules": [rule["rule"] for rule in rules if not rule["passed"]],
+                        "rules": rules,
+                    },
+                )
+            )
+        for result in ComplianceResult.objects.bulk_create(results):
+            if result.status == "passed":
+                run.passed += 1
+            else:
+                run.failed += 1
+                run.failed_ids.append(result.pk)
+    logger.info(
+        "Compliance policy %s: %s passed, %s failed, %s unchanged, %s without config (%s workers)",
+        policy.pk,
+        run.passed,
+        run.failed,
+        run.unchanged,
+        len(run.no_config),
+        workers,
+    )
+    return run
+
+
+def verify_config(policy: CompliancePolicy, config_text: str) -> tuple[bool, list[str]]:
+    """Evaluate ``policy`` against ``config_text`` in-process, without storing a result.
+
+    Returns whether every rule passed and the names of the rules that failed.
+    Raises ``engine.PolicyError`` if the definition does not compile.
+    """
+    passed, rules = compile_policy(policy.definition_yaml).evaluate(config_text)
+    return passed, [rule["rule"] for rule in rules if not rule["passed"]]
+
+
+def policies_for_device(device: Device) -> list[CompliancePolicy]:
+    """Return the customer's policies whose ``scope_json`` includes ``device``."""
+    return [
+        policy
+        for policy in CompliancePolicy.objects.filter(customer_id=device.customer_id)
+        if filter_devices(policy.scope_json, device.customer_id).filter(pk=device.pk).exists()
+    ]
+
+
+def evaluate_devices(device_ids: Iterable[int]) -> list[int]:
+    """Re-check devices against every policy in scope; return new violation IDs.
+
+    Each policy runs once for all of its in-scope devices. Policies whose
+    definition does not compile are logged and skipped.
+    """
+    by_customer: dict[int, list[int]] = defaultdict(list)
+    enabled = Device.objects.filter(pk__in=list(device_ids), enabled=True)
+    for device_id, customer_id in enabled.values_list("pk", "customer_id"):
+        by_customer[customer_id].append(device_id)
+    failed_ids: list[int] = []
+    for customer_id, customer_devices in by_customer.items():
+        for policy in CompliancePolicy.objects.filter(customer_id=customer_id):
+            in_scope = list(
+                filter_devices(policy.scope_json, customer_id)
+                .filter(pk__in=customer_devices)
+                .values_list("pk", flat=True)
+            )
+            if not in_scope:
+                continue
+            try:
+                run = run_policy(policy, None, in_scope)
+            except PolicyError as exc:
+                logger.warning("Skipping compliance policy %s: %s", policy.pk, exc)
+                continue
+            failed_ids.extend(run.failed_ids)
+    return failed_ids
+
+
+def evaluate_device(device_id: int) -> list[int]:
+    """Re-check one device against every policy in scope; return new violation IDs."""
+    return evaluate_devices([device_id])
@@ -0,0 +1,32 @@
+"""Django signals for the compliance app."""
+
+from typing import Any
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from webnet.config_mgmt.models import ConfigSnapshot
+
+REMEDIATION_SOURCES = ("remediation_before", "remediation_after")
+
+
+@receiver(post_save, sender=ConfigSnapshot)
+def check_new_snapshot(
+    sender: type[ConfigSnapshot], instance: ConfigSnapshot, created: bool, **kwargs: Any
+) -> None:
+    """Re-evaluate the policies covering a device once its new config is committed.
+
+    Snapshots stored by a job are skipped. A backup checks all of its new
+    snapshots in one batch when it finishes, and remediation jobs verify their
+    own after-snapshots; re-checking those would trigger remediation again.
+    """
+    if not created or not getattr(settings, "COMPLIANCE_ON_SNAPSHOT", True):
+        return
+    if instance.job_id or instance.source in REMEDIATION_SOURCES:
+        return
+    from webnet.jobs.tasks import compliance_snapshot_check
+
+    device_ids = [instance.device_id]
+    transaction.on_commit(lambda: compliance_snapshot_check.delay(device_ids))
@@ -0,0 +1,139 @@
+"""Aggregated handling of compliance violations.
+
+A policy run can record thousands of violations at once. Instead of
+notifying and remediating them one at a time, violations are grouped per
+policy: each notification channel (Slack, Teams, email) receives one digest
+per policy, and auto-remediation is planned per rule for the whole batch.
+Daily execution limits are checked with one aggregated count over all the
+rules involved while those rules are locked. The lock only orders the
+budget reads: actions are created later by the queued remediation jobs, so
+dispatches overlapping with them can still exceed a limit by the
+remediations in flight.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Iterable
+
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from webnet.compliance.models import (
+    CompliancePolicy,
+    ComplianceResult,
+    RemediationAction,
+    RemediationRule,
+)
+
+logger = logging.getLogger(__name__)
+
+VIOLATION_STATUSES = ("failed", "violation", "non-compliant")
+
+# Devices and rules listed by name in a digest; the rest are counted
+DIGEST_SAMPLE = 10
+
+
+@dataclass
+class ViolationDigest:
+    """All violations of one policy from a single dispatch."""
+
+    policy: CompliancePolicy
+    violations: list[ComplianceResult]
+
+    @property
+    def count(self) -> int:
+        return len(self.violations)
+
+    def hostnames(self, limit: int = DIGEST_SAMPLE) -> list[str]:
+        return sorted(v.device.hostname for v in self.violations)[:limit]
+
+    @property
+    def unlisted(self) -> int:
+        """Number of devices not named by ``hostnames()``."""
+        return max(0, self.count - DIGEST_SAMPLE)
+
+    def top_rules(self, limit: int = DIGEST_SAMPLE) -> list[tuple[str, int]]:
+        """Most frequently failed rules with the number of devices failing each."""
+        counts: Counter[str] = Counter()
+        for violation in self.violations:
+            counts.update((violation.details_json or {}).get("failed_rules") or ())
+        return counts.most_common(limit)
+
+    def summary(self) -> str:
+        noun = "device" if self.count == 1 else "devices"
+        return f"{self.policy.name}: {self.count} {noun} in violation"
+
+
+def group_by_policy(violations: Iterable[ComplianceResult]) -> list[ViolationDigest]:
+    grouped: dict[int, list[ComplianceResult]] = defaultdict(list)
+    for violation in violations:
+        grouped[violation.policy_id].append(violation)
+    return [ViolationDigest(group[0].policy, group) for group in grouped.values()]
+
+
+def notify_digests(digests: list[ViolationDigest]) -> None:
+    """Send one digest per policy to every notification channel."""
+    from webnet.chatops.slack_service import notify_compliance_violation_digest as slack
+    from webnet.chatops.teams_service import notify_compliance_violation_digest_teams as teams
+    from webnet.notifications.services import notify_compliance_violation_digest as email
+
+    for digest in digests:
+        for channel, send in (("Slack", slack), ("Teams", teams), ("email", email)):
+            try:
+                send(digest)
+            except Exception as e:
+                logger.warning(f"Failed to send {channel} compliance violation digest: {e}")
+
+
+def remediation_budget(rules: list[RemediationRule]) -> dict[int, int]:
+    """Remaining executions today for each rule, from one aggregated count."""
+    # TODO: Consider using customer timezone instead of UTC for daily limit calculation
+    today_start = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    used = dict(
+        RemediationAction.objects.filter(rule__in=rules, started_at__gte=today_start)
+        .values("rule")
+        .annotate(executions=Count("id"))
+        .values_list("rule", "executions")
+    )
+    return {rule.id: max(0, rule.max_daily_executions - used.get(rule.id, 0)) for rule in rules}
+
+
+def plan_remediations(violations: list[ComplianceResult]) -> list[tuple[int, int]]:
+    """Return ``(rule_id, compliance_result_id)`` pairs to remediate.
+
+    Rules requiring manual approval are skipped ('auto' and 'none' both
+    allow auto-remediation). Each rule takes violations of its policy in
+    order until its daily limit is reached.
+    """
+    by_policy: dict[int, list[ComplianceResult]] = defaultdict(list)
+    for violation in violations:
+        by_policy[violation.policy_id].append(violation)
+    pairs: list[tuple[int, int]] = []
+    with transaction.atomic():
+        # Lock the rules so concurrent dispatches read the budget one at a time
+        rules = list(
+            RemediationRule.objects.select_for_update()
+            .filter(policy_id__in=by_policy, enabled=True)
+            .order_by("id")
+        )
+        manual = [rule for rule in rules if rule.approval_required == "manual"]
+        for rule in manual:
+            logger.info(f"Rule {rule.id} requires manual approval, skipping auto-remediation")
+        rules = [rule for rule in rules if rule.approval_required != "manual"]
+        budget = remediation_budget(rules)
+        for rule in rules:
+            candidates = by_policy[rule.policy_id]
+            allowed = candidates[: budget[rule.id]]
+            if len(allowed) < len(candidates):
+                logger.warning(
+                    f"Rule {rule.id} has reached daily limit ({rule.max_daily_executions}); "
+                    f"{len(candidates) - len(allowed)} violations not remediated"
+                )
+            pairs.extend((rule.id, violation.id) for violation in allowed)
+    if not rules and not manual:
+        logger.info(f"No remediation rules found for policies {sorted(by_policy)}")
+    return pairs
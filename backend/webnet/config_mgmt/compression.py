@@ -0,0 +1,68 @@
+"""Compression codecs for stored config blobs.
+
+Device configs are highly repetitive text and typically compress 8-15x.
+Blobs record the codec they were written with, so the configured codec
+(``CONFIG_BLOB_COMPRESSION``) can change at any time without rewriting
+existing rows. ``zstd`` needs the optional ``zstandard`` package and falls
+back to ``zlib`` when it is not installed.
+"""
+
+from __future__ import annotations
+
+import logging
+import zlib
+
+from django.conf import settings
+
+try:  # pragma: no cover - optional dependency
+    import zstandard
+except ImportError:  # pragma: no cover - zlib fallback
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+ENCODING_NONE = "none"
+ENCODING_ZLIB = "zlib"
+ENCODING_ZSTD = "zstd"
+
+ENCODING_CHOICES = [
+    (ENCODING_NONE, "Uncompressed"),
+    (ENCODING_ZLIB, "zlib"),
+    (ENCODING_ZSTD, "zstd"),
+]
+
+
+def configured_encoding() -> str:
+    """Return the codec new blobs should be written with."""
+    encoding = getattr(settings, "CONFIG_BLOB_COMPRESSION", ENCODING_ZLIB)
+    if encoding == ENCODING_ZSTD and zstandard is None:
+        logger.warning("CONFIG_BLOB_COMPRESSION=zstd but zstandard is not installed; using zlib")
+        return ENCODING_ZLIB
+    if encoding not in {ENCODING_NONE, ENCODING_ZLIB, ENCODING_ZSTD}:
+        raise ValueError(f"Unknown CONFIG_BLOB_COMPRESSION: {encoding}")
+    return encoding
+
+
+def compress(text: str, encoding: str | None = None) -> tuple[str, bytes]:
+    """Compress ``text`` and return ``(encoding, data)``."""
+    encoding = encoding or configured_encoding()
+    raw = text.encode()
+    level = getattr(settings, "CONFIG_BLOB_COMPRESSION_LEVEL", None)
+    if encoding == ENCODING_ZLIB:
+        return encoding, zlib.compress(raw, 6 if level is None else level)
+    if encoding == ENCODING_ZSTD:
+        compressor = zstandard.ZstdCompressor(level=3 if level is None else level)
+        return encoding, compressor.compress(raw)
+    return ENCODING_NONE, raw
+
+
+def decompress(encoding: str, data: bytes | memoryview) -> str:
+    """Inverse of ``compress``."""
+    data = bytes(data)
+    if encoding == ENCODING_ZLIB:
+        return zlib.decompress(data).decode()
+    if encoding == ENCODING_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd-compressed config blobs")
+        return zstandard.ZstdDecompressor().decompress(data).decode()
+    return data.decode()
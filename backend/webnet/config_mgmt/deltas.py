@@ -0,0 +1,58 @@
+"""Line-level deltas between consecutive config versions.
+
+A delta is the list of line-diff opcodes that turns the base config's lines
+into the target's. Opcodes are computed over ``splitlines()`` exactly as
+``diff_text`` computes them, so the change counts and hunks of a drift between
+a snapshot and its delta base can be read from the delta without re-diffing.
+Unchanged runs are stored as index ranges only; changed runs carry both the
+removed and the added lines, line endings included.
+
+Because unchanged runs are copied from the base, a delta is only lossless
+when those lines also keep their line endings (and the final newline). Callers
+must check ``apply_delta`` reproduces the target and store it in full when it
+does not.
+
+Opcode layout: ``[tag, i1, i2, j1, j2]`` for ``equal`` runs and
+``[tag, i1, i2, j1, j2, removed, added]`` for ``replace``/``delete``/``insert``.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from webnet.config_mgmt.diffing import LineDiff, diff_opcodes
+
+Delta = list[list[Any]]
+
+
+def make_delta(base: str, target: str) -> Delta:
+    """Return the opcodes turning ``base`` into ``target``."""
+    a = base.splitlines(keepends=True)
+    b = target.splitlines(keepends=True)
+    ops: Delta = []
+    for tag, i1, i2, j1, j2 in diff_opcodes(base.splitlines(), target.splitlines()):
+        if tag == "equal":
+            ops.append([tag, i1, i2, j1, j2])
+        else:
+            ops.append([tag, i1, i2, j1, j2, a[i1:i2], b[j1:j2]])
+    return ops
+
+
+def apply_delta(base: str, ops: Delta) -> str:
+    """Rebuild the target text from ``base`` and its delta."""
+    lines = base.splitlines(keepends=True)
+    out: list[str] = []
+    for op in ops:
+        if op[0] == "equal":
+            out.extend(lines[op[1] : op[2]])
+        else:
+            out.extend(op[6])
+    return "".join(out)
+
+
+def delta_line_diff(ops: Delta, base: str, target: str) -> LineDiff:
+    """The ``diff_text(base, target)`` result, read from the delta instead of re-diffing."""
+    opcodes = [(op[0], op[1], op[2], op[3], op[4]) for op in ops]
+    additions = sum(op[4] - op[3] for op in ops if op[0] != "equal")
+    deletions = sum(op[2] - op[1] for op in ops if op[0] != "equal")
+    return LineDiff(base.splitlines(), target.splitlines(), opcodes, additions, deletions)
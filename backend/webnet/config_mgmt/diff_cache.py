@@ -0,0 +1,89 @@
+"""Cache of rendered config diffs.
+
+Snapshot bodies are content-addressed, so the diff between two blobs never
+changes: entries are keyed by ``(from_hash, to_hash, mode)`` and never need
+invalidating. Only the hunks are cached, compressed with the blob codec; the
+``---``/``+++`` header names the snapshots and is added on the way out, so
+every snapshot pair sharing the same two configs reuses one entry.
+
+Entries live in the ``CONFIG_DIFF_CACHE`` cache alias, whose backend sets
+the bound and eviction (``MAX_ENTRIES`` for the local-memory cache,
+``maxmemory-policy allkeys-lru`` for Redis) and the entry timeout.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+
+from django.conf import settings
+from django.core.cache import BaseCache, caches
+
+from webnet.config_mgmt import diffing
+from webnet.config_mgmt.compression import compress, decompress
+from webnet.config_mgmt.models import ConfigSnapshot
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "config-diff:v1"
+DEFAULT_CONTEXT = 3
+MAX_CONTEXT = 100
+
+
+def diff_mode(engine: str | None = None, context: int = DEFAULT_CONTEXT) -> str:
+    """Name the rendering options that affect a diff's hunks."""
+    engine = engine or getattr(settings, "CONFIG_DIFF_ENGINE", "histogram")
+    return f"{engine}:u{context}"
+
+
+def diff_etag(snap_from: ConfigSnapshot, snap_to: ConfigSnapshot, mode: str, *extra: object) -> str:
+    """Strong ETag for a rendered diff; it is derived from content hashes, not the diff."""
+    parts = [snap_from.blob_id, snap_to.blob_id, mode, snap_from.pk, snap_to.pk, *extra]
+    digest = hashlib.sha256(":".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def _cache() -> BaseCache:
+    return caches[getattr(settings, "CONFIG_DIFF_CACHE", "default")]
+
+
+def _hunks(
+    snap_from: ConfigSnapshot, snap_to: ConfigSnapshot, engine: str | None, context: int
+) -> str:
+    key = f"{KEY_PREFIX}:{snap_from.blob_id}:{snap_to.blob_id}:{diff_mode(engine, context)}"
+    cache = _cache()
+    try:
+        cached = cache.get(key)
+    except Exception as exc:  # pragma: no cover - cache outage must not break diffs
+        logger.warning("Config diff cache read failed: %s", exc)
+        cached = None
+    if cached is not None:
+        return decompress(*cached)
+
+    result = diffing.diff_text(snap_from.config_text or "", snap_to.config_text or "", engine)
+    # Drop the ---/+++ header; it names the snapshots rather than the blobs
+    hunks = "\n".join(list(result.unified(context=context))[2:])
+    try:
+        cache.set(key, compress(hunks))
+    except Exception as exc:  # pragma: no cover
+        logger.warning("Config diff cache write failed: %s", exc)
+    return hunks
+
+
+def unified_diff(
+    snap_from: ConfigSnapshot,
+    snap_to: ConfigSnapshot,
+    context: int = DEFAULT_CONTEXT,
+    engine: str | None = None,
+) -> str:
+    """Unified diff between two snapshots, served from the cache when possible.
+
+    Config text is only loaded on a cache miss. The result is the same as
+    joining ``diffing.diff_text(...).unified(...)`` with newlines.
+    """
+    if snap_from.blob_id == snap_to.blob_id:
+        return ""
+    hunks = _hunks(snap_from, snap_to, engine, context)
+    if not hunks:
+        return ""
+    return f"--- snapshot-{snap_from.pk}\n+++ snapshot-{snap_to.pk}\n{hunks}"
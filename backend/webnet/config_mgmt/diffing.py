@@ -0,0 +1,311 @@
+"""Line diff engines for config comparisons.
+
+``difflib.SequenceMatcher`` degrades badly on large configs full of repeated
+lines (``!``, ``no shutdown``, ACL entries): a 100k-line pair can take
+seconds. The default ``histogram`` engine interns every line to an integer,
+strips the common prefix and suffix, then splits the remaining region on its
+rarest shared line, the same strategy as ``git diff --histogram``. Regions
+with no usable anchor fall back to a cost-bounded Myers diff. Engines return
+``difflib``-style opcodes, so ``difflib`` remains available as a fallback
+(``CONFIG_DIFF_ENGINE = "difflib"``) and output is rendered the same way.
+"""
+
+from __future__ import annotations
+
+import difflib
+from dataclasses import dataclass
+from typing import Callable, Iterator, Sequence
+
+from django.conf import settings
+
+Opcode = tuple[str, int, int, int, int]
+Block = tuple[int, int, int]
+
+# Lines occurring more often than this in a region are never used as anchors
+HISTOGRAM_MAX_OCCURRENCES = 64
+# Edit distance at which the Myers fallback gives up and reports a replace
+MYERS_MAX_COST = 1000
+
+
+def _intern(a_lines: Sequence[str], b_lines: Sequence[str]) -> tuple[list[int], list[int]]:
+    table: dict[str, int] = {}
+    a = [table.setdefault(line, len(table)) for line in a_lines]
+    b = [table.setdefault(line, len(table)) for line in b_lines]
+    return a, b
+
+
+def _opcodes_from_blocks(blocks: list[Block], n: int, m: int) -> list[Opcode]:
+    """Turn sorted matching blocks into ``SequenceMatcher.get_opcodes`` output."""
+    merged: list[list[int]] = []
+    for ai, bj, size in blocks:
+        if not size:
+            continue
+        if merged and merged[-1][0] + merged[-1][2] == ai and merged[-1][1] + merged[-1][2] == bj:
+            merged[-1][2] += size
+        else:
+            merged.append([ai, bj, size])
+    opcodes: list[Opcode] = []
+    i = j = 0
+    for ai, bj, size in [*merged, [n, m, 0]]:
+        if i < ai and j < bj:
+            opcodes.append(("replace", i, ai, j, bj))
+        elif i < ai:
+            opcodes.append(("delete", i, ai, j, bj))
+        elif j < bj:
+            opcodes.append(("insert", i, ai, j, bj))
+        i, j = ai + size, bj + size
+        if size:
+            opcodes.append(("equal", ai, i, bj, j))
+    return opcodes
+
+
+def _myers_blocks(
+    a: list[int], b: list[int], a0: int, a1: int, b0: int, b1: int, max_cost: int
+) -> list[Block]:
+    """Matching blocks of a shortest edit script, or none if it costs more than ``max_cost``."""
+    n, m = a1 - a0, b1 - b0
+    max_d = min(n + m, max_cost)
+    offset = max_d + 1
+    v = [0] * (2 * max_d + 3)
+    trace: list[list[int]] = []
+    for d in range(max_d + 1):
+        # Only diagonals -d-1..d+1 are read while backtracking step d
+        trace.append(v[offset - d - 1 : offset + d + 2])
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                x = v[offset + k + 1]
+            else:
+                x = v[offset + k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[a0 + x] == b[b0 + y]:
+                x += 1
+                y += 1
+            v[offset + k] = x
+            if x >= n and y >= m:
+                return _myers_backtrack(trace, n, m, a0, b0)
+    return []
+
+
+def _myers_backtrack(trace: list[list[int]], x: int, y: int, a0: int, b0: int) -> list[Block]:
+    blocks: list[Block] = []
+    for d in range(len(trace) - 1, -1, -1):
+        window = trace[d]
+        k = x - y
+        if k == -d or (k != d and window[k - 1 + d + 1] < window[k + 1 + d + 1]):
+            prev_k = k + 1
+        else:
+            prev_k = k - 1
+        prev_x = window[prev_k + d + 1]
+        prev_y = prev_x - prev_k
+        run = 0
+        while x > prev_x and y > prev_y:
+            x -= 1
+            y -= 1
+            run += 1
+        if run:
+            blocks.append((a0 + x, b0 + y, run))
+        if d > 0:
+            x, y = prev_x, prev_y
+    blocks.reverse()
+    return blocks
+
+
+def _histogram_anchor(
+    a: list[int], b: list[int], a0: int, a1: int, b0: int, b1: int
+) -> Block | None:
+    """Longest common run around the rarest line shared by both regions."""
+    positions: dict[int, list[int]] = {}
+    for i in range(a0, a1):
+        positions.setdefault(a[i], []).append(i)
+    best: Block | None = None
+    best_count = HISTOGRAM_MAX_OCCURRENCES
+    j = b0
+    while j < b1:
+        occurrences = positions.get(b[j])
+        if occurrences is None or len(occurrences) > best_count:
+            j += 1
+            continue
+        next_j = j + 1
+        for i in occurrences:
+            start_a, start_b = i, j
+            while start_a > a0 and start_b > b0 and a[start_a - 1] == b[start_b - 1]:
+                start_a -= 1
+                start_b -= 1
+            end_a, end_b = i + 1, j + 1
+            while end_a < a1 and end_b < b1 and a[end_a] == b[end_b]:
+                end_a += 1
+                end_b += 1
+            count = min(len(positions[a[p]]) for p in range(start_a, end_a))
+            length = end_a - start_a
+            if best is None or count < best_count or (count == best_count and length > best[2]):
+                best = (start_a, start_b, length)
+                best_count = count
+            next_j = max(next_j, end_b)
+        j = next_j
+    return best
+
+
+def histogram_opcodes(a_lines: Sequence[str], b_lines: Sequence[str]) -> list[Opcode]:
+    a, b = _intern(a_lines, b_lines)
+    blocks: list[Block] = []
+    regions = [(0, len(a), 0, len(b))]
+    while regions:
+        a0, a1, b0, b1 = regions.pop()
+        start = a0
+        while a0 < a1 and b0 < b1 and a[a0] == b[b0]:
+            a0 += 1
+            b0 += 1
+        if a0 > start:
+            blocks.append((start, b0 - (a0 - start), a0 - start))
+        end = a1
+        while a1 > a0 and b1 > b0 and a[a1 - 1] == b[b1 - 1]:
+            a1 -= 1
+            b1 -= 1
+        if end > a1:
+            blocks.append((a1, b1, end - a1))
+        if a0 == a1 or b0 == b1:
+            continue
+        anchor = _histogram_anchor(a, b, a0, a1, b0, b1)
+        if anchor is None:
+            blocks.extend(_myers_blocks(a, b, a0, a1, b0, b1, MYERS_MAX_COST))
+            continue
+        ai, bj, size = anchor
+        blocks.append(anchor)
+        regions.append((a0, ai, b0, bj))
+        regions.append((ai + size, a1, bj + size, b1))
+    blocks.sort()
+    return _opcodes_from_blocks(blocks, len(a), len(b))
+
+
+def myers_opcodes(a_lines: Sequence[str], b_lines: Sequence[str]) -> list[Opcode]:
+    a, b = _intern(a_lines, b_lines)
+    blocks = _myers_blocks(a, b, 0, len(a), 0, len(b), max(len(a) + len(b), 1))
+    return _opcodes_from_blocks(blocks, len(a), len(b))
+
+
+def difflib_opcodes(a_lines: Sequence[str], b_lines: Sequence[str]) -> list[Opcode]:
+    matcher = difflib.SequenceMatcher(None, a_lines, b_lines)
+    return [(tag, i1, i2, j1, j2) for tag, i1, i2, j1, j2 in matcher.get_opcodes()]
+
+
+DIFF_ENGINES: dict[str, Callable[[Sequence[str], Sequence[str]], list[Opcode]]] = {
+    "histogram": histogram_opcodes,
+    "myers": myers_opcodes,
+    "difflib": difflib_opcodes,
+}
+
+
+def diff_opcodes(
+    a_lines: Sequence[str], b_lines: Sequence[str], engine: str | None = None
+) -> list[Opcode]:
+    """Opcodes turning ``a_lines`` into ``b_lines`` using the configured engine."""
+    name = engine or str(getattr(settings, "CONFIG_DIFF_ENGINE", "histogram"))
+    try:
+        func = DIFF_ENGINES[name]
+    except KeyError:
+        raise ValueError(f"Unknown diff engine: {name}") from None
+    return func(a_lines, b_lines)
+
+
+def _format_range(start: int, stop: int) -> str:
+    # Same range notation as difflib.unified_diff
+    beginning = start + 1
+    length = stop - start
+    if length == 1:
+        return str(beginning)
+    if not length:
+        beginning -= 1
+    return f"{beginning},{length}"
+
+
+def grouped_opcodes(opcodes: list[Opcode], context: int = 3) -> Iterator[list[Opcode]]:
+    """Group opcodes into hunks like ``SequenceMatcher.get_grouped_opcodes``."""
+    codes = list(opcodes) or [("equal", 0, 1, 0, 1)]
+    # Trim unchanged runs at either end down to the context size
+    tag, i1, i2, j1, j2 = codes[0]
+    if tag == "equal":
+        codes[0] = (tag, max(i1, i2 - context), i2, max(j1, j2 - context), j2)
+    tag, i1, i2, j1, j2 = codes[-1]
+    if tag == "equal":
+        codes[-1] = (tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context))
+    group: list[Opcode] = []
+    for tag, i1, i2, j1, j2 in codes:
+        # An unchanged run longer than twice the context closes the hunk
+        if tag == "equal" and i2 - i1 > 2 * context:
+            group.append((tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context)))
+            yield group
+            group = []
+            i1, j1 = max(i1, i2 - context), max(j1, j2 - context)
+        group.append((tag, i1, i2, j1, j2))
+    if group and not (len(group) == 1 and group[0][0] == "equal"):
+        yield group
+
+
+def unified_lines(
+    opcodes: list[Opcode],
+    a_lines: Sequence[str],
+    b_lines: Sequence[str],
+    *,
+    fromfile: str = "",
+    tofile: str = "",
+    context: int = 3,
+) -> Iterator[str]:
+    """Render opcodes exactly like ``difflib.unified_diff(..., lineterm="")``."""
+    started = False
+    for group in grouped_opcodes(opcodes, context):
+        if not started:
+            started = True
+            yield f"--- {fromfile}"
+            yield f"+++ {tofile}"
+        first, last = group[0], group[-1]
+        yield f"@@ -{_format_range(first[1], last[2])} +{_format_range(first[3], last[4])} @@"
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                yield from (" " + line for line in a_lines[i1:i2])
+                continue
+            if tag in ("replace", "delete"):
+                yield from ("-" + line for line in a_lines[i1:i2])
+            if tag in ("replace", "insert"):
+                yield from ("+" + line for line in b_lines[j1:j2])
+
+
+@dataclass
+class LineDiff:
+    """Result of diffing two configs: counts plus opcodes for rendering hunks."""
+
+    a_lines: list[str]
+    b_lines: list[str]
+    opcodes: list[Opcode]
+    additions: int
+    deletions: int
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.additions or self.deletions)
+
+    def unified(self, fromfile: str = "", tofile: str = "", context: int = 3) -> Iterator[str]:
+        return unified_lines(
+            self.opcodes,
+            self.a_lines,
+            self.b_lines,
+            fromfile=fromfile,
+            tofile=tofile,
+            context=context,
+        )
+
+
+def diff_lines(
+    a_lines: Sequence[str], b_lines: Sequence[str], engine: str | None = None
+) -> LineDiff:
+    opcodes = diff_opcodes(a_lines, b_lines, engine)
+    additions = deletions = 0
+    for tag, i1, i2, j1, j2 in opcodes:
+        if tag != "equal":
+            deletions += i2 - i1
+            additions += j2 - j1
+    return LineDiff(list(a_lines), list(b_lines), opcodes, additions, deletions)
+
+
+def diff_text(a: str, b: str, engine: str | None = None) -> LineDiff:
+    """Diff two config texts line by line (``splitlines`` semantics)."""
+    return diff_lines(a.splitlines(), b.splitlines(), engine)
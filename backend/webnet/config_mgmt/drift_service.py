@@ -1,16 +1,97 @@
 """Service for configuration drift detection and analysis."""
 
-import difflib
 import logging
-from typing import Optional
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Iterator, Optional
 
+from django.db.models import Count, F, Max, Q, QuerySet, Sum
+from django.db.models.functions import Coalesce, TruncDate
 from django.utils import timezone
 
-from webnet.config_mgmt.models import ConfigSnapshot, ConfigDrift, DriftAlert
+from webnet.config_mgmt.deltas import delta_line_diff
+from webnet.config_mgmt.diffing import diff_text
+from webnet.config_mgmt.models import (
+    ConfigSnapshot,
+    ConfigDrift,
+    DriftAlert,
+    DriftDailySummary,
+)
+from webnet.config_mgmt.structure import SectionChange, structural_diff
 from webnet.users.models import User
 
 logger = logging.getLogger(__name__)
 
+# Snapshot columns needed to pair snapshots; config text is loaded on demand
+PAIR_FIELDS = ("id", "device_id", "blob_id", "created_at")
+PAIR_BATCH_SIZE = 500
+# Drifts detected this long before the last summary refresh are re-read, so rows
+# committed while a refresh was running are not missed
+SUMMARY_REFRESH_OVERLAP = timedelta(minutes=5)
+SUMMARY_FIELDS = ("drifts", "changed_drifts", "additions", "deletions", "refreshed_at")
+# Devices listed by name in a drift digest; the rest are counted
+DIGEST_SAMPLE = 10
+
+
+@dataclass
+class DriftDigest:
+    """All drifts of one customer's devices from a single backup."""
+
+    customer_id: int
+    drifts: list[ConfigDrift]
+
+    @property
+    def count(self) -> int:
+        return len(self.drifts)
+
+    @property
+    def additions(self) -> int:
+        return sum(drift.additions for drift in self.drifts)
+
+    @property
+    def deletions(self) -> int:
+        return sum(drift.deletions for drift in self.drifts)
+
+    def hostnames(self, limit: int = DIGEST_SAMPLE) -> list[str]:
+        """Devices with the most changed lines first."""
+        ranked = sorted(self.drifts, key=lambda drift: -drift.changes)
+        return [drift.device.hostname for drift in ranked[:limit]]
+
+    @property
+    def unlisted(self) -> int:
+        """Number of devices not named by ``hostnames()``."""
+        return max(0, self.count - DIGEST_SAMPLE)
+
+    def summary(self) -> str:
+        noun = "device" if self.count == 1 else "devices"
+        return f"{self.count} {noun} changed (+{self.additions} / -{self.deletions} lines)"
+
+
+def notify_drift_digests(drifts: list[ConfigDrift]) -> None:
+    """Send one drift notification per customer to Slack and Teams.
+
+    A customer with a single drift gets the detailed per-device message.
+    """
+    from webnet.chatops.slack_service import notify_drift_detected, notify_drift_digest
+    from webnet.chatops.teams_service import notify_drift_detected_teams, notify_drift_digest_teams
+
+    grouped: dict[int, list[ConfigDrift]] = defaultdict(list)
+    for drift in drifts:
+        if drift.has_changes:
+            grouped[drift.device.customer_id].append(drift)
+    for customer_id, group in grouped.items():
+        try:
+            if len(group) == 1:
+                notify_drift_detected(group[0])
+                notify_drift_detected_teams(group[0])
+            else:
+                digest = DriftDigest(customer_id, group)
+                notify_drift_digest(digest)
+                notify_drift_digest_teams(digest)
+        except Exception as e:
+            logger.warning(f"Failed to send drift notification: {e}")
+
 
 class DriftService:
     """Service for detecting and analyzing configuration drift."""
@@ -37,28 +118,26 @@ class DriftService:
         ).first()
         if existing:
             return existing
+        return self._create_drift(snapshot_from, snapshot_to, user)
 
-        # Calculate diff
-        diff_lines = list(
-            difflib.unified_diff(
-                snapshot_from.config_text.splitlines(),
-                snapshot_to.config_text.splitlines(),
-                lineterm="",
-            )
-        )
-
-        # Count changes
-        additions = sum(
-            1 for line in diff_lines if line.startswith("+") and not line.startswith("+++")
-        )
-        deletions = sum(
-            1 for line in diff_lines if line.startswith("-") and not line.startswith("---")
-        )
+    def _create_drift(
+        self,
+        snapshot_from: ConfigSnapshot,
+        snapshot_to: ConfigSnapshot,
+        user: Optional[User] = None,
+        notify: bool = True,
+    ) -> ConfigDrift:
+        # Calculate diff; the engine counts changes while building the hunks
+        additions, deletions, diff_lines = self._diff(snapshot_from, snapshot_to)
         total_lines = len(diff_lines)
         has_changes = additions > 0 or deletions > 0
 
-        # Generate summary
-        diff_summary = self._generate_summary(diff_lines)
+        # Summarize per config section; unchanged sections are skipped by hash
+        sections = structural_diff(
+            snapshot_from.config_text,
+            snapshot_to.config_text,
+            platform=snapshot_to.device.platform,
+        )
 
         # Create drift record
         drift = ConfigDrift.objects.create(
@@ -70,12 +149,13 @@ class DriftService:
             changes=additions + deletions,
             total_lines=total_lines,
             has_changes=has_changes,
-            diff_summary=diff_summary,
+            diff_summary=sections.summary(),
+            section_changes=[change.as_dict() for change in sections.changes],
             triggered_by=user,
         )
 
         # Send ChatOps notification if drift detected
-        if has_changes:
+        if has_changes and notify:
             try:
                 from webnet.chatops.slack_service import notify_drift_detected
                 from webnet.chatops.teams_service import notify_drift_detected_teams
@@ -87,11 +167,67 @@ class DriftService:
 
         return drift
 
+    def _diff(
+        self, snapshot_from: ConfigSnapshot, snapshot_to: ConfigSnapshot
+    ) -> tuple[int, int, list[str]]:
+        """Return ``(additions, deletions, unified diff lines)`` for two snapshots.
+
+        When ``snapshot_to`` is stored as a delta against ``snapshot_from``'s
+        blob, the opcodes are read from the stored delta instead of re-diffing.
+        """
+        to_blob = snapshot_to.blob
+        if to_blob.is_delta and to_blob.base_id == snapshot_from.blob_id:
+            result = delta_line_diff(
+                to_blob.delta, snapshot_from.config_text, snapshot_to.config_text
+            )
+        else:
+            result = diff_text(snapshot_from.config_text, snapshot_to.config_text)
+        return result.additions, result.deletions, list(result.unified())
+
+    def detect_drift_for_snapshot(
+        self,
+        snapshot: ConfigSnapshot,
+        user: Optional[User] = None,
+        previous_id: Optional[int] = None,
+        notify: bool = True,
+    ) -> Optional[ConfigDrift]:
+        """Detect drift between a new snapshot and the device's previous one.
+
+        Args:
+            snapshot: Newly created snapshot
+            user: User who triggered the backup (optional)
+            previous_id: ID of the previous snapshot, if the caller already knows it
+            notify: Send ChatOps notifications for a created drift; callers
+                handling many devices pass False and use ``notify_drift_digests``
+
+        Returns:
+            ConfigDrift, or None if there is no previous snapshot or the config
+            is unchanged
+        """
+        candidates = ConfigSnapshot.objects.only(*PAIR_FIELDS)
+        previous: Optional[ConfigSnapshot]
+        if previous_id is not None:
+            previous = candidates.filter(pk=previous_id).first()
+        else:
+            previous = (
+                candidates.filter(device_id=snapshot.device_id, created_at__lte=snapshot.created_at)
+                .exclude(pk=snapshot.pk)
+                .order_by("-created_at", "-id")
+                .first()
+            )
+        if previous is None or previous.blob_id == snapshot.blob_id:
+            return None
+        existing = ConfigDrift.objects.filter(snapshot_from=previous, snapshot_to=snapshot).first()
+        return existing or self._create_drift(previous, snapshot, user, notify=notify)
+
     def detect_consecutive_drifts(
         self, device_id: int, user: Optional[User] = None
     ) -> list[ConfigDrift]:
         """Detect drift for consecutive snapshots of a device.
 
+        Pairs with identical config are skipped; config text is only loaded
+        for pairs that differ and have no drift record yet.
+
         Args:
             device_id: Device ID to analyze
             user: User who triggered the analysis
@@ -99,15 +235,83 @@ class DriftService:
         Returns:
             List of ConfigDrift objects
         """
-        snapshots = list(ConfigSnapshot.objects.filter(device_id=device_id).order_by("created_at"))
-
+        existing = {
+            (drift.snapshot_from_id, drift.snapshot_to_id): drift
+            for drift in ConfigDrift.objects.filter(device_id=device_id)
+        }
         drifts = []
-        for i in range(len(snapshots) - 1):
-            drift = self.detect_drift(snapshots[i], snapshots[i + 1], user)
+        snapshots = ConfigSnapshot.objects.filter(device_id=device_id)
+        for previous, current in self._snapshot_pairs(snapshots):
+            drift = existing.get((previous.id, current.id))
+            if drift is None:
+                if previous.blob_id == current.blob_id:
+                    continue
+                drift = self._create_drift(previous, current, user)
             drifts.append(drift)
-
         return drifts
 
+    def analyze_fleet(
+        self,
+        customer_id: Optional[int] = None,
+        user: Optional[User] = None,
+        notify: bool = False,
+    ) -> dict[str, int]:
+        """Detect drift for every consecutive snapshot pair, streaming device by device.
+
+        Args:
+            customer_id: Limit to one customer's devices (optional)
+            user: User who triggered the analysis (optional)
+            notify: Send ChatOps notifications for created drifts; off by default
+                because a backfill mostly records historical changes
+
+        Returns:
+            Counts of pairs seen, drifts created, unchanged and already analyzed pairs
+        """
+        snapshots = ConfigSnapshot.objects.all()
+        if customer_id:
+            snapshots = snapshots.filter(device__customer_id=customer_id)
+        stats = {"devices": 0, "pairs": 0, "created": 0, "unchanged": 0, "existing": 0}
+        device_id = None
+        existing: set[tuple[int, int]] = set()
+        for previous, current in self._snapshot_pairs(snapshots):
+            if current.device_id != device_id:
+                device_id = current.device_id
+                stats["devices"] += 1
+                existing = set(
+                    ConfigDrift.objects.filter(device_id=device_id).values_list(
+                        "snapshot_from_id", "snapshot_to_id"
+                    )
+                )
+            stats["pairs"] += 1
+            if (previous.id, current.id) in existing:
+                stats["existing"] += 1
+            elif previous.blob_id == current.blob_id:
+                stats["unchanged"] += 1
+            else:
+                self._create_drift(previous, current, user, notify=notify)
+                stats["created"] += 1
+        return stats
+
+    def _snapshot_pairs(
+        self, snapshots: QuerySet[ConfigSnapshot]
+    ) -> Iterator[tuple[ConfigSnapshot, ConfigSnapshot]]:
+        """Stream consecutive (previous, current) snapshot pairs of each device.
+
+        Rows carry only IDs, the blob hash and the device platform; a blob is
+        fetched when a pair actually needs diffing and is reused for the
+        following pair.
+        """
+        previous = None
+        rows = (
+            snapshots.select_related("device")
+            .only(*PAIR_FIELDS, "device__platform")
+            .order_by("device_id", "created_at", "id")
+        )
+        for snapshot in rows.iterator(chunk_size=PAIR_BATCH_SIZE):
+            if previous is not None and previous.device_id == snapshot.device_id:
+                yield previous, snapshot
+            previous = snapshot
+
     def analyze_drift_for_alert(
         self, drift: ConfigDrift, threshold: int = 50
     ) -> Optional[DriftAlert]:
@@ -123,17 +327,24 @@ class DriftService:
         if not drift.has_changes:
             return None
 
-        # Determine severity based on change magnitude
+        # Determine severity based on change magnitude and which sections changed
         total_changes = drift.additions + drift.deletions
-        if total_changes >= threshold * 2:
+        sensitive = [
+            change["section"]
+            for change in drift.section_changes or []
+            if SectionChange(**change).sensitive
+        ]
+        if total_changes >= threshold * 2 or (sensitive and total_changes >= threshold):
             severity = "critical"
             message = f"Critical configuration drift detected on {drift.device.hostname}: {total_changes} lines changed"
-        elif total_changes >= threshold:
+        elif total_changes >= threshold or sensitive:
             severity = "warning"
             message = f"Significant configuration drift detected on {drift.device.hostname}: {total_changes} lines changed"
         else:
             # Don't create alert for minor changes
             return None
+        if sensitive:
+            message += f" (sensitive sections: {', '.join(sensitive[:5])})"
 
         # Check if alert already exists
         existing = DriftAlert.objects.filter(drift=drift).first()
@@ -150,42 +361,6 @@ class DriftService:
 
         return alert
 
-    def _generate_summary(self, diff_lines: list[str]) -> str:
-        """Generate a human-readable summary of changes.
-
-        Args:
-            diff_lines: List of unified diff lines
-
-        Returns:
-            Summary string
-        """
-        if not diff_lines:
-            return "No changes detected"
-
-        # Extract changed sections
-        sections = []
-        current_section = None
-
-        for line in diff_lines:
-            # Look for section headers (common in network configs)
-            if line.startswith("@@"):
-                if current_section:
-                    sections.append(current_section)
-                current_section = line
-            elif line.startswith(("+", "-")) and not line.startswith(("+++", "---")):
-                # Track actual changes
-                if current_section and "interface " in line.lower():
-                    sections.append(f"Interface configuration changed: {line[1:].strip()}")
-                elif current_section and "hostname " in line.lower():
-                    sections.append(f"Hostname changed: {line[1:].strip()}")
-                elif current_section and "ip address " in line.lower():
-                    sections.append(f"IP address changed: {line[1:].strip()}")
-
-        if not sections:
-            return "Configuration lines modified"
-
-        return "; ".join(sections[:5])  # Limit to first 5 changes
-
     def get_drift_timeline(self, device_id: int, days: int = 30) -> list[ConfigDrift]:
         """Get drift timeline for a device.
 
@@ -196,12 +371,10 @@ class DriftService:
         Returns:
             List of ConfigDrift objects
         """
-        from datetime import timedelta
-
         cutoff = timezone.now() - timedelta(days=days)
         return list(
             ConfigDrift.objects.filter(device_id=device_id, detected_at__gte=cutoff)
-            .select_related("snapshot_from", "snapshot_to", "triggered_by")
+            .select_related("triggered_by")
             .order_by("-detected_at")
         )
 
@@ -215,23 +388,178 @@ class DriftService:
         Returns:
             Dictionary with change statistics
         """
-        from datetime import timedelta
-
         cutoff = timezone.now() - timedelta(days=days)
-        drifts = ConfigDrift.objects.filter(
+        totals = ConfigDrift.objects.filter(
             device_id=device_id, detected_at__gte=cutoff, has_changes=True
+        ).aggregate(
+            total_changes=Count("id"),
+            total_additions=Coalesce(Sum("additions"), 0),
+            total_deletions=Coalesce(Sum("deletions"), 0),
         )
-
-        total_drifts = drifts.count()
-        total_additions = sum(d.additions for d in drifts)
-        total_deletions = sum(d.deletions for d in drifts)
+        total_drifts = totals["total_changes"]
 
         return {
-            "total_changes": total_drifts,
-            "total_additions": total_additions,
-            "total_deletions": total_deletions,
+            **totals,
             "avg_changes_per_drift": (
-                (total_additions + total_deletions) / total_drifts if total_drifts > 0 else 0
+                (totals["total_additions"] + totals["total_deletions"]) / total_drifts
+                if total_drifts > 0
+                else 0
             ),
             "days_analyzed": days,
         }
+
+    def get_daily_changes(self, device_id: int, days: int = 30) -> list[dict[str, Any]]:
+        """Per-day drift counts and changed lines for one device, oldest first.
+
+        Args:
+            device_id: Device ID
+            days: Number of days to look back
+
+        Returns:
+            One dict per day that had drift: day, drifts, additions, deletions
+        """
+        cutoff = timezone.now() - timedelta(days=days)
+        return list(
+            ConfigDrift.objects.filter(
+                device_id=device_id, detected_at__gte=cutoff, has_changes=True
+            )
+            .annotate(day=TruncDate("detected_at"))
+            .values("day")
+            .annotate(
+                drifts=Count("id"),
+                additions=Sum("additions"),
+                deletions=Sum("deletions"),
+            )
+            .order_by("day")
+        )
+
+    def refresh_daily_summaries(self, full: bool = False) -> dict[str, int]:
+        """Bring ``DriftDailySummary`` up to date with ``ConfigDrift``.
+
+        Only (device, day) buckets that received drift records since the last
+        refresh are recomputed, each with one grouped query. A full refresh
+        rebuilds the table, which also drops buckets whose drifts were deleted.
+
+        Args:
+            full: Rebuild every bucket instead of only recently touched ones
+
+        Returns:
+            Counts of buckets recomputed and rows written
+        """
+        drifts = ConfigDrift.objects.annotate(day=TruncDate("snapshot_to__created_at"))
+        last_refresh = DriftDailySummary.objects.aggregate(last=Max("refreshed_at"))["last"]
+        if full or last_refresh is None:
+            touched = None
+        else:
+            since = last_refresh - SUMMARY_REFRESH_OVERLAP
+            touched = set(
+                drifts.filter(detected_at__gte=since).values_list("device_id", "day").distinct()
+            )
+            if not touched:
+                return {"buckets": 0, "rows": 0}
+            drifts = drifts.filter(
+                device_id__in={device_id for device_id, _ in touched},
+                day__in={day for _, day in touched},
+            )
+
+        rows = []
+        for bucket in drifts.values("device_id", "day").annotate(
+            drifts=Count("id"),
+            changed_drifts=Count("id", filter=Q(has_changes=True)),
+            additions=Sum("additions"),
+            deletions=Sum("deletions"),
+        ):
+            key = (bucket["device_id"], bucket["day"])
+            if touched is not None and key not in touched:
+                continue
+            rows.append(
+                DriftDailySummary(
+                    device_id=key[0],
+                    day=key[1],
+                    drifts=bucket["drifts"],
+                    changed_drifts=bucket["changed_drifts"],
+                    additions=bucket["additions"],
+                    deletions=bucket["deletions"],
+                )
+            )
+
+        if touched is None:
+            DriftDailySummary.objects.all().delete()
+        DriftDailySummary.objects.bulk_create(
+            rows,
+            batch_size=PAIR_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=["device", "day"],
+            update_fields=list(SUMMARY_FIELDS),
+        )
+        return {"buckets": len(touched) if touched is not None else len(rows), "rows": len(rows)}
+
+    def _summaries(self, customer_id: Optional[int], days: int) -> QuerySet[DriftDailySummary]:
+        cutoff = timezone.localdate() - timedelta(days=days - 1)
+        summaries = DriftDailySummary.objects.filter(day__gte=cutoff)
+        if customer_id:
+            summaries = summaries.filter(device__customer_id=customer_id)
+        return summaries
+
+    def top_churning_devices(
+        self, customer_id: Optional[int] = None, days: int = 30, limit: int = 10
+    ) -> list[dict[str, Any]]:
+        """Devices with the most changed lines over the last ``days`` days.
+
+        Args:
+            customer_id: Limit to one customer's devices (optional)
+            days: Number of days to look back, including today
+            limit: Maximum number of devices to return
+
+        Returns:
+            Dicts with device_id, hostname, site, drifts, additions, deletions
+            and churn, highest churn first
+        """
+        return list(
+            self._summaries(customer_id, days)
+            .values("device_id", hostname=F("device__hostname"), site=F("device__site"))
+            .annotate(
+                drifts=Sum("changed_drifts"),
+                additions=Sum("additions"),
+                deletions=Sum("deletions"),
+                # F() here refers to the two sums above, not the model fields
+                churn=F("additions") + F("deletions"),
+            )
+            .filter(churn__gt=0)
+            .order_by("-churn", "device_id")[:limit]
+        )
+
+    def churn_heatmap(self, customer_id: Optional[int] = None, days: int = 30) -> dict[str, Any]:
+        """Changed lines per site per day, for rendering a heatmap.
+
+        Args:
+            customer_id: Limit to one customer's devices (optional)
+            days: Number of days to cover, including today
+
+        Returns:
+            ``days`` (ISO dates, oldest first) and one row per site whose
+            ``churn`` and ``drifts`` lists line up with ``days``
+        """
+        start = timezone.localdate() - timedelta(days=days - 1)
+        day_list: list[date] = [start + timedelta(days=offset) for offset in range(days)]
+        index = {day: position for position, day in enumerate(day_list)}
+        sites: dict[str, dict[str, Any]] = {}
+        cells = (
+            self._summaries(customer_id, days)
+            .values("day", site=F("device__site"))
+            .annotate(
+                drifts=Sum("changed_drifts"),
+                churn=Sum(F("additions") + F("deletions")),
+            )
+            .order_by("site", "day")
+        )
+        for cell in cells:
+            if cell["day"] not in index:
+                continue
+            name = cell["site"] or ""
+            row = sites.get(name)
+            if row is None:
+                row = sites[name] = {"site": name, "churn": [0] * days, "drifts": [0] * days}
+            row["churn"][index[cell["day"]]] += cell["churn"]
+            row["drifts"][index[cell["day"]]] += cell["drifts"]
+        return {"days": [day.isoformat() for day in day_list], "sites": list(sites.values())}
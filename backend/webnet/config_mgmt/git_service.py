@@ -2,10 +2,18 @@
 
 This module provides a service for syncing config snapshots to a Git repository.
 It supports both HTTPS (token-based) and SSH authentication methods.
+
+Each repository has a persistent working copy under ``GIT_WORKDIR_ROOT``,
+guarded by a file lock. Syncs fetch and fast-forward it instead of cloning,
+and only rewrite configs whose hash differs from the ``.meta.json`` already
+in the tree. A working copy that is missing, points at another remote or
+branch, or is corrupt is re-cloned. Credentials are passed on each fetch and
+push and are never written to the working copy's Git config.
 """
 
 from __future__ import annotations
 
+import fcntl
 import json
 import logging
 import os
@@ -13,18 +21,58 @@ import re
 import shutil
 import subprocess
 import tempfile
+import time
+from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Iterable, Iterator
 
+from django.conf import settings
+from django.db import transaction
 from django.utils import timezone
+from prometheus_client import Counter, Gauge, Histogram
 
 if TYPE_CHECKING:
-    from webnet.config_mgmt.models import ConfigSnapshot, GitRepository
+    from webnet.config_mgmt.models import ConfigSnapshot, GitRepository, GitSyncLog
     from webnet.jobs.models import Job
 
 logger = logging.getLogger(__name__)
 
+GIT_USER_EMAIL = "webnet@automation.local"
+GIT_USER_NAME = "Webnet Config Backup"
+# Snapshot and device columns a sync reads
+SNAPSHOT_SYNC_FIELDS = (
+    "id",
+    "hash",
+    "blob",
+    "created_at",
+    "source",
+    "device",
+    "device__customer",
+    "device__hostname",
+    "device__mgmt_ip",
+    "device__site",
+    "device__customer__name",
+)
+# Git config key recording which remote/branch a working copy tracks
+_ORIGIN_CONFIG_KEY = "webnet.origin"
+
+SYNC_QUEUE_DEPTH = Gauge(
+    "webnet_git_sync_queue_depth",
+    "Snapshots waiting for the next coalesced Git sync",
+    labelnames=("repository",),
+)
+SYNC_LAG = Histogram(
+    "webnet_git_sync_lag_seconds",
+    "Time from the oldest queued snapshot to the start of the sync that picks it up",
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600),
+)
+SYNC_BATCHES = Counter(
+    "webnet_git_sync_batches_total",
+    "Coalesced Git sync attempts (synced, failed, deferred, empty)",
+    labelnames=("status",),
+)
+
 # Pattern to match tokens/credentials in URLs (handles various URL patterns)
 _CREDENTIAL_PATTERN = re.compile(
     r"(https?://)([^:@]+:[^@]+@)",  # Match https://user:token@ or similar
@@ -84,8 +132,8 @@ class GitService:
             repository: The GitRepository model instance to sync to
         """
         self.repository = repository
-        self._temp_dir: Path | None = None
-        self._base_temp_dir: Path | None = None  # Track original temp dir for cleanup
+        self._temp_dir: Path | None = None  # Working copy (or scratch dir) git runs in
+        self._base_temp_dir: Path | None = None  # Scratch dir for key material, removed after use
         self._ssh_key_file: Path | None = None
 
     def sync_snapshots(
@@ -121,35 +169,35 @@ class GitService:
         )
 
         try:
-            # Prepare workspace
-            self._setup_workspace()
-
-            # Clone or pull the repository
-            self._clone_or_pull()
-
-            # Write config files
-            files_written = self._write_config_files(snapshots)
-
-            if files_written == 0:
-                sync_log.status = "success"
-                sync_log.message = "No changes to commit"
-                sync_log.finished_at = timezone.now()
-                sync_log.save()
-                return SyncResult(success=True, message="No changes to commit")
-
-            # Commit changes
-            commit_msg = commit_message or self._generate_commit_message(snapshots, job)
-            commit_hash = self._commit_changes(commit_msg)
-
-            if not commit_hash:
-                sync_log.status = "success"
-                sync_log.message = "No changes to commit (files unchanged)"
-                sync_log.finished_at = timezone.now()
-                sync_log.save()
-                return SyncResult(success=True, message="No changes to commit")
-
-            # Push to remote
-            self._push_changes()
+            with self._working_copy():
+                # Write only configs that differ from what the tree already holds
+                written_paths = self._write_config_files(snapshots)
+
+                if not written_paths:
+                    # Every config is already in the repository at HEAD
+                    sync_log.status = "success"
+                    sync_log.message = "No changes to commit"
+                    sync_log.finished_at = timezone.now()
+                    sync_log.save()
+                    self._mark_synced(snapshots, self._head_commit(), sync_log)
+                    return SyncResult(success=True, message="No changes to commit")
+
+                # Commit changes
+                commit_msg = commit_message or self._generate_commit_message(snapshots, job)
+                commit_hash = self._commit_changes(commit_msg, written_paths)
+
+                if not commit_hash:
+                    sync_log.status = "success"
+                    sync_log.message = "No changes to commit (files unchanged)"
+                    sync_log.finished_at = timezone.now()
+                    sync_log.save()
+                    self._mark_synced(snapshots, self._head_commit(), sync_log)
+                    return SyncResult(success=True, message="No changes to commit")
+
+                # Push to remote
+                self._push_changes()
+
+            files_written = len(written_paths) // 2  # config + metadata per device
 
             # Update sync log and repository
             sync_log.status = "success"
@@ -160,11 +208,7 @@ class GitService:
             sync_log.save()
 
             # Update snapshots with git sync info
-            for snapshot in snapshots:
-                snapshot.git_synced = True
-                snapshot.git_commit_hash = commit_hash
-                snapshot.git_sync_log = sync_log
-                snapshot.save(update_fields=["git_synced", "git_commit_hash", "git_sync_log"])
+            self._mark_synced(snapshots, commit_hash, sync_log)
 
             # Update repository last sync status
             self.repository.last_sync_at = timezone.now()
@@ -202,8 +246,19 @@ class GitService:
 
             return SyncResult(success=False, error=error_msg)
 
-        finally:
-            self._cleanup_workspace()
+    def _mark_synced(
+        self, snapshots: list["ConfigSnapshot"], commit_hash: str | None, sync_log: "GitSyncLog"
+    ) -> None:
+        """Record on each snapshot the commit that holds its config, in one UPDATE."""
+        from webnet.config_mgmt.models import ConfigSnapshot
+
+        ConfigSnapshot.objects.filter(id__in=[snapshot.id for snapshot in snapshots]).update(
+            git_synced=True, git_commit_hash=commit_hash, git_sync_log=sync_log
+        )
+        for snapshot in snapshots:
+            snapshot.git_synced = True
+            snapshot.git_commit_hash = commit_hash
+            snapshot.git_sync_log = sync_log
 
     def test_connection(self) -> SyncResult:
         """Test the Git repository connection.
@@ -254,21 +309,19 @@ class GitService:
             List of commit dictionaries with hash, message, author, date
         """
         try:
-            self._setup_workspace()
-            self._clone_or_pull()
-
-            result = subprocess.run(
-                [
-                    "git",
-                    "log",
-                    f"-{limit}",
-                    "--format=%H|%s|%an|%aI",
-                ],
-                cwd=self._temp_dir,
-                capture_output=True,
-                text=True,
-                timeout=30,
-            )
+            with self._working_copy():
+                result = subprocess.run(
+                    [
+                        "git",
+                        "log",
+                        f"-{limit}",
+                        "--format=%H|%s|%an|%aI",
+                    ],
+                    cwd=self._temp_dir,
+                    capture_output=True,
+                    text=True,
+                    timeout=30,
+                )
 
             if result.returncode != 0:
                 return []
@@ -292,8 +345,6 @@ class GitService:
         except Exception as e:
             logger.exception("Failed to get recent commits: %s", e)
             return []
-        finally:
-            self._cleanup_workspace()
 
     def _setup_workspace(self) -> None:
         """Set up temporary workspace for Git operations."""
@@ -307,12 +358,10 @@ class GitService:
             os.chmod(self._ssh_key_file, 0o600)
 
     def _cleanup_workspace(self) -> None:
-        """Clean up temporary workspace including SSH key material."""
-        # Clean up the cloned repo directory if different from base
-        if self._temp_dir and self._temp_dir != self._base_temp_dir:
-            if self._temp_dir.exists():
-                shutil.rmtree(self._temp_dir, ignore_errors=True)
+        """Clean up temporary workspace including SSH key material.
 
+        The persistent working copy is left in place for the next sync.
+        """
         # Clean up the base temp directory (contains SSH key if used)
         if self._base_temp_dir and self._base_temp_dir.exists():
             shutil.rmtree(self._base_temp_dir, ignore_errors=True)
@@ -359,51 +408,141 @@ class GitService:
 
         return url
 
+    def _working_copy_dir(self) -> Path:
+        root = Path(getattr(settings, "GIT_WORKDIR_ROOT", None) or tempfile.gettempdir())
+        return root / f"repo-{self.repository.pk}"
+
+    @contextmanager
+    def _working_copy(self) -> Iterator[Path]:
+        """Lock the repository's working copy and bring it up to date with the remote.
+
+        Only one sync per repository runs at a time on a host; others wait for
+        the lock for up to ``GIT_WORKDIR_LOCK_TIMEOUT`` seconds.
+        """
+        repo_dir = self._working_copy_dir()
+        repo_dir.parent.mkdir(parents=True, exist_ok=True)
+        timeout = getattr(settings, "GIT_WORKDIR_LOCK_TIMEOUT", 600)
+        with open(repo_dir.with_suffix(".lock"), "w") as lock_file:
+            deadline = time.monotonic() + timeout
+            while True:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if time.monotonic() >= deadline:
+                        raise RuntimeError("Timed out waiting for the Git working copy lock")
+                    time.sleep(0.5)
+            try:
+                self._setup_workspace()
+                self._temp_dir = repo_dir
+                self._clone_or_pull()
+                yield repo_dir
+            finally:
+                self._cleanup_workspace()
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _git(self, *args: str, timeout: int = 60) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            ["git", *args],
+            cwd=self._temp_dir,
+            env=self._get_git_env(),
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+        )
+
+    def _origin_marker(self) -> str:
+        return f"{self.repository.remote_url}#{self.repository.branch}"
+
+    def _working_copy_usable(self) -> bool:
+        if not (self._temp_dir / ".git").is_dir():
+            return False
+        marker = self._git("config", "--get", _ORIGIN_CONFIG_KEY)
+        if marker.returncode != 0 or marker.stdout.strip() != self._origin_marker():
+            return False
+        return self._git("rev-parse", "--verify", "-q", "HEAD").returncode == 0
+
     def _clone_or_pull(self) -> None:
-        """Clone the repository or pull if already cloned."""
+        """Reset the working copy to the remote branch, cloning it if needed."""
         if not self._temp_dir:
             raise RuntimeError("Workspace not set up")
 
-        repo_dir = self._temp_dir / "repo"
-        env = self._get_git_env()
-        remote_url = self._get_authenticated_url()
+        if not self._working_copy_usable():
+            self._clone()
+            return
 
-        # Clone the repository
+        branch = self.repository.branch
+        result = self._git(
+            "fetch",
+            "--quiet",
+            self._get_authenticated_url(),
+            f"+refs/heads/{branch}:refs/remotes/origin/{branch}",
+            timeout=120,
+        )
+        if result.returncode != 0:
+            sanitized_error = _sanitize_git_error(result.stderr.strip())
+            raise RuntimeError(f"Git fetch failed: {sanitized_error}")
+
+        # The remote wins: leftovers of an interrupted sync and local commits
+        # whose push failed are dropped, and the unpushed configs are written
+        # again from their snapshots
+        if self._git("reset", "-q", "--hard", f"origin/{branch}").returncode != 0:
+            logger.warning("Git working copy %s is corrupt, re-cloning", self._temp_dir)
+            self._clone()
+            return
+        self._git("clean", "-fdq")
+
+    def _clone(self) -> None:
+        """Replace the working copy with a fresh shallow clone of the branch."""
+        repo_dir = self._temp_dir
+        shutil.rmtree(repo_dir, ignore_errors=True)
         result = subprocess.run(
-            ["git", "clone", "--depth=1", "-b", self.repository.branch, remote_url, str(repo_dir)],
-            env=env,
+            [
+                "git",
+                "clone",
+                "--depth=1",
+                "--single-branch",
+                "-b",
+                self.repository.branch,
+                self._get_authenticated_url(),
+                str(repo_dir),
+            ],
+            env=self._get_git_env(),
             capture_output=True,
             text=True,
-            timeout=120,
+            timeout=300,
         )
 
         if result.returncode != 0:
+            shutil.rmtree(repo_dir, ignore_errors=True)
             sanitized_error = _sanitize_git_error(result.stderr.strip())
             raise RuntimeError(f"Git clone failed: {sanitized_error}")
 
-        # Update temp_dir to point to the cloned repo
-        self._temp_dir = repo_dir
+        # Keep credentials out of the persistent copy; fetch and push pass them explicitly
+        for key, value in (
+            ("remote.origin.url", self.repository.remote_url),
+            ("user.email", GIT_USER_EMAIL),
+            ("user.name", GIT_USER_NAME),
+            (_ORIGIN_CONFIG_KEY, self._origin_marker()),
+        ):
+            subprocess.run(["git", "config", key, value], cwd=repo_dir, check=True)
 
-        # Configure git user for commits
-        subprocess.run(
-            ["git", "config", "user.email", "webnet@automation.local"],
-            cwd=self._temp_dir,
-            check=True,
-        )
-        subprocess.run(
-            ["git", "config", "user.name", "Webnet Config Backup"],
-            cwd=self._temp_dir,
-            check=True,
-        )
+    def _head_commit(self) -> str | None:
+        result = self._git("rev-parse", "HEAD")
+        return result.stdout.strip() if result.returncode == 0 else None
 
-    def _write_config_files(self, snapshots: list["ConfigSnapshot"]) -> int:
+    def _write_config_files(self, snapshots: list["ConfigSnapshot"]) -> list[str]:
         """Write config snapshots to files.
 
+        A config is skipped when the ``.meta.json`` next to it already records
+        the snapshot's hash. When several snapshots map to one file, the newest
+        is written.
+
         Args:
             snapshots: List of ConfigSnapshot instances
 
         Returns:
-            Number of files written
+            Repository-relative paths of the config and metadata files written
 
         Raises:
             RuntimeError: If workspace not set up or path traversal detected
@@ -411,11 +550,9 @@ class GitService:
         if not self._temp_dir:
             raise RuntimeError("Workspace not set up")
 
-        files_written = 0
         base_dir = self._temp_dir.resolve()
-
-        for snapshot in snapshots:
-            relative_path = self.repository.get_config_path(snapshot.device)
+        changed: list[tuple[Path, Path, "ConfigSnapshot"]] = []
+        for relative_path, snapshot in self._latest_by_path(snapshots).items():
             file_path = self._temp_dir / relative_path
 
             # Prevent path traversal: ensure resolved path is within base directory
@@ -425,33 +562,64 @@ class GitService:
             except ValueError:
                 raise RuntimeError(f"Path traversal detected: {resolved_path} escapes {base_dir}")
 
-            # Create parent directories
-            file_path.parent.mkdir(parents=True, exist_ok=True)
-
-            # Write config text
-            file_path.write_text(snapshot.config_text)
-            files_written += 1
-
-            # Add metadata file with snapshot info
             metadata_path = file_path.with_suffix(".meta.json")
+            if file_path.exists() and self._stored_hash(metadata_path) == snapshot.hash:
+                continue
+            changed.append((file_path, metadata_path, snapshot))
 
-            metadata = {
-                "snapshot_id": snapshot.id,
-                "device_hostname": snapshot.device.hostname,
-                "device_ip": snapshot.device.mgmt_ip,
-                "created_at": snapshot.created_at.isoformat(),
-                "source": snapshot.source,
-                "config_hash": snapshot.hash,
-            }
-            metadata_path.write_text(json.dumps(metadata, indent=2))
+        texts = self._config_texts(snapshot for _, _, snapshot in changed)
+        written: list[str] = []
+        for file_path, metadata_path, snapshot in changed:
+            # Create parent directories
+            file_path.parent.mkdir(parents=True, exist_ok=True)
 
-        return files_written
+            # Write config text and metadata file with snapshot info
+            file_path.write_text(texts[snapshot.blob_id])
+            metadata_path.write_text(self._metadata(snapshot))
+            written.append(str(file_path.relative_to(self._temp_dir)))
+            written.append(str(metadata_path.relative_to(self._temp_dir)))
+
+        return written
+
+    def _latest_by_path(self, snapshots: list["ConfigSnapshot"]) -> dict[str, "ConfigSnapshot"]:
+        # When several snapshots map to one file, the newest wins
+        latest: dict[str, "ConfigSnapshot"] = {}
+        for snapshot in sorted(snapshots, key=lambda s: (s.created_at, s.id)):
+            latest[self.repository.get_config_path(snapshot.device)] = snapshot
+        return latest
+
+    @staticmethod
+    def _config_texts(snapshots: Iterable["ConfigSnapshot"]) -> dict[str, str]:
+        """Config text of each snapshot keyed by blob hash, loaded in bulk."""
+        from webnet.config_mgmt.models import ConfigBlob
+
+        return ConfigBlob.load_texts({snapshot.blob_id for snapshot in snapshots})
+
+    @staticmethod
+    def _metadata(snapshot: "ConfigSnapshot") -> str:
+        metadata = {
+            "snapshot_id": snapshot.id,
+            "device_hostname": snapshot.device.hostname,
+            "device_ip": snapshot.device.mgmt_ip,
+            "created_at": snapshot.created_at.isoformat(),
+            "source": snapshot.source,
+            "config_hash": snapshot.hash,
+        }
+        return json.dumps(metadata, indent=2)
+
+    @staticmethod
+    def _stored_hash(metadata_path: Path) -> str | None:
+        try:
+            return json.loads(metadata_path.read_text()).get("config_hash")
+        except (OSError, ValueError, AttributeError):
+            return None
 
-    def _commit_changes(self, message: str) -> str | None:
+    def _commit_changes(self, message: str, paths: list[str]) -> str | None:
         """Commit changes and return the commit hash.
 
         Args:
             message: Commit message
+            paths: Repository-relative paths to stage
 
         Returns:
             Commit hash if changes were committed, None otherwise
@@ -459,23 +627,23 @@ class GitService:
         if not self._temp_dir:
             raise RuntimeError("Workspace not set up")
 
-        # Add all changes
-        subprocess.run(["git", "add", "-A"], cwd=self._temp_dir, check=True)
-
-        # Check if there are changes to commit
-        result = subprocess.run(
-            ["git", "status", "--porcelain"],
+        # Stage only the files this sync wrote
+        subprocess.run(
+            ["git", "add", "--pathspec-from-file=-", "--pathspec-file-nul"],
             cwd=self._temp_dir,
-            capture_output=True,
+            input="\0".join(paths),
             text=True,
+            check=True,
         )
 
-        if not result.stdout.strip():
+        # Check if there are changes to commit
+        result = subprocess.run(["git", "diff", "--cached", "--quiet"], cwd=self._temp_dir)
+        if result.returncode == 0:
             return None  # No changes
 
         # Commit
         subprocess.run(
-            ["git", "commit", "-m", message],
+            ["git", "commit", "-q", "-m", message],
             cwd=self._temp_dir,
             check=True,
         )
@@ -496,23 +664,11 @@ class GitService:
         if not self._temp_dir:
             raise RuntimeError("Workspace not set up")
 
-        env = self._get_git_env()
-        remote_url = self._get_authenticated_url()
-
-        # Update remote URL with auth (in case clone used cached credentials)
-        subprocess.run(
-            ["git", "remote", "set-url", "origin", remote_url],
-            cwd=self._temp_dir,
-            env=env,
-            check=True,
-        )
-
-        result = subprocess.run(
-            ["git", "push", "origin", self.repository.branch],
-            cwd=self._temp_dir,
-            env=env,
-            capture_output=True,
-            text=True,
+        branch = self.repository.branch
+        result = self._git(
+            "push",
+            self._get_authenticated_url(),
+            f"HEAD:refs/heads/{branch}",
             timeout=120,
         )
 
@@ -520,6 +676,9 @@ class GitService:
             sanitized_error = _sanitize_git_error(result.stderr.strip())
             raise RuntimeError(f"Git push failed: {sanitized_error}")
 
+        # Pushing to a URL does not move the tracking ref; keep it in step
+        self._git("update-ref", f"refs/remotes/origin/{branch}", "HEAD")
+
     def _generate_commit_message(
         self, snapshots: list["ConfigSnapshot"], job: "Job | None" = None
     ) -> str:
@@ -554,6 +713,212 @@ class GitService:
         return "\n".join(msg_parts)
 
 
+class PlumbingGitService(GitService):
+    """GitService backend that commits without a working tree.
+
+    The repository is kept as a bare clone. Stored ``config_hash`` values are
+    read from the ``.meta.json`` blobs of the synced paths at the branch tip in
+    one ``git cat-file --batch`` call, and the changed files are committed with a
+    single ``git fast-import`` stream parented on the tip. Git rewrites only
+    the trees along changed paths, so commit time follows the number of
+    changed configs rather than the size of the repository.
+    """
+
+    def __init__(self, repository: "GitRepository"):
+        super().__init__(repository)
+        self._staged: dict[str, bytes] = {}
+
+    def _working_copy_dir(self) -> Path:
+        return super()._working_copy_dir().with_suffix(".git")
+
+    def _branch_ref(self) -> str:
+        return f"refs/heads/{self.repository.branch}"
+
+    def _working_copy_usable(self) -> bool:
+        if not (self._temp_dir / "HEAD").is_file():
+            return False
+        marker = self._git("config", "--get", _ORIGIN_CONFIG_KEY)
+        if marker.returncode != 0 or marker.stdout.strip() != self._origin_marker():
+            return False
+        return self._git("cat-file", "-e", f"{self._branch_ref()}^{{tree}}").returncode == 0
+
+    def _clone_or_pull(self) -> None:
+        """Update the branch ref from the remote, initializing the bare clone if needed."""
+        if not self._temp_dir:
+            raise RuntimeError("Workspace not set up")
+
+        shallow = not self._working_copy_usable()
+        if shallow:
+            self._clone()
+        # The remote wins over unpushed local commits, as in the working-tree backend
+        args = ["fetch", "--quiet", "--depth=1"] if shallow else ["fetch", "--quiet"]
+        result = self._git(
+            *args,
+            self._get_authenticated_url(),
+            f"+{self._branch_ref()}:{self._branch_ref()}",
+            timeout=300 if shallow else 120,
+        )
+        if result.returncode != 0:
+            sanitized_error = _sanitize_git_error(result.stderr.strip())
+            raise RuntimeError(f"Git fetch failed: {sanitized_error}")
+
+    def _clone(self) -> None:
+        repo_dir = self._temp_dir
+        shutil.rmtree(repo_dir, ignore_errors=True)
+        subprocess.run(["git", "init", "-q", "--bare", str(repo_dir)], check=True)
+        for args in (
+            ["config", "user.email", GIT_USER_EMAIL],
+            ["config", "user.name", GIT_USER_NAME],
+            ["config", _ORIGIN_CONFIG_KEY, self._origin_marker()],
+            ["symbolic-ref", "HEAD", self._branch_ref()],
+        ):
+            subprocess.run(["git", *args], cwd=repo_dir, check=True)
+
+    def _stored_hashes(self, metadata_paths: list[str]) -> dict[str, str | None]:
+        """``config_hash`` recorded in each metadata file at the branch tip."""
+        hashes: dict[str, str | None] = dict.fromkeys(metadata_paths)
+        if not metadata_paths:
+            return hashes
+        # Only the trees along the requested paths are read, however large the
+        # repository is; paths missing from the tip come back as "missing"
+        ref = self._branch_ref()
+        result = subprocess.run(
+            ["git", "cat-file", "--batch"],
+            cwd=self._temp_dir,
+            input="".join(f"{ref}:{path}\n" for path in metadata_paths).encode(),
+            capture_output=True,
+            check=True,
+        )
+        out = result.stdout
+        pos = 0
+        for path in metadata_paths:
+            end = out.index(b"\n", pos)
+            header = out[pos:end].split()
+            if header[-1] == b"missing":
+                pos = end + 1
+                continue
+            size = int(header[2])
+            body = out[end + 1 : end + 1 + size]
+            pos = end + size + 2
+            try:
+                hashes[path] = json.loads(body).get("config_hash")
+            except (ValueError, AttributeError):
+                hashes[path] = None
+        return hashes
+
+    def _write_config_files(self, snapshots: list["ConfigSnapshot"]) -> list[str]:
+        """Stage changed configs and their metadata for the next commit.
+
+        Nothing is written to disk; configs whose stored hash matches the
+        snapshot hash are skipped without loading their text.
+        """
+        if not self._temp_dir:
+            raise RuntimeError("Workspace not set up")
+
+        latest = self._latest_by_path(snapshots)
+        for relative_path in latest:
+            # Prevent path traversal: the path must stay inside the repository
+            if Path(relative_path).is_absolute() or ".." in Path(relative_path).parts:
+                raise RuntimeError(f"Path traversal detected: {relative_path}")
+
+        metadata_paths = {path: str(Path(path).with_suffix(".meta.json")) for path in latest}
+        stored = self._stored_hashes(list(metadata_paths.values()))
+        changed = {
+            path: snapshot
+            for path, snapshot in latest.items()
+            if stored.get(metadata_paths[path]) != snapshot.hash
+        }
+
+        texts = self._config_texts(changed.values())
+        self._staged = {}
+        for relative_path, snapshot in changed.items():
+            self._staged[relative_path] = texts[snapshot.blob_id].encode()
+            self._staged[metadata_paths[relative_path]] = self._metadata(snapshot).encode()
+        return list(self._staged)
+
+    def _commit_changes(self, message: str, paths: list[str]) -> str | None:
+        """Commit the staged files on top of the branch tip with ``git fast-import``."""
+        if not self._temp_dir:
+            raise RuntimeError("Workspace not set up")
+        if not paths:
+            return None
+
+        parent = self._head_commit()
+        encoded = message.encode()
+        stream = [
+            f"commit {self._branch_ref()}\n".encode(),
+            f"committer {GIT_USER_NAME} <{GIT_USER_EMAIL}> {int(time.time())} +0000\n".encode(),
+            f"data {len(encoded)}\n".encode(),
+            encoded + b"\n",
+        ]
+        if parent:
+            stream.append(f"from {parent}\n".encode())
+        for path in paths:
+            data = self._staged[path]
+            stream.append(f"M 100644 inline {_fast_import_path(path)}\n".encode())
+            stream.append(f"data {len(data)}\n".encode())
+            stream.append(data + b"\n")
+        stream.append(b"done\n")
+
+        result = subprocess.run(
+            ["git", "fast-import", "--quiet", "--done", "--date-format=raw"],
+            cwd=self._temp_dir,
+            input=b"".join(stream),
+            capture_output=True,
+            timeout=300,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"Git fast-import failed: {result.stderr.decode(errors='replace')}")
+        self._staged = {}
+
+        commit_hash = self._head_commit()
+        if parent and self._git("diff-tree", "--quiet", parent, commit_hash).returncode == 0:
+            # Identical tree: drop the empty commit
+            self._git("update-ref", self._branch_ref(), parent)
+            return None
+        return commit_hash
+
+    def _push_changes(self) -> None:
+        """Push the branch ref to the remote."""
+        result = self._git(
+            "push",
+            self._get_authenticated_url(),
+            f"{self._branch_ref()}:{self._branch_ref()}",
+            timeout=120,
+        )
+        if result.returncode != 0:
+            sanitized_error = _sanitize_git_error(result.stderr.strip())
+            raise RuntimeError(f"Git push failed: {sanitized_error}")
+
+    def _head_commit(self) -> str | None:
+        result = self._git("rev-parse", "--verify", "-q", self._branch_ref())
+        return result.stdout.strip() if result.returncode == 0 else None
+
+
+def _fast_import_path(path: str) -> str:
+    # fast-import takes C-style quoted paths when they need escaping
+    if not any(char in path for char in '"\\\n') and not path.startswith('"'):
+        return path
+    escaped = path.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return f'"{escaped}"'
+
+
+GIT_BACKENDS: dict[str, type[GitService]] = {
+    "worktree": GitService,
+    "plumbing": PlumbingGitService,
+}
+
+
+def get_git_service(repository: "GitRepository") -> GitService:
+    """Return the configured ``GIT_SYNC_BACKEND`` implementation for a repository."""
+    name = getattr(settings, "GIT_SYNC_BACKEND", "worktree")
+    try:
+        backend = GIT_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown Git sync backend: {name}") from None
+    return backend(repository)
+
+
 def sync_configs_to_git(
     customer_id: int,
     snapshot_ids: list[int] | None = None,
@@ -580,23 +945,79 @@ def sync_configs_to_git(
     if not repository.enabled:
         return SyncResult(success=False, error="Git sync is disabled for this customer")
 
-    # Get snapshots to sync
+    # Get snapshots to sync; config text is loaded in bulk only for changed configs
+    snapshots = ConfigSnapshot.objects.filter(device__customer_id=customer_id)
     if snapshot_ids:
-        snapshots = list(
-            ConfigSnapshot.objects.filter(
-                id__in=snapshot_ids, device__customer_id=customer_id
-            ).select_related("device", "device__customer")
-        )
+        snapshots = snapshots.filter(id__in=snapshot_ids)
     else:
         # Get all unsynced snapshots for this customer
-        snapshots = list(
-            ConfigSnapshot.objects.filter(
-                device__customer_id=customer_id, git_synced=False
-            ).select_related("device", "device__customer")
-        )
+        snapshots = snapshots.filter(git_synced=False)
+    snapshots = list(snapshots.select_related("device__customer").only(*SNAPSHOT_SYNC_FIELDS))
 
     if not snapshots:
         return SyncResult(success=True, message="No snapshots to sync")
 
-    service = GitService(repository)
+    service = get_git_service(repository)
     return service.sync_snapshots(snapshots, job=job)
+
+
+def queue_git_sync(repository_id: int, snapshot_ids: list[int]) -> bool:
+    """Add snapshots to a repository's pending sync batch.
+
+    Args:
+        repository_id: GitRepository ID
+        snapshot_ids: Snapshots to include in the next sync
+
+    Returns:
+        True if this call opened a new batch, in which case the caller must
+        schedule ``git_sync_flush`` for the end of the window
+    """
+    from webnet.config_mgmt.models import GitRepository
+
+    with transaction.atomic():
+        repository = GitRepository.objects.select_for_update().get(pk=repository_id)
+        opened = repository.sync_pending_since is None
+        pending = set(repository.pending_snapshot_ids or [])
+        pending.update(snapshot_ids)
+        repository.pending_snapshot_ids = sorted(pending)
+        if opened:
+            repository.sync_pending_since = timezone.now()
+        repository.save(update_fields=["pending_snapshot_ids", "sync_pending_since"])
+    SYNC_QUEUE_DEPTH.labels(repository=str(repository_id)).set(len(pending))
+    return opened
+
+
+def claim_git_sync(repository_id: int) -> tuple["GitRepository", list[int]] | None:
+    """Take a repository's pending batch and mark a sync as running.
+
+    Returns ``None`` while another sync of the repository is running (unless
+    it has been running for longer than ``GIT_WORKDIR_LOCK_TIMEOUT``); the
+    batch then stays queued. Snapshots queued after the claim open a new batch.
+    """
+    from webnet.config_mgmt.models import GitRepository
+
+    now = timezone.now()
+    stale_after = getattr(settings, "GIT_WORKDIR_LOCK_TIMEOUT", 600)
+    with transaction.atomic():
+        repository = GitRepository.objects.select_for_update().get(pk=repository_id)
+        started = repository.sync_started_at
+        if started and (now - started).total_seconds() < stale_after:
+            return None
+        snapshot_ids = list(repository.pending_snapshot_ids or [])
+        if repository.sync_pending_since:
+            SYNC_LAG.observe((now - repository.sync_pending_since).total_seconds())
+        repository.pending_snapshot_ids = []
+        repository.sync_pending_since = None
+        repository.sync_started_at = now
+        repository.save(
+            update_fields=["pending_snapshot_ids", "sync_pending_since", "sync_started_at"]
+        )
+    SYNC_QUEUE_DEPTH.labels(repository=str(repository_id)).set(0)
+    return repository, snapshot_ids
+
+
+def release_git_sync(repository_id: int) -> None:
+    """Mark a repository's coalesced sync as finished."""
+    from webnet.config_mgmt.models import GitRepository
+
+    GitRepository.objects.filter(pk=repository_id).update(sync_started_at=None)
@@ -0,0 +1,69 @@
+"""Management command to compare line diff engines on stored config history."""
+
+import time
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError
+
+from webnet.config_mgmt.diffing import DIFF_ENGINES, diff_text
+from webnet.config_mgmt.models import ConfigSnapshot
+
+
+class Command(BaseCommand):
+    """Time each diff engine over consecutive snapshot pairs."""
+
+    help = "Benchmark config diff engines on consecutive snapshots"
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--customer", type=int, help="Limit to one customer ID")
+        parser.add_argument("--device", type=int, help="Limit to one device ID")
+        parser.add_argument("--pairs", type=int, default=200, help="Maximum snapshot pairs to diff")
+        parser.add_argument(
+            "--engine",
+            action="append",
+            choices=sorted(DIFF_ENGINES),
+            help="Engine to benchmark (repeatable, defaults to all)",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Execute the command."""
+        pairs = self._pairs(options.get("customer"), options.get("device"), options["pairs"])
+        if not pairs:
+            raise CommandError("No consecutive snapshot pairs found")
+        total_lines = sum(len(a.splitlines()) + len(b.splitlines()) for a, b in pairs)
+        self.stdout.write(f"Pairs: {len(pairs)}  Lines: {total_lines}")
+        for engine in options.get("engine") or sorted(DIFF_ENGINES):
+            changes = 0
+            slowest = 0.0
+            started = time.perf_counter()
+            for a, b in pairs:
+                pair_started = time.perf_counter()
+                result = diff_text(a, b, engine)
+                slowest = max(slowest, time.perf_counter() - pair_started)
+                changes += result.additions + result.deletions
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{engine:<10} total {elapsed * 1000:9.1f} ms  "
+                f"slowest pair {slowest * 1000:8.1f} ms  changed lines {changes}"
+            )
+
+    def _pairs(
+        self, customer_id: int | None, device_id: int | None, limit: int
+    ) -> list[tuple[str, str]]:
+        snapshots = ConfigSnapshot.objects.select_related("blob").order_by(
+            "device_id", "created_at", "id"
+        )
+        if customer_id:
+            snapshots = snapshots.filter(device__customer_id=customer_id)
+        if device_id:
+            snapshots = snapshots.filter(device_id=device_id)
+        pairs: list[tuple[str, str]] = []
+        previous = None
+        for snapshot in snapshots.iterator(chunk_size=100):
+            if previous is not None and previous.device_id == snapshot.device_id:
+                if previous.blob_id != snapshot.blob_id:
+                    pairs.append((previous.config_text, snapshot.config_text))
+                    if len(pairs) >= limit:
+                        break
+            previous = snapshot
+        return pairs
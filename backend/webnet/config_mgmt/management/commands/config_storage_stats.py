@@ -0,0 +1,58 @@
+"""Management command to report config snapshot storage usage."""
+
+import time
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from webnet.config_mgmt.compression import decompress
+from webnet.config_mgmt.models import ConfigBlob, ConfigSnapshot
+
+
+class Command(BaseCommand):
+    """Report how much space deduplicated, compressed config storage saves."""
+
+    help = "Show logical vs stored config snapshot bytes"
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--customer", type=int, help="Limit to one customer ID")
+        parser.add_argument(
+            "--benchmark",
+            action="store_true",
+            help="Decompress every blob and report the time taken",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Execute the command."""
+        customer_id = options.get("customer")
+        stats = ConfigBlob.storage_stats(customer_id=customer_id)
+        logical = stats["logical_bytes"]
+        ratio = (logical / stats["stored_bytes"]) if stats["stored_bytes"] else 0
+        self.stdout.write(f"Snapshots:     {stats['snapshots']}")
+        self.stdout.write(f"Unique blobs:  {stats['blobs']}")
+        self.stdout.write(f"Logical bytes: {logical}")
+        self.stdout.write(f"Unique bytes:  {stats['unique_bytes']}")
+        self.stdout.write(f"Stored bytes:  {stats['stored_bytes']}")
+        self.stdout.write(f"Compression:   {stats['compression_ratio']:.2f}x")
+        self.stdout.write(
+            self.style.SUCCESS(f"Saved bytes:   {stats['saved_bytes']} ({ratio:.1f}x overall)")
+        )
+        if options.get("benchmark"):
+            self._benchmark(customer_id)
+
+    def _benchmark(self, customer_id: int | None) -> None:
+        snapshots = ConfigSnapshot.objects.all()
+        if customer_id:
+            snapshots = snapshots.filter(device__customer_id=customer_id)
+        blobs = ConfigBlob.objects.filter(hash__in=snapshots.values("blob_id"))
+        count = 0
+        elapsed = 0.0
+        for encoding, data in blobs.values_list("encoding", "data").iterator(chunk_size=200):
+            started = time.perf_counter()
+            decompress(encoding, data)
+            elapsed += time.perf_counter() - started
+            count += 1
+        per_blob = (elapsed / count * 1000) if count else 0
+        self.stdout.write(
+            f"Decompressed {count} blobs in {elapsed * 1000:.1f} ms ({per_blob:.3f} ms/blob)"
+        )
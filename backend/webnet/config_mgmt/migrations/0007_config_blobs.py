@@ -0,0 +1,101 @@
+# Generated by Django 5.2.18 on 2026-10-16 21:45
+
+import hashlib
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+
+def move_config_text_to_blobs(apps, schema_editor):
+    ConfigBlob = apps.get_model("config_mgmt", "ConfigBlob")
+    ConfigSnapshot = apps.get_model("config_mgmt", "ConfigSnapshot")
+
+    def flush(batch):
+        blobs = {}
+        for snapshot in batch:
+            text = snapshot.config_text or ""
+            digest = hashlib.sha256(text.encode()).hexdigest()
+            snapshot.hash = snapshot.hash or digest
+            snapshot.blob_id = digest
+            blobs.setdefault(digest, ConfigBlob(hash=digest, text=text, size=len(text.encode())))
+        ConfigBlob.objects.bulk_create(blobs.values(), ignore_conflicts=True)
+        ConfigSnapshot.objects.bulk_update(batch, ["hash", "blob"])
+
+    batch = []
+    snapshots = ConfigSnapshot.objects.only("id", "hash", "config_text").order_by("id")
+    for snapshot in snapshots.iterator(chunk_size=BATCH_SIZE):
+        batch.append(snapshot)
+        if len(batch) >= BATCH_SIZE:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+
+
+def restore_config_text(apps, schema_editor):
+    ConfigSnapshot = apps.get_model("config_mgmt", "ConfigSnapshot")
+    batch = []
+    snapshots = ConfigSnapshot.objects.select_related("blob").order_by("id")
+    for snapshot in snapshots.iterator(chunk_size=BATCH_SIZE):
+        snapshot.config_text = snapshot.blob.text if snapshot.blob_id else ""
+        batch.append(snapshot)
+        if len(batch) >= BATCH_SIZE:
+            ConfigSnapshot.objects.bulk_update(batch, ["config_text"])
+            batch = []
+    if batch:
+        ConfigSnapshot.objects.bulk_update(batch, ["config_text"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("config_mgmt", "0006_add_custom_fields"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ConfigBlob",
+            fields=[
+                ("hash", models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ("text", models.TextField()),
+                (
+                    "size",
+                    models.PositiveIntegerField(default=0, help_text="Config size in bytes"),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="configsnapshot",
+            name="blob",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="snapshots",
+                to="config_mgmt.configblob",
+            ),
+        ),
+        migrations.RunPython(move_config_text_to_blobs, restore_config_text),
+        migrations.RemoveField(
+            model_name="configsnapshot",
+            name="config_text",
+        ),
+        migrations.AlterField(
+            model_name="configsnapshot",
+            name="blob",
+            field=models.ForeignKey(
+                help_text="Config text, shared with other snapshots of identical content",
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="snapshots",
+                to="config_mgmt.configblob",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="configsnapshot",
+            index=models.Index(
+                fields=["device", "-created_at"], name="config_mgmt_device__141e55_idx"
+            ),
+        ),
+    ]
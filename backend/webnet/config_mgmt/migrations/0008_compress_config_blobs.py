@@ -0,0 +1,71 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:05
+
+from django.db import migrations, models
+
+from webnet.config_mgmt.compression import compress, decompress
+
+BATCH_SIZE = 200
+
+
+def compress_blobs(apps, schema_editor):
+    ConfigBlob = apps.get_model("config_mgmt", "ConfigBlob")
+    batch = []
+    for blob in ConfigBlob.objects.order_by("hash").iterator(chunk_size=BATCH_SIZE):
+        blob.encoding, blob.data = compress(blob.text or "")
+        blob.stored_size = len(blob.data)
+        batch.append(blob)
+        if len(batch) >= BATCH_SIZE:
+            ConfigBlob.objects.bulk_update(batch, ["data", "encoding", "stored_size"])
+            batch = []
+    if batch:
+        ConfigBlob.objects.bulk_update(batch, ["data", "encoding", "stored_size"])
+
+
+def decompress_blobs(apps, schema_editor):
+    ConfigBlob = apps.get_model("config_mgmt", "ConfigBlob")
+    batch = []
+    for blob in ConfigBlob.objects.order_by("hash").iterator(chunk_size=BATCH_SIZE):
+        blob.text = decompress(blob.encoding, blob.data)
+        batch.append(blob)
+        if len(batch) >= BATCH_SIZE:
+            ConfigBlob.objects.bulk_update(batch, ["text"])
+            batch = []
+    if batch:
+        ConfigBlob.objects.bulk_update(batch, ["text"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("config_mgmt", "0007_config_blobs"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="configblob",
+            name="data",
+            field=models.BinaryField(default=b""),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="configblob",
+            name="encoding",
+            field=models.CharField(
+                choices=[("none", "Uncompressed"), ("zlib", "zlib"), ("zstd", "zstd")],
+                default="none",
+                max_length=10,
+            ),
+        ),
+        migrations.AddField(
+            model_name="configblob",
+            name="stored_size",
+            field=models.PositiveIntegerField(
+                default=0, help_text="Stored (compressed) size in bytes"
+            ),
+        ),
+        migrations.RunPython(compress_blobs, decompress_blobs),
+        migrations.RemoveField(
+            model_name="configblob",
+            name="text",
+        ),
+    ]
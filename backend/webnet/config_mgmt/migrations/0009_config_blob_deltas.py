@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:40
+
+import json
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from webnet.config_mgmt.compression import compress, decompress
+from webnet.config_mgmt.deltas import apply_delta
+
+BATCH_SIZE = 200
+
+
+def keyframe_deltas(apps, schema_editor):
+    """Store every delta blob in full again so ``base`` can be dropped."""
+    ConfigBlob = apps.get_model("config_mgmt", "ConfigBlob")
+    deltas = ConfigBlob.objects.filter(base__isnull=False)
+    # A blob's base sits one level lower, so it is already a keyframe here
+    for depth in sorted(set(deltas.values_list("chain_depth", flat=True))):
+        hashes = list(
+            deltas.filter(chain_depth=depth).order_by("hash").values_list("hash", flat=True)
+        )
+        for start in range(0, len(hashes), BATCH_SIZE):
+            blobs = list(ConfigBlob.objects.filter(hash__in=hashes[start : start + BATCH_SIZE]))
+            bases = ConfigBlob.objects.in_bulk({blob.base_id for blob in blobs})
+            for blob in blobs:
+                base = bases[blob.base_id]
+                ops = json.loads(decompress(blob.encoding, blob.data))
+                text = apply_delta(decompress(base.encoding, base.data), ops)
+                blob.encoding, blob.data = compress(text)
+                blob.stored_size = len(blob.data)
+                blob.base = None
+                blob.chain_depth = 0
+            ConfigBlob.objects.bulk_update(
+                blobs, ["data", "encoding", "stored_size", "base", "chain_depth"]
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("config_mgmt", "0008_compress_config_blobs"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="configblob",
+            name="base",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="Blob this one is stored as a delta against (empty for keyframes)",
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="deltas",
+                to="config_mgmt.configblob",
+            ),
+        ),
+        migrations.AddField(
+            model_name="configblob",
+            name="chain_depth",
+            field=models.PositiveSmallIntegerField(
+                default=0, help_text="Number of deltas between this blob and its keyframe"
+            ),
+        ),
+        migrations.RunPython(migrations.RunPython.noop, keyframe_deltas),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("config_mgmt", "0009_config_blob_deltas"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="configdrift",
+            name="section_changes",
+            field=models.JSONField(
+                blank=True,
+                default=list,
+                help_text="Per-section changes: section, status, added and removed line counts",
+            ),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("config_mgmt", "0010_configdrift_section_changes"),
+        ("devices", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="configdrift",
+            index=models.Index(
+                fields=["device", "-detected_at"], name="config_mgmt_device__231ff9_idx"
+            ),
+        ),
+        migrations.CreateModel(
+            name="DriftDailySummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("day", models.DateField()),
+                (
+                    "drifts",
+                    models.PositiveIntegerField(default=0, help_text="Drift records for the day"),
+                ),
+                (
+                    "changed_drifts",
+                    models.PositiveIntegerField(
+                        default=0, help_text="Drift records with at least one changed line"
+                    ),
+                ),
+                ("additions", models.PositiveIntegerField(default=0)),
+                ("deletions", models.PositiveIntegerField(default=0)),
+                ("refreshed_at", models.DateTimeField(auto_now=True)),
+                (
+                    "device",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="drift_daily_summaries",
+                        to="devices.device",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-day"],
+                "indexes": [models.Index(fields=["day"], name="config_mgmt_day_bde3e9_idx")],
+                "unique_together": {("device", "day")},
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("config_mgmt", "0011_drift_daily_summary"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="gitrepository",
+            name="pending_snapshot_ids",
+            field=models.JSONField(
+                blank=True, default=list, help_text="Snapshots waiting for the next coalesced sync"
+            ),
+        ),
+        migrations.AddField(
+            model_name="gitrepository",
+            name="sync_pending_since",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="When the oldest pending snapshot was queued, null if none",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="gitrepository",
+            name="sync_started_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="When the running coalesced sync started (null when idle)",
+                null=True,
+            ),
+        ),
+    ]
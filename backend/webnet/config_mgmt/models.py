@@ -1,11 +1,14 @@
 import hashlib
 import ipaddress as ip_module
 import json
-from typing import Any
+from typing import Any, Iterable
 
+from django.conf import settings
 from django.db import models
 from django.core.validators import MinLengthValidator
 
+from webnet.config_mgmt.compression import ENCODING_CHOICES, ENCODING_NONE, compress, decompress
+from webnet.config_mgmt.deltas import Delta, apply_delta, make_delta
 from webnet.core.crypto import encrypt_text, decrypt_text
 from webnet.core.custom_fields import CustomFieldMixin
 
@@ -278,6 +281,21 @@ class GitRepository(models.Model):
         null=True,
         help_text="Message or error from last sync attempt",
     )
+    pending_snapshot_ids = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="Snapshots waiting for the next coalesced sync",
+    )
+    sync_pending_since = models.DateTimeField(
+        blank=True,
+        null=True,
+        help_text="When the oldest pending snapshot was queued, null if none",
+    )
+    sync_started_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        help_text="When the running coalesced sync started (null when idle)",
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -410,6 +428,170 @@ class GitSyncLog(models.Model):
         return f"Sync {self.id} for {self.repository_id} - {self.status}"
 
 
+def config_hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class ConfigBlob(models.Model):
+    """Content-addressed, compressed config text, stored once per sha256 hash.
+
+    Snapshots reference their blob instead of carrying the full text, so
+    backups that return an unchanged config cost a snapshot row, not a copy.
+    The body is only decompressed when ``text`` is read.
+
+    With ``CONFIG_DELTA_STORAGE`` enabled a blob may instead hold a line delta
+    against ``base`` (the device's previous config). Chains end at a full
+    keyframe and never exceed ``CONFIG_DELTA_MAX_CHAIN`` deltas, which bounds
+    reconstruction to that many delta applications.
+    """
+
+    hash = models.CharField(max_length=64, primary_key=True)
+    data = models.BinaryField()
+    encoding = models.CharField(max_length=10, choices=ENCODING_CHOICES, default=ENCODING_NONE)
+    size = models.PositiveIntegerField(default=0, help_text="Config size in bytes")
+    stored_size = models.PositiveIntegerField(
+        default=0, help_text="Stored (compressed) size in bytes"
+    )
+    base = models.ForeignKey(
+        "self",
+        on_delete=models.PROTECT,
+        related_name="deltas",
+        null=True,
+        blank=True,
+        help_text="Blob this one is stored as a delta against (empty for keyframes)",
+    )
+    chain_depth = models.PositiveSmallIntegerField(
+        default=0, help_text="Number of deltas between this blob and its keyframe"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"Blob {self.hash[:12]} ({self.size} bytes)"
+
+    @property
+    def is_delta(self) -> bool:
+        return self.base_id is not None
+
+    @property
+    def delta(self) -> Delta | None:
+        """Line delta against ``base``, or None for keyframes."""
+        if not self.is_delta:
+            return None
+        return json.loads(decompress(self.encoding, self.data))
+
+    @property
+    def text(self) -> str:
+        cached = self.__dict__.get("_text")
+        if cached is None:
+            cached = self._text = self._reconstruct()
+        return cached
+
+    def _reconstruct(self) -> str:
+        chain: list[ConfigBlob] = []
+        blob = self
+        while blob.is_delta and blob.__dict__.get("_text") is None:
+            chain.append(blob)
+            blob = blob.base
+        text = blob.__dict__.get("_text")
+        if text is None:
+            text = blob._text = decompress(blob.encoding, blob.data)
+        for link in reversed(chain):
+            text = link._text = apply_delta(text, link.delta)
+        return text
+
+    @classmethod
+    def load_texts(cls, hashes: Iterable[str]) -> dict[str, str]:
+        """Return ``{hash: text}`` for many blobs.
+
+        Blobs and their delta bases are fetched one chain level per query, so
+        the query count is bounded by chain depth, not by the number of blobs.
+        """
+        wanted = set(hashes)
+        blobs: dict[str, ConfigBlob] = {}
+        requested: set[str] = set()
+        missing = set(wanted)
+        while missing:
+            requested |= missing
+            fetched = cls.objects.filter(hash__in=missing).only(
+                "hash", "encoding", "data", "base_id"
+            )
+            blobs.update((blob.hash, blob) for blob in fetched)
+            missing = {
+                blob.base_id
+                for blob in blobs.values()
+                if blob.base_id and blob.base_id not in requested
+            }
+        for blob in blobs.values():
+            if blob.base_id in blobs:
+                # Wire up bases already in memory so reconstruction issues no queries
+                blob.base = blobs[blob.base_id]
+        return {digest: blobs[digest].text for digest in wanted if digest in blobs}
+
+    @classmethod
+    def store(cls, text: str, base: "ConfigBlob | None" = None) -> "ConfigBlob":
+        """Return the blob for ``text``, creating it only if the hash is new.
+
+        A new blob is stored as a delta against ``base`` when that keeps the
+        chain within ``CONFIG_DELTA_MAX_CHAIN``, is smaller than a keyframe and
+        replays to ``text`` exactly (changed line endings are stored in full).
+        """
+        digest = config_hash(text)
+        blob = cls.objects.filter(hash=digest).first()
+        if blob is None:
+            encoding, data = compress(text)
+            fields = {
+                "data": data,
+                "encoding": encoding,
+                "size": len(text.encode()),
+                "stored_size": len(data),
+            }
+            max_chain = getattr(settings, "CONFIG_DELTA_MAX_CHAIN", 50)
+            if base is not None and base.chain_depth < max_chain:
+                base_text = base.text
+                ops = make_delta(base_text, text)
+                delta_encoding, delta_data = compress(json.dumps(ops, separators=(",", ":")))
+                # Line-ending only changes cannot be replayed from a delta
+                if len(delta_data) < len(data) and apply_delta(base_text, ops) == text:
+                    fields.update(
+                        data=delta_data,
+                        encoding=delta_encoding,
+                        stored_size=len(delta_data),
+                        base=base,
+                        chain_depth=base.chain_depth + 1,
+                    )
+            blob, _ = cls.objects.get_or_create(hash=digest, defaults=fields)
+        blob._text = text
+        return blob
+
+    @classmethod
+    def storage_stats(cls, customer_id: int | None = None) -> dict[str, Any]:
+        """Report logical (per snapshot), unique and stored (compressed) config bytes."""
+        snapshots = ConfigSnapshot.objects.all()
+        if customer_id:
+            snapshots = snapshots.filter(device__customer_id=customer_id)
+        logical = snapshots.aggregate(count=models.Count("id"), total=models.Sum("blob__size"))
+        blobs = cls.objects.filter(hash__in=snapshots.values("blob_id"))
+        stored = blobs.aggregate(
+            count=models.Count("hash"),
+            deltas=models.Count("hash", filter=models.Q(base__isnull=False)),
+            unique=models.Sum("size"),
+            stored=models.Sum("stored_size"),
+        )
+        logical_bytes = logical["total"] or 0
+        unique_bytes = stored["unique"] or 0
+        stored_bytes = stored["stored"] or 0
+        return {
+            "snapshots": logical["count"],
+            "blobs": stored["count"],
+            "delta_blobs": stored["deltas"],
+            "logical_bytes": logical_bytes,
+            "unique_bytes": unique_bytes,
+            "stored_bytes": stored_bytes,
+            "saved_bytes": logical_bytes - stored_bytes,
+            "compression_ratio": round(unique_bytes / stored_bytes, 2) if stored_bytes else 0,
+        }
+
+
 class ConfigSnapshot(CustomFieldMixin, models.Model):
     device = models.ForeignKey(
         "devices.Device", on_delete=models.CASCADE, related_name="config_snapshots"
@@ -423,7 +605,12 @@ class ConfigSnapshot(CustomFieldMixin, models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
     source = models.CharField(max_length=50, default="manual")
-    config_text = models.TextField()
+    blob = models.ForeignKey(
+        ConfigBlob,
+        on_delete=models.PROTECT,
+        related_name="snapshots",
+        help_text="Config text, shared with other snapshots of identical content",
+    )
     hash = models.CharField(max_length=64, editable=False)
     # Git sync tracking
     git_synced = models.BooleanField(
@@ -448,17 +635,52 @@ class ConfigSnapshot(CustomFieldMixin, models.Model):
         indexes = [
             models.Index(fields=["device"]),
             models.Index(fields=["created_at"]),
+            models.Index(fields=["device", "-created_at"]),
         ]
         ordering = ["-created_at"]
 
     def __str__(self) -> str:  # pragma: no cover
         return f"Snapshot {self.id} for device {self.device_id}"
 
-    def save(self, *args, **kwargs):  # pragma: no cover - deterministic hashing
-        if self.config_text and not self.hash:
-            self.hash = hashlib.sha256(self.config_text.encode()).hexdigest()
+    @property
+    def config_text(self) -> str:
+        pending = self.__dict__.get("_pending_config_text")
+        if pending is not None:
+            return pending
+        return self.blob.text if self.blob_id else ""
+
+    @config_text.setter
+    def config_text(self, value: str | None) -> None:
+        value = value or ""
+        self._pending_config_text = value
+        # Keep an explicitly supplied hash; blobs are always keyed by content
+        if not self.hash or self.hash == self.blob_id:
+            self.hash = config_hash(value)
+
+    def save(self, *args, **kwargs):
+        pending = self.__dict__.pop("_pending_config_text", None)
+        if pending is not None:
+            self.blob = ConfigBlob.store(pending, base=self._delta_base())
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "blob", "hash"}
+        elif self.blob_id and not self.hash:
+            self.hash = self.blob_id
         super().save(*args, **kwargs)
 
+    def _delta_base(self) -> ConfigBlob | None:
+        """The device's latest stored config, used as delta base for a new blob."""
+        if not getattr(settings, "CONFIG_DELTA_STORAGE", False) or not self.device_id:
+            return None
+        previous = (
+            ConfigSnapshot.objects.filter(device_id=self.device_id)
+            .exclude(pk=self.pk)
+            .select_related("blob")
+            .order_by("-created_at", "-id")
+            .first()
+        )
+        return previous.blob if previous else None
+
 
 class ConfigDrift(models.Model):
     """Track configuration drift between consecutive snapshots."""
@@ -488,6 +710,11 @@ class ConfigDrift(models.Model):
     total_lines = models.IntegerField(default=0, help_text="Total lines in diff output")
     has_changes = models.BooleanField(default=False, help_text="Whether any changes were detected")
     diff_summary = models.TextField(blank=True, help_text="Summary of major changes")
+    section_changes = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="Per-section changes: section, status, added and removed line counts",
+    )
     triggered_by = models.ForeignKey(
         "users.User",
         on_delete=models.SET_NULL,
@@ -502,6 +729,7 @@ class ConfigDrift(models.Model):
             models.Index(fields=["device"]),
             models.Index(fields=["detected_at"]),
             models.Index(fields=["has_changes"]),
+            models.Index(fields=["device", "-detected_at"]),
         ]
         ordering = ["-detected_at"]
         unique_together = ("snapshot_from", "snapshot_to")
@@ -522,6 +750,41 @@ class ConfigDrift(models.Model):
             return "Major changes"
 
 
+class DriftDailySummary(models.Model):
+    """Per-device, per-day drift rollup backing fleet churn analytics.
+
+    Days are those of the newer snapshot in each drift, so backfilled drifts
+    land on the day the change was captured. Rows are refreshed
+    incrementally by ``DriftService.refresh_daily_summaries``.
+    """
+
+    device = models.ForeignKey(
+        "devices.Device", on_delete=models.CASCADE, related_name="drift_daily_summaries"
+    )
+    day = models.DateField()
+    drifts = models.PositiveIntegerField(default=0, help_text="Drift records for the day")
+    changed_drifts = models.PositiveIntegerField(
+        default=0, help_text="Drift records with at least one changed line"
+    )
+    additions = models.PositiveIntegerField(default=0)
+    deletions = models.PositiveIntegerField(default=0)
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["day"]),
+        ]
+        ordering = ["-day"]
+        unique_together = ("device", "day")
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"Drift summary for device {self.device_id} on {self.day}"
+
+    @property
+    def churn(self) -> int:
+        return self.additions + self.deletions
+
+
 class DriftAlert(models.Model):
     """Alert for unexpected configuration changes."""
 
@@ -0,0 +1,333 @@
+"""Section-aware structural diff for network device configs.
+
+Configs are parsed into a tree of blocks: indentation nesting for IOS,
+IOS-XE, NX-OS and EOS, braces for Junos (``set`` style Junos lines are
+grouped by their first two path elements). Every block carries a hash of its
+own line and all of its children, so two trees are compared top down and any
+section whose hash matches is skipped without looking inside it. Changes are
+reported per section, e.g. ``interface Gi0/1: 2 lines changed``.
+
+Indented configs are split lazily, one level at a time, with a regex over the
+raw text. When two versions of a section differ, the raw text of the children
+both versions share is discarded before any block is built, so a one-line
+change in a 100k-line ACL builds blocks for the changed lines only.
+
+The comparison is order-insensitive within a section, which is what matters
+for drift on most stanzas; ordered constructs such as ACL entries still
+show up as added/removed lines of their section.
+"""
+
+from __future__ import annotations
+
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Iterable
+
+GLOBAL_SECTION = "global"
+
+MAX_SAMPLE_LINES = 5
+
+_INDENT = re.compile(r"[ \t]*")
+
+# Sections whose changes warrant a higher alert severity
+SENSITIVE_SECTION_PREFIXES = (
+    "aaa",
+    "access-list",
+    "crypto",
+    "enable",
+    "ip access-list",
+    "ipv6 access-list",
+    "line vty",
+    "router",
+    "snmp-server",
+    "tacacs",
+    "radius",
+    "username",
+    "firewall",
+    "policy-options",
+    "protocols",
+    "security",
+    "system login",
+)
+
+
+class ConfigBlock:
+    """One config line plus the lines nested under it.
+
+    ``digest`` covers the line and every nested block and is only meaningful
+    within one process, which is all a comparison needs. Blocks of indented
+    configs are created from their raw text and hashed as a string; their
+    children are split out only if a comparison needs them.
+    """
+
+    __slots__ = ("line", "digest", "_children", "_raw", "_size")
+
+    def __init__(self, line: str, raw: str | None = None) -> None:
+        self.line = line
+        self.digest = hash(raw) if raw is not None else 0
+        self._children: list[ConfigBlock] | None = None if raw is not None else []
+        # Only read while children are unparsed, i.e. when raw was given
+        self._raw: str = raw or ""
+        self._size: int | None = None
+
+    @property
+    def children(self) -> list["ConfigBlock"]:
+        if self._children is None:
+            self._children = _blocks(_child_chunks(self._raw))
+        return self._children
+
+    @property
+    def size(self) -> int:
+        if self._size is None:
+            self._size = 1 + sum(child.size for child in self.children)
+        return self._size
+
+    def close(self) -> None:
+        """Compute ``digest`` from the line and, order-insensitively, the children."""
+        if not self._children:
+            self.digest = hash(self.line)
+        else:
+            self.digest = hash((self.line, tuple(sorted(c.digest for c in self._children))))
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"ConfigBlock({self.line!r})"
+
+
+@dataclass
+class SectionChange:
+    """Lines added/removed directly within one section."""
+
+    section: str
+    added: int = 0
+    removed: int = 0
+    status: str = "modified"  # modified, added or removed
+    lines: list[str] = field(default_factory=list)  # first few changed lines, +/- prefixed
+
+    def record(self, sign: str, line: str) -> None:
+        if sign == "+":
+            self.added += 1
+        else:
+            self.removed += 1
+        if len(self.lines) < MAX_SAMPLE_LINES:
+            self.lines.append(sign + line)
+
+    @property
+    def changed(self) -> int:
+        return self.added + self.removed
+
+    def describe(self) -> str:
+        if self.status != "modified":
+            return f"{self.section}: section {self.status} ({self.changed} lines)"
+        noun = "line" if self.changed == 1 else "lines"
+        return f"{self.section}: {self.changed} {noun} changed"
+
+    @property
+    def sensitive(self) -> bool:
+        return is_sensitive_section(self.section) or any(
+            is_sensitive_section(line[1:]) for line in self.lines
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "section": self.section,
+            "status": self.status,
+            "added": self.added,
+            "removed": self.removed,
+            "lines": self.lines,
+        }
+
+
+@dataclass
+class StructuralDiff:
+    changes: list[SectionChange]
+
+    @property
+    def additions(self) -> int:
+        return sum(change.added for change in self.changes)
+
+    @property
+    def deletions(self) -> int:
+        return sum(change.removed for change in self.changes)
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.changes)
+
+    def sensitive_changes(self) -> list[SectionChange]:
+        return [change for change in self.changes if change.sensitive]
+
+    def summary(self, limit: int = 5) -> str:
+        if not self.changes:
+            return "No changes detected"
+        ranked = sorted(self.changes, key=lambda change: -change.changed)
+        text = "; ".join(change.describe() for change in ranked[:limit])
+        if len(ranked) > limit:
+            text += f"; {len(ranked) - limit} more sections changed"
+        return text
+
+
+def is_sensitive_section(section: str) -> bool:
+    top = section.split(" > ", 1)[0].lower()
+    return top.startswith(SENSITIVE_SECTION_PREFIXES)
+
+
+def _is_junos(lines: list[str], platform: str | None) -> bool:
+    if platform and "junos" in platform.lower():
+        return True
+    return any(line.rstrip().endswith("{") or line.startswith("set ") for line in lines[:200])
+
+
+@lru_cache(maxsize=None)
+def _child_split(indent: int) -> re.Pattern[str]:
+    # A child starts at every line indented no deeper than the first child;
+    # "!" separators stay with the child above
+    return re.compile(rf"\n(?=[ \t]{{0,{indent}}}[^\s!])")
+
+
+def _child_chunks(raw: str) -> list[str]:
+    """Split the lines below ``raw``'s first line into one raw chunk per child."""
+    newline = raw.find("\n")
+    if newline < 0:
+        return []
+    for line in raw[newline + 1 :].split("\n", 8):
+        stripped = line.strip()
+        if stripped and stripped[0] != "!":
+            indent = _INDENT.match(line).end()  # type: ignore[union-attr]
+            break
+    else:
+        indent = 0
+    return _child_split(indent).split(raw[newline:])[1:]
+
+
+def _blocks(chunks: Iterable[str], skip: Counter[str] | None = None) -> list[ConfigBlock]:
+    """Blocks for raw chunks, leaving out comments and chunks counted in ``skip``."""
+    blocks = []
+    for chunk in chunks:
+        if skip and skip[chunk]:
+            skip[chunk] -= 1
+            continue
+        header = chunk.split("\n", 1)[0].strip()
+        if header and header[0] != "!" and header != "end":
+            blocks.append(ConfigBlock(header, raw=chunk))
+    return blocks
+
+
+def _parse_junos(lines: Iterable[str], root: ConfigBlock) -> None:
+    stack = [root]
+    sections: dict[str, ConfigBlock] = {}
+    for raw in lines:
+        stripped = raw.strip()
+        if not stripped or stripped.startswith(("#", "/*")):
+            continue
+        if stripped.startswith("set "):
+            # Flat "set" syntax: group by the first two path elements
+            words = stripped.split()
+            key = " ".join(words[1:3])
+            section = sections.get(key)
+            if section is None:
+                section = sections[key] = ConfigBlock(key)
+                root.children.append(section)
+            leaf = ConfigBlock(" ".join(words[3:]) or stripped)
+            leaf.close()
+            section.children.append(leaf)
+        elif stripped == "}":
+            if len(stack) > 1:
+                stack.pop().close()
+        elif stripped.endswith("{"):
+            block = ConfigBlock(stripped[:-1].strip())
+            stack[-1].children.append(block)
+            stack.append(block)
+        else:
+            leaf = ConfigBlock(stripped.rstrip(";"))
+            leaf.close()
+            stack[-1].children.append(leaf)
+    for section in sections.values():
+        section.close()
+    while stack:
+        stack.pop().close()
+
+
+def parse_config(text: str, platform: str | None = None) -> ConfigBlock:
+    """Parse config text into a hashed block tree rooted at a synthetic block."""
+    head = text[:20000].splitlines()
+    if _is_junos(head, platform):
+        root = ConfigBlock("")
+        _parse_junos(text.splitlines(), root)
+        return root
+    if "\r" in text:
+        text = text.replace("\r\n", "\n")
+    # The root's first line is empty, so every config line is one of its children
+    return ConfigBlock("", raw="\n" + text)
+
+
+def _unshared_children(
+    a: ConfigBlock, b: ConfigBlock
+) -> tuple[list[ConfigBlock], list[ConfigBlock]]:
+    """Children of ``a`` and ``b``, minus those both hold with identical text."""
+    if a._children is not None or b._children is not None:
+        return a.children, b.children
+    a_chunks, b_chunks = _child_chunks(a._raw), _child_chunks(b._raw)
+    a_set, b_set = set(a_chunks), set(b_chunks)
+    if len(a_set) == len(a_chunks) and len(b_set) == len(b_chunks):
+        a_only = [chunk for chunk in a_chunks if chunk not in b_set]
+        b_only = [chunk for chunk in b_chunks if chunk not in a_set]
+        return _blocks(a_only), _blocks(b_only)
+    # Repeated children are matched by count
+    shared = Counter(a_chunks) & Counter(b_chunks)
+    return _blocks(a_chunks, shared.copy()), _blocks(b_chunks, shared)
+
+
+def _keyed(children: list[ConfigBlock]) -> dict[tuple[str, int], ConfigBlock]:
+    # Repeated identical lines in one section are told apart by occurrence
+    seen: dict[str, int] = defaultdict(int)
+    keyed = {}
+    for child in children:
+        keyed[(child.line, seen[child.line])] = child
+        seen[child.line] += 1
+    return keyed
+
+
+def diff_trees(old: ConfigBlock, new: ConfigBlock) -> StructuralDiff:
+    """Compare two block trees, skipping every subtree whose hash matches."""
+    changes: list[SectionChange] = []
+    stack: list[tuple[str, ConfigBlock, ConfigBlock]] = [("", old, new)]
+    while stack:
+        path, a, b = stack.pop()
+        if a.digest == b.digest:
+            continue
+        local = SectionChange(path or GLOBAL_SECTION)
+        a_unshared, b_unshared = _unshared_children(a, b)
+        a_children, b_children = _keyed(a_unshared), _keyed(b_unshared)
+        for key, child in a_children.items():
+            other = b_children.get(key)
+            if other is None:
+                if child.children:
+                    changes.append(
+                        SectionChange(_join(path, child.line), removed=child.size, status="removed")
+                    )
+                else:
+                    local.record("-", child.line)
+            elif other.digest != child.digest:
+                stack.append((_join(path, child.line), child, other))
+        for key, child in b_children.items():
+            if key in a_children:
+                continue
+            if child.children:
+                changes.append(
+                    SectionChange(_join(path, child.line), added=child.size, status="added")
+                )
+            else:
+                local.record("+", child.line)
+        if local.changed:
+            changes.append(local)
+    return StructuralDiff(changes)
+
+
+def _join(path: str, line: str) -> str:
+    return f"{path} > {line}" if path else line
+
+
+def structural_diff(old_text: str, new_text: str, platform: str | None = None) -> StructuralDiff:
+    return diff_trees(parse_config(old_text, platform), parse_config(new_text, platform))
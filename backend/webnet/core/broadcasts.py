@@ -72,6 +72,23 @@ def broadcast_job_update(job, action: str = "updated") -> None:
     )
 
 
+def broadcast_job_progress(job, *, completed: int, total: int, failed: int = 0) -> None:
+    """Convenience function to broadcast per-host job progress."""
+    broadcast_entity_update(
+        entity="job",
+        action="progress",
+        entity_id=job.id,
+        customer_id=job.customer_id,
+        extra={
+            "status": job.status,
+            "job_type": job.type,
+            "completed": completed,
+            "total": total,
+            "failed": failed,
+        },
+    )
+
+
 def broadcast_device_update(device, action: str = "updated") -> None:
     """Convenience function to broadcast device updates."""
     broadcast_entity_update(
@@ -7,20 +7,28 @@ plaintext storage.
 
 from __future__ import annotations
 
+from functools import lru_cache
+
 from cryptography.fernet import Fernet, InvalidToken
 from django.conf import settings
 
 
-def _get_fernet() -> Fernet:
-    key = getattr(settings, "ENCRYPTION_KEY", None) or getattr(settings, "encryption_key", None)
-    if not key:
-        raise RuntimeError("ENCRYPTION_KEY is required for credential encryption")
+@lru_cache(maxsize=4)
+def _fernet_for_key(key: str | bytes) -> Fernet:
     try:
         return Fernet(key.encode() if isinstance(key, str) else key)
     except Exception as exc:  # pragma: no cover - defensive
         raise RuntimeError("Invalid ENCRYPTION_KEY provided") from exc
 
 
+def _get_fernet() -> Fernet:
+    key = getattr(settings, "ENCRYPTION_KEY", None) or getattr(settings, "encryption_key", None)
+    if not key:
+        raise RuntimeError("ENCRYPTION_KEY is required for credential encryption")
+    # Keyed on the key itself so a rotated/overridden ENCRYPTION_KEY is honoured
+    return _fernet_for_key(key)
+
+
 def encrypt_text(value: str | None) -> str:
     if value is None:
         return ""
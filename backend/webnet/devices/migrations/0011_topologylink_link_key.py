@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("devices", "0010_add_device_geolocation"),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name="topologylink",
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name="topologylink",
+            constraint=models.UniqueConstraint(
+                fields=(
+                    "customer",
+                    "local_device",
+                    "local_interface",
+                    "remote_hostname",
+                    "remote_interface",
+                ),
+                name="devices_topologylink_link_key",
+            ),
+        ),
+    ]
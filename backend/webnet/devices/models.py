@@ -336,26 +336,9 @@ class DeviceGroup(CustomFieldMixin, models.Model):
             return self.devices.all()
 
         # Dynamic group - apply filter rules
-        qs = Device.objects.filter(customer=self.customer, enabled=True)
-        if not self.filter_rules:
-            return qs
-
-        rules = self.filter_rules
-        if rules.get("vendor"):
-            qs = qs.filter(vendor__iexact=rules["vendor"])
-        if rules.get("platform"):
-            qs = qs.filter(platform__iexact=rules["platform"])
-        if rules.get("site"):
-            qs = qs.filter(site__iexact=rules["site"])
-        if rules.get("role"):
-            qs = qs.filter(role__iexact=rules["role"])
-        if rules.get("tags"):
-            tag_names = rules["tags"]
-            qs = qs.filter(device_tags__name__in=tag_names)
-        if rules.get("hostname_contains"):
-            qs = qs.filter(hostname__icontains=rules["hostname_contains"])
-
-        return qs.distinct()
+        from webnet.devices.targeting import filter_devices
+
+        return filter_devices(self.filter_rules, customer_id=self.customer_id, allow_groups=False)
 
     @property
     def device_count(self) -> int:
@@ -551,13 +534,19 @@ class TopologyLink(models.Model):
     job_id = models.IntegerField(blank=True, null=True)
 
     class Meta:
-        unique_together = (
-            "customer",
-            "local_device",
-            "local_interface",
-            "remote_hostname",
-            "remote_interface",
-        )
+        # The link key; topology discovery upserts links on it
+        constraints = [
+            models.UniqueConstraint(
+                fields=[
+                    "customer",
+                    "local_device",
+                    "local_interface",
+                    "remote_hostname",
+                    "remote_interface",
+                ],
+                name="devices_topologylink_link_key",
+            )
+        ]
         indexes = [
             models.Index(fields=["local_device"]),
             models.Index(fields=["remote_device"]),
@@ -0,0 +1,123 @@
+"""Device target resolution shared by jobs, region routing, inventories and groups.
+
+A target spec is a dict of filters (``device_ids``, ``vendor``, ``platform``,
+``site``, ``role``, ``hostname``, ``hostname_contains``, ``tags``,
+``group_ids``). String filters match case-insensitively; all filters must
+match. Jobs resolve their spec to a device ID list once and cache it on
+``Job.target_device_ids`` so routing, inventory building and result
+processing all work from the same set without re-querying.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Iterable
+
+from django.db.models import Q, QuerySet
+
+from webnet.devices.models import Device, DeviceGroup
+
+TARGET_FILTER_KEYS = (
+    "device_ids",
+    "vendor",
+    "platform",
+    "site",
+    "role",
+    "hostname",
+    "hostname_contains",
+    "tags",
+    "group_ids",
+)
+
+_IEXACT_FIELDS = ("vendor", "platform", "site", "role", "hostname")
+
+
+def _as_list(value: Any) -> list:
+    if isinstance(value, (list, tuple, set)):
+        return list(value)
+    return [value]
+
+
+def compile_targets(
+    filters: dict | None, *, customer_id: int | None = None, allow_groups: bool = True
+) -> Q:
+    """Compile a target spec into a single ``Q`` object over ``Device``."""
+    q = Q()
+    if not filters:
+        return q
+    if filters.get("device_ids"):
+        q &= Q(id__in=_as_list(filters["device_ids"]))
+    for field in _IEXACT_FIELDS:
+        if filters.get(field):
+            q &= Q(**{f"{field}__iexact": filters[field]})
+    if filters.get("hostname_contains"):
+        q &= Q(hostname__icontains=filters["hostname_contains"])
+    if filters.get("tags"):
+        q &= Q(device_tags__name__in=_as_list(filters["tags"]))
+    if allow_groups and filters.get("group_ids"):
+        groups = DeviceGroup.objects.filter(id__in=_as_list(filters["group_ids"]))
+        if customer_id:
+            groups = groups.filter(customer_id=customer_id)
+        members: set[int] = set()
+        for group in groups:
+            members.update(group.get_devices().values_list("id", flat=True))
+        q &= Q(id__in=members)
+    return q
+
+
+def filter_devices(
+    filters: dict | None = None,
+    customer_id: int | None = None,
+    *,
+    enabled_only: bool = True,
+    allow_groups: bool = True,
+) -> QuerySet:
+    """Return devices matching a target spec, scoped to a customer if given."""
+    qs = Device.objects.all()
+    if enabled_only:
+        qs = qs.filter(enabled=True)
+    if customer_id:
+        qs = qs.filter(customer_id=customer_id)
+    q = compile_targets(filters, customer_id=customer_id, allow_groups=allow_groups)
+    if not q:
+        return qs
+    qs = qs.filter(q)
+    # Only the tag join can produce duplicate rows
+    return qs.distinct() if filters and filters.get("tags") else qs
+
+
+def devices_by_ids(device_ids: Iterable[int], customer_id: int | None = None) -> QuerySet:
+    """Return enabled devices from an already resolved ID list."""
+    qs = Device.objects.filter(id__in=list(device_ids), enabled=True)
+    if customer_id:
+        qs = qs.filter(customer_id=customer_id)
+    return qs
+
+
+def resolve_device_ids(filters: dict | None, customer_id: int | None = None) -> list[int]:
+    return list(filter_devices(filters, customer_id).order_by("id").values_list("id", flat=True))
+
+
+def job_target_filters(job: Any) -> dict:
+    """Return a job's target spec.
+
+    Supports both nested ``{"filters": {...}}`` and flat target summaries
+    (compliance jobs store ``policy.scope_json`` directly).
+    """
+    summary = job.target_summary_json or {}
+    filters = summary.get("filters")
+    if filters is None:
+        filters = {k: v for k, v in summary.items() if k in TARGET_FILTER_KEYS}
+    return filters or {}
+
+
+def resolve_job_device_ids(job: Any, filters: dict | None = None) -> list[int]:
+    """Resolve a job's targets to device IDs once and cache them on the job row."""
+    if job.target_device_ids is not None:
+        return list(job.target_device_ids)
+    if filters is None:
+        filters = job_target_filters(job)
+    device_ids = resolve_device_ids(filters, job.customer_id)
+    job.target_device_ids = device_ids
+    if job.pk:
+        type(job).objects.filter(pk=job.pk).update(target_device_ids=device_ids)
+    return device_ids
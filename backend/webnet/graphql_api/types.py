@@ -169,18 +169,20 @@ class JobLogType:
     extra_json: auto
 
 
-@strawberry_django_type(
-    ConfigSnapshot, fields=["id", "created_at", "source", "config_text", "hash"]
-)
+@strawberry_django_type(ConfigSnapshot, fields=["id", "created_at", "source", "hash"])
 class ConfigSnapshotType:
     """Configuration snapshot."""
 
     id: auto
     created_at: auto
     source: auto
-    config_text: auto
     hash: auto
 
+    @strawberry_django.field
+    def config_text(self, info) -> str:
+        """Full configuration text (stored in a shared content-addressed blob)."""
+        return self.config_text
+
     @strawberry_django.field
     def device(self, info) -> DeviceType:
         """Device this snapshot belongs to."""
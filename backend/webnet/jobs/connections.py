@@ -0,0 +1,251 @@
+"""Worker-local pool of live device connections shared across job tasks.
+
+Every job builds a fresh Nornir inventory, so without a pool each job logs in
+to every device again (often several seconds per login on older platforms).
+``ConnectionPool`` keeps the netmiko/napalm connection plugins a run opened
+and hands them to the next run that targets the same device with the same
+credential. Connections are leased exclusively, health-checked on checkout,
+closed after ``CONNECTION_POOL_IDLE_TTL`` seconds idle and dropped as soon as
+the device's address, platform or credential no longer match.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Iterator
+
+from django.conf import settings
+from prometheus_client import Counter
+
+logger = logging.getLogger(__name__)
+
+POOL_EVENTS = Counter(
+    "webnet_connection_pool_events_total",
+    "Device connection pool events (hit, miss, stale, expired, evicted, invalidated)",
+    labelnames=("event",),
+)
+
+PoolKey = tuple[int, int | None]
+
+
+@dataclass
+class _PooledConnections:
+    fingerprint: str
+    connections: dict[str, Any]
+    last_used: float = field(default_factory=time.monotonic)
+
+
+def _host_extras(host: Any) -> dict:
+    for attr in ("extras", "data"):
+        data = getattr(host, attr, None)
+        if isinstance(data, dict) and data:
+            return data
+    return {}
+
+
+def _pool_key(host: Any) -> PoolKey | None:
+    extras = _host_extras(host)
+    device_id = extras.get("device_id")
+    if device_id is None:
+        return None
+    return (device_id, extras.get("credential_id"))
+
+
+def _fingerprint(host: Any) -> str:
+    parts = (
+        getattr(host, "hostname", None),
+        getattr(host, "platform", None),
+        getattr(host, "username", None),
+        getattr(host, "password", None),
+    )
+    return hashlib.sha256("\x00".join(str(p) for p in parts).encode()).hexdigest()
+
+
+def _is_alive(connection: Any) -> bool:
+    """Best-effort liveness check for netmiko and napalm connection plugins."""
+    conn = getattr(connection, "connection", None)
+    if conn is None:
+        return False
+    check = getattr(conn, "is_alive", None)
+    if check is None:
+        return True
+    try:
+        alive = check()
+    except Exception:
+        return False
+    if isinstance(alive, dict):  # napalm returns {"is_alive": bool}
+        return bool(alive.get("is_alive"))
+    return bool(alive)
+
+
+def _close(connections: dict[str, Any]) -> None:
+    for name, connection in connections.items():
+        try:
+            connection.close()
+        except Exception:  # pragma: no cover - closing a dead session
+            logger.debug("Error closing pooled %s connection", name, exc_info=True)
+
+
+class ConnectionPool:
+    """Pool of idle Nornir connection plugins keyed by (device_id, credential_id)."""
+
+    def __init__(
+        self,
+        *,
+        idle_ttl: float | None = None,
+        max_per_host: int | None = None,
+        enabled: bool | None = None,
+    ) -> None:
+        # Unset values are read from settings on use so overrides apply at runtime
+        self._idle_ttl = idle_ttl
+        self._max_per_host = max_per_host
+        self._enabled = enabled
+        self._idle: dict[PoolKey, list[_PooledConnections]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def idle_ttl(self) -> float:
+        if self._idle_ttl is not None:
+            return self._idle_ttl
+        return getattr(settings, "CONNECTION_POOL_IDLE_TTL", 300)
+
+    @property
+    def max_per_host(self) -> int:
+        if self._max_per_host is not None:
+            return self._max_per_host
+        return getattr(settings, "CONNECTION_POOL_MAX_PER_HOST", 1)
+
+    @property
+    def enabled(self) -> bool:
+        if self._enabled is not None:
+            return self._enabled
+        return getattr(settings, "CONNECTION_POOL_ENABLED", True)
+
+    def checkout(self, host: Any) -> None:
+        """Attach a live pooled connection set to ``host`` if one is available."""
+        key = _pool_key(host)
+        host_connections = getattr(host, "connections", None)
+        if not self.enabled or key is None or host_connections is None:
+            return
+        fingerprint = _fingerprint(host)
+        discard: list[dict[str, Any]] = []
+        entry = None
+        with self._lock:
+            self._expire_locked(discard)
+            candidates = self._idle.get(key, [])
+            while candidates:
+                candidate = candidates.pop()
+                if candidate.fingerprint == fingerprint:
+                    entry = candidate
+                    break
+                POOL_EVENTS.labels(event="stale").inc()
+                discard.append(candidate.connections)
+            if not candidates:
+                self._idle.pop(key, None)
+        _close_all(discard)
+        if entry is None:
+            POOL_EVENTS.labels(event="miss").inc()
+            return
+        alive = {name: conn for name, conn in entry.connections.items() if _is_alive(conn)}
+        _close({name: conn for name, conn in entry.connections.items() if name not in alive})
+        if not alive:
+            POOL_EVENTS.labels(event="miss").inc()
+            return
+        POOL_EVENTS.labels(event="hit").inc()
+        for name, conn in alive.items():
+            host_connections[name] = conn
+
+    def release(self, host: Any) -> None:
+        """Detach ``host``'s open connections and keep them for the next run."""
+        host_connections = getattr(host, "connections", None)
+        if not host_connections:
+            return
+        connections = dict(host_connections)
+        host_connections.clear()
+        key = _pool_key(host)
+        if not self.enabled or key is None or self.max_per_host < 1:
+            _close(connections)
+            return
+        evicted: list[dict[str, Any]] = []
+        with self._lock:
+            entries = self._idle.setdefault(key, [])
+            entries.append(_PooledConnections(_fingerprint(host), connections))
+            while len(entries) > self.max_per_host:
+                POOL_EVENTS.labels(event="evicted").inc()
+                evicted.append(entries.pop(0).connections)
+        _close_all(evicted)
+
+    @contextmanager
+    def lease(self, hosts: Iterable[Any]) -> Iterator[None]:
+        """Check out pooled connections for ``hosts`` and release them afterwards."""
+        hosts = list(hosts)
+        for host in hosts:
+            try:
+                self.checkout(host)
+            except Exception:  # the host just opens a new session
+                logger.warning("Failed to check out connections for %s", host, exc_info=True)
+        try:
+            yield
+        finally:
+            for host in hosts:
+                try:
+                    self.release(host)
+                except Exception:  # pragma: no cover - never fail a job on pool upkeep
+                    logger.warning("Failed to return connections for %s", host, exc_info=True)
+
+    def invalidate(self, *, device_id: int | None = None, credential_id: int | None = None) -> None:
+        """Close pooled connections for a device and/or credential (e.g. after edits)."""
+        dropped: list[dict[str, Any]] = []
+        with self._lock:
+            for key in list(self._idle):
+                if (device_id is not None and key[0] == device_id) or (
+                    credential_id is not None and key[1] == credential_id
+                ):
+                    dropped.extend(entry.connections for entry in self._idle.pop(key))
+        if dropped:
+            POOL_EVENTS.labels(event="invalidated").inc(len(dropped))
+        _close_all(dropped)
+
+    def expire(self) -> None:
+        """Close connections idle for longer than ``idle_ttl``."""
+        expired: list[dict[str, Any]] = []
+        with self._lock:
+            self._expire_locked(expired)
+        _close_all(expired)
+
+    def close_all(self) -> None:
+        with self._lock:
+            entries = [entry.connections for group in self._idle.values() for entry in group]
+            self._idle.clear()
+        _close_all(entries)
+
+    def size(self) -> int:
+        with self._lock:
+            return sum(len(group) for group in self._idle.values())
+
+    def _expire_locked(self, out: list[dict[str, Any]]) -> None:
+        cutoff = time.monotonic() - self.idle_ttl
+        for key in list(self._idle):
+            group = self._idle[key]
+            fresh = [entry for entry in group if entry.last_used >= cutoff]
+            for entry in group:
+                if entry.last_used < cutoff:
+                    POOL_EVENTS.labels(event="expired").inc()
+                    out.append(entry.connections)
+            if fresh:
+                self._idle[key] = fresh
+            else:
+                del self._idle[key]
+
+
+def _close_all(groups: Iterable[dict[str, Any]]) -> None:
+    for connections in groups:
+        _close(connections)
+
+
+connection_pool = ConnectionPool()
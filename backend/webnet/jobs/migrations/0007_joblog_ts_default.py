@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:43
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobs", "0006_merge_20251202_1458"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="joblog",
+            name="ts",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-16 21:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobs", "0007_joblog_ts_default"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="job",
+            name="target_device_ids",
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from webnet.core.custom_fields import CustomFieldMixin
 
 
@@ -97,6 +98,8 @@ class Job(CustomFieldMixin, models.Model):
     started_at = models.DateTimeField(blank=True, null=True)
     finished_at = models.DateTimeField(blank=True, null=True)
     target_summary_json = models.JSONField(blank=True, null=True)
+    # Device IDs the targets resolved to, cached once per job (see devices.targeting)
+    target_device_ids = models.JSONField(blank=True, null=True)
     result_summary_json = models.JSONField(blank=True, null=True)
     payload_json = models.JSONField(blank=True, null=True)
 
@@ -121,7 +124,9 @@ class JobLog(models.Model):
         ("ERROR", "ERROR"),
     )
     job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name="logs")
-    ts = models.DateTimeField(auto_now_add=True)
+    # Stamped when the entry is produced (not when it is written) so buffered
+    # entries keep their real order after a batched insert.
+    ts = models.DateTimeField(default=timezone.now)
     level = models.CharField(max_length=10, choices=LEVEL_CHOICES)
     host = models.CharField(max_length=255, blank=True, null=True)
     message = models.TextField()
@@ -0,0 +1,202 @@
+"""Runner policy for Nornir job execution.
+
+Nornir's ``ThreadedRunner`` uses a fixed worker count and submits every host
+at once. ``PolicyRunner`` adds what large fleets need on top of that: the
+worker count comes from a ``RunnerPolicy`` resolved per job, hosts can be
+processed in bounded chunks, and a per-site cap keeps a single WAN link from
+being hit by every worker at once. Runner activity is exported as Prometheus
+metrics so worker pools can be sized from real data.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass, replace
+from typing import Any, Iterable
+
+from django.conf import settings
+from prometheus_client import Counter, Gauge, Histogram
+
+try:  # pragma: no cover - optional dependency
+    from nornir.core.task import AggregatedResult
+except ImportError:  # pragma: no cover - fallback for tests
+
+    class AggregatedResult(dict):  # type: ignore
+        def __init__(self, name: str, **kwargs: Any) -> None:
+            self.name = name
+            super().__init__(**kwargs)
+
+
+RUNNER_WORKERS = Gauge(
+    "webnet_nornir_runner_workers",
+    "Worker threads configured for the most recent Nornir run",
+    labelnames=("job_type",),
+)
+
+HOSTS_IN_FLIGHT = Gauge(
+    "webnet_nornir_hosts_in_flight",
+    "Hosts currently executing a Nornir task",
+    labelnames=("job_type",),
+)
+
+HOST_TASK_DURATION = Histogram(
+    "webnet_nornir_host_task_duration_seconds",
+    "Time spent running a Nornir task against one host",
+    labelnames=("job_type",),
+    buckets=(0.5, 1, 2, 5, 10, 30, 60, 120, 300),
+)
+
+SITE_SLOT_WAIT = Histogram(
+    "webnet_nornir_site_slot_wait_seconds",
+    "Time a host waited for a free per-site concurrency slot",
+    labelnames=("job_type",),
+    buckets=(0, 0.1, 0.5, 1, 5, 10, 30, 60, 300),
+)
+
+HOST_TASKS_TOTAL = Counter(
+    "webnet_nornir_host_tasks_total",
+    "Nornir host task executions",
+    labelnames=("job_type", "status"),
+)
+
+_POLICY_FIELDS = ("num_workers", "chunk_size", "per_site_limit")
+
+
+@dataclass(frozen=True)
+class RunnerPolicy:
+    """Concurrency settings for one Nornir run.
+
+    ``chunk_size`` and ``per_site_limit`` of ``None`` mean unbounded.
+    """
+
+    num_workers: int = 20
+    chunk_size: int | None = None
+    per_site_limit: int | None = None
+
+    def merged(self, overrides: dict | None) -> "RunnerPolicy":
+        """Return a copy with any valid positive integer overrides applied."""
+        if not isinstance(overrides, dict):
+            return self
+        changes: dict[str, Any] = {}
+        for field in _POLICY_FIELDS:
+            if field not in overrides:
+                continue
+            try:
+                value = int(overrides[field])
+            except (TypeError, ValueError):
+                continue
+            if field == "num_workers":
+                if value > 0:
+                    changes[field] = value
+            else:
+                changes[field] = value if value > 0 else None
+        return replace(self, **changes) if changes else self
+
+
+def default_runner_policy() -> RunnerPolicy:
+    return RunnerPolicy().merged(
+        {
+            "num_workers": getattr(settings, "NORNIR_NUM_WORKERS", 20),
+            "chunk_size": getattr(settings, "NORNIR_CHUNK_SIZE", 0),
+            "per_site_limit": getattr(settings, "NORNIR_PER_SITE_LIMIT", 0),
+        }
+    )
+
+
+def resolve_runner_policy(job: Any = None) -> RunnerPolicy:
+    """Resolve the runner policy for a job.
+
+    Later sources override earlier ones: settings defaults, the job type entry
+    in ``NORNIR_RUNNER_BY_JOB_TYPE``, the job region's
+    ``worker_pool_config["nornir"]`` and finally ``payload_json["runner"]``.
+    """
+    policy = default_runner_policy()
+    if job is None:
+        return policy
+    by_type = getattr(settings, "NORNIR_RUNNER_BY_JOB_TYPE", {}) or {}
+    policy = policy.merged(by_type.get(getattr(job, "type", None)))
+    region = getattr(job, "region", None) if getattr(job, "region_id", None) else None
+    if region is not None:
+        policy = policy.merged((region.worker_pool_config or {}).get("nornir"))
+    return policy.merged((getattr(job, "payload_json", None) or {}).get("runner"))
+
+
+def _host_site(host: Any) -> str | None:
+    for attr in ("extras", "data"):
+        data = getattr(host, attr, None)
+        if isinstance(data, dict) and data.get("site"):
+            return str(data["site"])
+    return None
+
+
+def interleave_by_site(hosts: Iterable[Any]) -> list[Any]:
+    """Order hosts round-robin across sites so workers spread over WAN links."""
+    by_site: dict[str | None, list[Any]] = defaultdict(list)
+    for host in hosts:
+        by_site[_host_site(host)].append(host)
+    queues = list(by_site.values())
+    ordered: list[Any] = []
+    for i in range(max((len(q) for q in queues), default=0)):
+        ordered.extend(q[i] for q in queues if i < len(q))
+    return ordered
+
+
+class PolicyRunner:
+    """Nornir runner applying a ``RunnerPolicy`` (workers, chunking, per-site cap)."""
+
+    def __init__(self, policy: RunnerPolicy | None = None, job_type: str = "") -> None:
+        self.policy = policy or default_runner_policy()
+        self.job_type = job_type or "unknown"
+
+    @property
+    def num_workers(self) -> int:
+        return self.policy.num_workers
+
+    def run(self, task: Any, hosts: list[Any]) -> AggregatedResult:
+        result = AggregatedResult(task.name)
+        ordered = interleave_by_site(hosts)
+        chunk_size = self.policy.chunk_size or len(ordered) or 1
+        site_slots: dict[str | None, threading.Semaphore] = {}
+        if self.policy.per_site_limit:
+            for host in ordered:
+                site = _host_site(host)
+                if site is not None and site not in site_slots:
+                    site_slots[site] = threading.Semaphore(self.policy.per_site_limit)
+        RUNNER_WORKERS.labels(job_type=self.job_type).set(self.policy.num_workers)
+        with ThreadPoolExecutor(self.policy.num_workers) as pool:
+            for start in range(0, len(ordered), chunk_size):
+                chunk = ordered[start : start + chunk_size]
+                futures = [
+                    pool.submit(self._start, task, host, site_slots.get(_host_site(host)))
+                    for host in chunk
+                ]
+                for host, future in zip(chunk, futures):
+                    result[host.name] = future.result()
+        return result
+
+    def _start(self, task: Any, host: Any, slot: threading.Semaphore | None) -> Any:
+        waited = time.monotonic()
+        with slot if slot is not None else nullcontext():
+            if slot is not None:
+                SITE_SLOT_WAIT.labels(job_type=self.job_type).observe(time.monotonic() - waited)
+            in_flight = HOSTS_IN_FLIGHT.labels(job_type=self.job_type)
+            in_flight.inc()
+            started = time.monotonic()
+            try:
+                multi_result = task.copy().start(host)
+            finally:
+                in_flight.dec()
+                HOST_TASK_DURATION.labels(job_type=self.job_type).observe(
+                    time.monotonic() - started
+                )
+        status = "failed" if getattr(multi_result, "failed", False) else "success"
+        HOST_TASKS_TOTAL.labels(job_type=self.job_type, status=status).inc()
+        return multi_result
+
+
+def runner_for_job(job: Any = None) -> PolicyRunner:
+    return PolicyRunner(resolve_runner_policy(job), job_type=getattr(job, "type", "") or "")
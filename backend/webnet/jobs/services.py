@@ -3,9 +3,12 @@
 from __future__ import annotations
 
 import logging
+import threading
+import time
 from datetime import datetime, timezone
 from typing import Optional, Sequence, Callable
 
+from django.conf import settings
 from django.db import transaction
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
@@ -19,13 +22,116 @@ from webnet.core.broadcasts import broadcast_job_update
 
 logger = logging.getLogger(__name__)
 
+# Buffers holding unwritten entries; flushed when a Celery task finishes (see
+# webnet.jobs.signals) so a crashing task cannot drop its logs.
+_pending_log_buffers: set["JobLogBuffer"] = set()
+
+
+def _broadcast_job_logs(job_id: int, logs: Sequence[JobLog]) -> None:
+    """Push job log entries to WebSocket subscribers of the job."""
+    if not logs:
+        return
+    try:
+        channel_layer = get_channel_layer()
+        if len(logs) == 1:
+            message = {"type": "job_log", "data": JobLogSerializer(logs[0]).data}
+        else:
+            message = {"type": "job_log_batch", "data": JobLogSerializer(logs, many=True).data}
+        async_to_sync(channel_layer.group_send)(f"job_{job_id}", message)
+    except Exception as e:
+        logger.warning("Failed to broadcast job log for job %s: %s", job_id, e)
+
+
+class JobLogBuffer:
+    """Collects log entries for one job and writes them in batches.
+
+    Entries are flushed with a single ``bulk_create`` and one channel-layer
+    message once ``max_entries`` are pending or ``flush_interval`` seconds
+    have passed since the last flush (checked whenever an entry is added).
+    Safe to share between the threads of a Nornir runner; flushes are
+    serialized so entries are written and broadcast in the order added.
+    """
+
+    def __init__(self, job: Job, *, max_entries: int = 100, flush_interval: float = 0.5):
+        self.job = job
+        self.max_entries = max(1, max_entries)
+        self.flush_interval = flush_interval
+        self._pending: list[JobLog] = []
+        self._lock = threading.RLock()
+        self._last_flush = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, log: JobLog) -> None:
+        with self._lock:
+            self._pending.append(log)
+            _pending_log_buffers.add(self)
+            due = (
+                len(self._pending) >= self.max_entries
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+            if due:
+                self.flush()
+
+    def flush(self) -> list[JobLog]:
+        """Write all pending entries; returns the entries written."""
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if not self._pending:
+                _pending_log_buffers.discard(self)
+                return []
+            pending = self._pending
+            self._pending = []
+            try:
+                created = JobLog.objects.bulk_create(pending)
+            except Exception:
+                # Keep the entries so a later flush can retry them
+                self._pending = pending + self._pending
+                raise
+            _pending_log_buffers.discard(self)
+            _broadcast_job_logs(self.job.id, created)
+            return created
+
+
+def flush_pending_job_logs() -> int:
+    """Flush every buffer in this process with unwritten entries; returns entries written."""
+    written = 0
+    for buffer in list(_pending_log_buffers):
+        try:
+            written += len(buffer.flush())
+        except Exception as e:
+            # Drop the buffer so a permanently failing job (e.g. deleted) is not retried forever
+            _pending_log_buffers.discard(buffer)
+            logger.error("Failed to flush buffered logs for job %s: %s", buffer.job.id, e)
+    return written
+
 
 class JobService:
     """Coordinates job lifecycle and dispatch to Celery."""
 
-    def __init__(self, dispatcher: Callable | None = None):
+    def __init__(
+        self,
+        dispatcher: Callable | None = None,
+        *,
+        log_buffer_size: int | None = None,
+        log_flush_interval_ms: int | None = None,
+    ):
         # dispatcher allows injection/mocking in tests; defaults to celery send_task
         self.dispatcher = dispatcher or celery_app.send_task
+        # A buffer size of 1 writes every log entry immediately
+        self.log_buffer_size = (
+            log_buffer_size
+            if log_buffer_size is not None
+            else getattr(settings, "JOB_LOG_BUFFER_SIZE", 100)
+        )
+        self.log_flush_interval_ms = (
+            log_flush_interval_ms
+            if log_flush_interval_ms is not None
+            else getattr(settings, "JOB_LOG_FLUSH_INTERVAL_MS", 500)
+        )
+        self._log_buffers: dict[int, JobLogBuffer] = {}
+        self._log_buffers_lock = threading.Lock()
 
     @transaction.atomic
     def create_job(
@@ -57,6 +163,8 @@ class JobService:
 
     @transaction.atomic
     def set_status(self, job: Job, status: str, result_summary: Optional[dict] = None) -> Job:
+        # Logs must be persisted before subscribers see the status change
+        self.flush_logs(job)
         job.status = status
         if status == "running" and not job.started_at:
             job.started_at = datetime.now(timezone.utc)
@@ -120,7 +228,6 @@ class JobService:
         except Exception as e:
             logger.error(f"Failed to send job notification for job {job.id}: {e}")
 
-    @transaction.atomic
     def append_log(
         self,
         job: Job,
@@ -130,22 +237,46 @@ class JobService:
         host: Optional[str] = None,
         extra: Optional[dict] = None,
     ) -> JobLog:
-        log = JobLog.objects.create(
+        """Record a log entry for a job.
+
+        With buffering enabled the returned entry is unsaved until the next
+        flush (batch full, interval elapsed, ``flush_logs`` or ``set_status``).
+        """
+        log = JobLog(
             job=job,
             level=level,
             host=host,
             message=message,
             extra_json=extra,
         )
-        try:
-            channel_layer = get_channel_layer()
-            async_to_sync(channel_layer.group_send)(
-                f"job_{job.id}", {"type": "job_log", "data": JobLogSerializer(log).data}
-            )
-        except Exception as e:
-            logger.warning("Failed to broadcast job log for job %s: %s", job.id, e)
+        if self.log_buffer_size <= 1:
+            log.save()
+            _broadcast_job_logs(job.id, [log])
+            return log
+        self._get_log_buffer(job).add(log)
         return log
 
+    def flush_logs(self, job: Job | None = None) -> int:
+        """Write buffered log entries for ``job`` (or all jobs); returns count written."""
+        with self._log_buffers_lock:
+            if job is None:
+                buffers = list(self._log_buffers.values())
+            else:
+                buffers = [b for b in (self._log_buffers.get(job.id),) if b is not None]
+        return sum(len(buffer.flush()) for buffer in buffers)
+
+    def _get_log_buffer(self, job: Job) -> JobLogBuffer:
+        with self._log_buffers_lock:
+            buffer = self._log_buffers.get(job.id)
+            if buffer is None:
+                buffer = JobLogBuffer(
+                    job,
+                    max_entries=self.log_buffer_size,
+                    flush_interval=self.log_flush_interval_ms / 1000,
+                )
+                self._log_buffers[job.id] = buffer
+            return buffer
+
     def list_jobs(self, customer_ids: Sequence[int] | None = None) -> Sequence[Job]:
         qs = Job.objects.all()
         if customer_ids:
@@ -160,37 +291,22 @@ class JobService:
         """
         from webnet.core.models import Region
         from webnet.devices.models import Device
+        from webnet.devices.targeting import job_target_filters, resolve_job_device_ids
 
-        # Get target devices from job's target_summary
-        # Support both nested {"filters": {...}} and flat {...} formats
-        target_filters = (job.target_summary_json or {}).get("filters", {})
-        if not target_filters and job.target_summary_json:
-            # Fallback: treat top-level keys as filters for backward compatibility
-            # This handles compliance jobs which use policy.scope_json directly
-            target_filters = job.target_summary_json
-
+        target_filters = job_target_filters(job)
         if not target_filters:
             # No specific targets, use default queue
             return None
 
-        # Query devices matching the filters
-        devices_qs = Device.objects.filter(customer=job.customer, enabled=True)
-
-        # Apply filters to find target devices
-        if target_filters.get("site"):
-            devices_qs = devices_qs.filter(site__iexact=target_filters["site"])
-        if target_filters.get("role"):
-            devices_qs = devices_qs.filter(role__iexact=target_filters["role"])
-        if target_filters.get("vendor"):
-            devices_qs = devices_qs.filter(vendor__iexact=target_filters["vendor"])
-        if target_filters.get("hostname"):
-            devices_qs = devices_qs.filter(hostname__iexact=target_filters["hostname"])
-        if target_filters.get("device_ids"):
-            devices_qs = devices_qs.filter(id__in=target_filters["device_ids"])
+        # Resolved once here and reused by the job task for its inventory
+        device_ids = resolve_job_device_ids(job, target_filters)
 
         # Get regions from target devices
         device_regions = (
-            devices_qs.exclude(region__isnull=True).values_list("region", flat=True).distinct()
+            Device.objects.filter(id__in=device_ids)
+            .exclude(region__isnull=True)
+            .values_list("region", flat=True)
+            .distinct()
         )
 
         if not device_regions:
@@ -235,6 +351,7 @@ class JobService:
                     (j.target_summary_json or {}).get("filters", {}),
                     (j.payload_json or {}).get("commands", []),
                     (j.payload_json or {}).get("timeout"),
+                    (j.payload_json or {}).get("pipeline", True),
                 ),
             ),
             "config_backup": (
@@ -265,7 +382,11 @@ class JobService:
             ),
             "compliance_check": (
                 "compliance_check_job",
-                lambda j: (j.id, (j.payload_json or {}).get("policy_id")),
+                lambda j: (
+                    j.id,
+                    (j.payload_json or {}).get("policy_id"),
+                    (j.payload_json or {}).get("full", False),
+                ),
             ),
             "topology_discovery": (
                 "topology_discovery_job",
@@ -1,10 +1,15 @@
 """Django signals for the jobs app."""
 
-from django.db.models.signals import post_save
+from celery.signals import task_postrun, worker_process_shutdown
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
+from webnet.automation import inventory_cache
+from webnet.devices.models import Credential, Device
+from webnet.jobs.connections import connection_pool
 from webnet.jobs.models import Schedule
 from webnet.jobs.schedule_service import ScheduleService
+from webnet.jobs.services import flush_pending_job_logs
 
 
 @receiver(post_save, sender=Schedule)
@@ -18,3 +23,42 @@ def update_schedule_next_run(sender, instance, created, **kwargs):
             if instance.next_run != next_run:
                 # Use update() to avoid triggering signal again
                 Schedule.objects.filter(pk=instance.pk).update(next_run=next_run)
+
+
+@task_postrun.connect
+def flush_job_logs_after_task(**kwargs):
+    """Write any buffered job logs left behind by a task, even one that raised."""
+    flush_pending_job_logs()
+
+
+@task_postrun.connect
+def expire_idle_connections_after_task(**kwargs):
+    """Close pooled device sessions that sat idle past their TTL."""
+    connection_pool.expire()
+
+
+@worker_process_shutdown.connect
+def close_pooled_connections(**kwargs):
+    connection_pool.close_all()
+
+
+@receiver(post_save, sender=Credential)
+@receiver(post_delete, sender=Credential)
+def invalidate_credential_connections(sender, instance, **kwargs):
+    """Drop cached secrets and pooled sessions for a credential that was changed or removed."""
+    inventory_cache.invalidate_credential(instance.pk)
+    connection_pool.invalidate(credential_id=instance.pk)
+
+
+_DEVICE_CONNECTION_FIELDS = {"mgmt_ip", "platform", "credential", "credential_id", "enabled"}
+
+
+@receiver(post_save, sender=Device)
+@receiver(post_delete, sender=Device)
+def invalidate_device_connections(sender, instance, **kwargs):
+    """Drop the cached host spec and, if connection details changed, pooled sessions."""
+    inventory_cache.invalidate_device(instance.pk)
+    update_fields = kwargs.get("update_fields")
+    if update_fields and not _DEVICE_CONNECTION_FIELDS.intersection(update_fields):
+        return
+    connection_pool.invalidate(device_id=instance.pk)
@@ -0,0 +1,148 @@
+"""Streaming execution of Nornir tasks.
+
+``nr.run`` only returns once every host has answered, so a post-run loop over
+the aggregated result delays logging, persistence and progress updates until
+the slowest device in the inventory is done. ``run_streaming`` attaches a
+processor that hands each host's result to a callback as soon as that host
+completes. Callbacks run on the calling thread (not on the runner's worker
+threads) so database writes keep using the task's own connection.
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable
+
+from webnet.core.broadcasts import broadcast_job_progress
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+class StreamingResultProcessor:
+    """Nornir processor that queues each host's result as it completes."""
+
+    def __init__(self) -> None:
+        self.results: queue.Queue = queue.Queue()
+
+    def task_started(self, task: Any) -> None:
+        return
+
+    def task_completed(self, task: Any, result: Any) -> None:
+        return
+
+    def task_instance_started(self, task: Any, host: Any) -> None:
+        return
+
+    def task_instance_completed(self, task: Any, host: Any, result: Any) -> None:
+        self.results.put((host.name, result))
+
+    def subtask_instance_started(self, task: Any, host: Any) -> None:
+        return
+
+    def subtask_instance_completed(self, task: Any, host: Any, result: Any) -> None:
+        return
+
+
+class HostProgress:
+    """Tracks completed hosts for a job and broadcasts throttled progress updates."""
+
+    def __init__(self, job: Any, total: int, *, interval: float = 1.0):
+        self.job = job
+        self.total = total
+        self.interval = interval
+        self.completed = 0
+        self.failed = 0
+        self._last_sent = 0.0
+
+    def record(self, failed: bool) -> None:
+        self.completed += 1
+        if failed:
+            self.failed += 1
+        if time.monotonic() - self._last_sent >= self.interval:
+            self.send()
+
+    def send(self) -> None:
+        self._last_sent = time.monotonic()
+        broadcast_job_progress(
+            self.job, completed=self.completed, total=self.total, failed=self.failed
+        )
+
+
+def run_streaming(
+    nr: Any,
+    task: Callable,
+    on_result: Callable[[str, Any], None],
+    *,
+    on_idle: Callable[[], None] | None = None,
+    idle_interval: float = 0.5,
+    keep_results: bool = False,
+    **kwargs: Any,
+) -> None:
+    """Run ``task`` on ``nr`` and call ``on_result(host, result)`` per host as it finishes.
+
+    Args:
+        nr: Nornir object to run against
+        task: Nornir task function
+        on_result: Callback receiving the host name and its MultiResult
+        on_idle: Optional callback invoked while waiting for results (e.g. to
+            flush buffered job logs), at most every ``idle_interval`` seconds
+        idle_interval: Seconds between ``on_idle`` calls
+        keep_results: Keep result payloads in Nornir's aggregated result after
+            the callback ran. Off by default so large outputs (configs) can be
+            freed host by host instead of accumulating for the whole run.
+        **kwargs: Passed through to ``nr.run``
+    """
+    with_processors = getattr(nr, "with_processors", None)
+    if with_processors is None:
+        # Runner without processor support: fall back to handling results after the run
+        for host, result in nr.run(task, **kwargs).items():
+            on_result(host, result)
+        return
+
+    processor = StreamingResultProcessor()
+    streaming_nr = with_processors(list(getattr(nr, "processors", []) or []) + [processor])
+    outcome: dict[str, BaseException] = {}
+
+    def _run() -> None:
+        try:
+            streaming_nr.run(task, **kwargs)
+        except BaseException as exc:  # pragma: no cover - surfaced on the calling thread
+            outcome["error"] = exc
+        finally:
+            processor.results.put(_DONE)
+
+    runner = threading.Thread(target=_run, name="nornir-streaming-run", daemon=True)
+    runner.start()
+    callback_error: BaseException | None = None
+    last_idle = time.monotonic()
+    while True:
+        try:
+            item = processor.results.get(timeout=idle_interval)
+        except queue.Empty:
+            item = None
+        if item is _DONE:
+            break
+        if item is not None and callback_error is None:
+            host, result = item
+            try:
+                on_result(host, result)
+            except Exception as exc:
+                # Stop handling but let the run finish so worker threads are not orphaned
+                logger.exception("Streaming result handler failed for host %s", host)
+                callback_error = exc
+            if not keep_results:
+                for sub in result if isinstance(result, list) else ():
+                    sub.result = None
+        if on_idle and time.monotonic() - last_idle >= idle_interval:
+            last_idle = time.monotonic()
+            on_idle()
+    runner.join()
+    if "error" in outcome:
+        raise outcome["error"]
+    if callback_error is not None:
+        raise callback_error
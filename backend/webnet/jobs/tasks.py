@@ -8,12 +8,16 @@ from __future__ import annotations
 
 import logging
 import re
+import time
+from collections.abc import Mapping
+from contextlib import contextmanager
 
 from celery import shared_task
+from django.conf import settings
+from django.db.models import OuterRef, Subquery
 
 try:  # pragma: no cover - optional dependency
     from nornir.core import Nornir
-    from nornir.core.plugins.runners import ThreadedRunner
 except ImportError:  # pragma: no cover - fallback for tests
 
     class Nornir:  # type: ignore
@@ -21,9 +25,6 @@ except ImportError:  # pragma: no cover - fallback for tests
             self.inventory = inventory
             self.runner = runner
 
-    class ThreadedRunner:  # type: ignore
-        pass
-
 
 try:  # pragma: no cover - optional dependency
     from nornir_netmiko.tasks import netmiko_send_command
@@ -46,9 +47,14 @@ except ImportError:  # pragma: no cover - fallback for tests
 
 from webnet.jobs.models import Job
 from webnet.jobs.services import JobService
+from webnet.jobs.connections import connection_pool
+from webnet.jobs.runners import PolicyRunner, runner_for_job
+from webnet.jobs.streaming import HostProgress, run_streaming
 from webnet.automation import build_inventory
-from webnet.devices.models import Device, TopologyLink
-from webnet.config_mgmt.models import ConfigSnapshot
+from webnet.devices.targeting import devices_by_ids, resolve_job_device_ids
+from webnet.devices.models import Device, DiscoveredDevice, TopologyLink
+from webnet.config_mgmt.drift_service import DriftService, notify_drift_digests
+from webnet.config_mgmt.models import ConfigDrift, ConfigSnapshot, config_hash
 from webnet.ansible_mgmt.ansible_service import (
     generate_ansible_inventory,
     execute_ansible_playbook,
@@ -59,7 +65,33 @@ logger = logging.getLogger(__name__)
 
 
 def _nr_from_inventory(inv) -> Nornir:
-    return Nornir(inventory=inv, runner=ThreadedRunner())
+    return Nornir(inventory=inv, runner=PolicyRunner())
+
+
+def _with_runner_policy(nr: Nornir, job: Job) -> Nornir:
+    """Return ``nr`` running under the job's resolved runner policy."""
+    with_runner = getattr(nr, "with_runner", None)
+    if with_runner is None:
+        return nr
+    return with_runner(runner_for_job(job))
+
+
+@contextmanager
+def _pooled_connections(nr: Nornir):
+    """Lease pooled device sessions to ``nr``'s hosts and return them afterwards."""
+    hosts = getattr(getattr(nr, "inventory", None), "hosts", None)
+    # Only real inventories are pooled; duck-typed runners and test doubles pass through
+    with connection_pool.lease(hosts.values() if isinstance(hosts, Mapping) else ()):
+        yield nr
+
+
+def _job_inventory(job: Job, targets: dict | None):
+    """Build the job's inventory from its targets, resolved once and cached on the job."""
+    return build_inventory(
+        targets,
+        customer_id=job.customer_id,
+        device_ids=resolve_job_device_ids(job, targets or {}),
+    )
 
 
 def _log_host_result(js: JobService, job: Job, host: str, result) -> None:
@@ -69,8 +101,107 @@ def _log_host_result(js: JobService, job: Job, host: str, result) -> None:
         js.append_log(job, level="INFO", host=host, message=str(result.result))
 
 
+def _run_streaming(
+    js: JobService,
+    job: Job,
+    nr: Nornir,
+    total: int,
+    task,
+    on_result,
+    progress: HostProgress | None = None,
+    **kwargs,
+) -> HostProgress:
+    """Run a Nornir task, handing each host's result to ``on_result`` as it completes.
+
+    The job's runner policy (workers, chunking, per-site cap) is applied,
+    buffered job logs are flushed while waiting on slow hosts and per-host
+    progress is broadcast to the UI as results arrive. Pass ``progress`` to
+    keep counting across several runs of one job (e.g. remediation waves).
+    """
+    progress = progress or HostProgress(job, total)
+    nr = _with_runner_policy(nr, job)
+
+    def _handle(host: str, result) -> None:
+        on_result(host, result)
+        progress.record(bool(result.failed))
+
+    with _pooled_connections(nr):
+        run_streaming(
+            nr,
+            task,
+            _handle,
+            on_idle=lambda: js.flush_logs(job),
+            idle_interval=js.log_flush_interval_ms / 1000,
+            **kwargs,
+        )
+    progress.send()
+    return progress
+
+
+def _send_command_batch(task, commands: list[str], timeout: int | None = None):
+    """Nornir task sending every command to one host over a single netmiko session.
+
+    Each command runs as a subtask so the host's connection is opened once and
+    reused; a failing command is recorded and the remaining ones still run.
+    The task result is a list of ``{"command", "output", "failed", "duration_ms"}``.
+    """
+    outputs = []
+    for cmd in commands:
+        started = time.monotonic()
+        try:
+            sub = task.run(task=netmiko_send_command, command_string=cmd, timeout=timeout)
+            output, failed = sub[0].result, False
+        except Exception as exc:
+            # NornirSubTaskError carries the failed subtask's MultiResult
+            failed_sub = getattr(exc, "result", None)
+            if failed_sub:
+                output = failed_sub[0].exception or failed_sub[0].result
+            else:
+                output = exc
+            failed = True
+        outputs.append(
+            {
+                "command": cmd,
+                "output": "" if output is None else str(output),
+                "failed": failed,
+                "duration_ms": round((time.monotonic() - started) * 1000, 1),
+            }
+        )
+    return outputs
+
+
+def _log_command_batch(js: JobService, job: Job, host: str, result) -> None:
+    # Nornir hands over a MultiResult (a list); a bare Result is accepted as well
+    first = result[0] if isinstance(result, list) and result else result
+    outputs = getattr(first, "result", None)
+    if not isinstance(outputs, list):
+        # The batch task itself failed (e.g. bad inventory data) before running commands
+        _log_host_result(js, job, host, result)
+        return
+    for entry in outputs:
+        js.append_log(
+            job,
+            level="ERROR" if entry["failed"] else "INFO",
+            host=host,
+            message=entry["output"],
+            extra={"command": entry["command"], "duration_ms": entry["duration_ms"]},
+        )
+
+
 @shared_task(name="run_commands_job")
-def run_commands_job(job_id: int, targets: dict, commands: list[str], timeout: int = 30) -> None:
+def run_commands_job(
+    job_id: int,
+    targets: dict,
+    commands: list[str],
+    timeout: int = 30,
+    pipeline: bool = True,
+) -> None:
+    """Run show commands against the targeted devices.
+
+    With ``pipeline`` (the default) each host gets its whole command list in one
+    Nornir task over one session, so hosts progress independently. Without it
+    every command is a separate fan-out that waits for all hosts to answer.
+    """
     js = JobService()
     try:
         job = Job.objects.get(pk=job_id)
@@ -78,25 +209,77 @@ def run_commands_job(job_id: int, targets: dict, commands: list[str], timeout: i
         logger.warning("Job %s not found for run_commands", job_id)
         return
     js.set_status(job, "running")
-    inventory = build_inventory(targets, customer_id=job.customer_id)
+    inventory = _job_inventory(job, targets)
     if not inventory.hosts:
         js.append_log(job, level="ERROR", message="No devices matched targets")
         js.set_status(job, "failed", result_summary={"error": "no devices"})
         return
     nr = _nr_from_inventory(inventory)
     try:
-        for cmd in commands:
-            res = nr.run(netmiko_send_command, command_string=cmd, timeout=timeout)
-            for host, r in res.items():
-                _log_host_result(js, job, host, r)
+        if pipeline:
+            _run_streaming(
+                js,
+                job,
+                nr,
+                len(inventory.hosts),
+                _send_command_batch,
+                lambda host, r: _log_command_batch(js, job, host, r),
+                commands=commands,
+                timeout=timeout,
+            )
+        else:
+            for cmd in commands:
+                _run_streaming(
+                    js,
+                    job,
+                    nr,
+                    len(inventory.hosts),
+                    netmiko_send_command,
+                    lambda host, r: _log_host_result(js, job, host, r),
+                    command_string=cmd,
+                    timeout=timeout,
+                )
         js.set_status(
-            job, "success", result_summary={"commands": len(commands), "targets": targets}
+            job,
+            "success",
+            result_summary={"commands": len(commands), "targets": targets, "pipeline": pipeline},
         )
     except Exception as exc:  # pragma: no cover
         js.append_log(job, level="ERROR", message=str(exc))
         js.set_status(job, "failed", result_summary={"error": str(exc)})
 
 
+def _record_backup_drift(
+    js: JobService,
+    job: Job,
+    host: str,
+    drift_service: DriftService,
+    snapshot: ConfigSnapshot,
+    device: Device,
+) -> ConfigDrift | None:
+    """Diff a freshly backed up config against the device's previous snapshot.
+
+    Notifications are left to the caller, which sends one digest per job.
+    """
+    try:
+        drift = drift_service.detect_drift_for_snapshot(
+            snapshot, user=job.user, previous_id=device.latest_snapshot_id, notify=False
+        )
+    except Exception as exc:  # drift is best effort; never fail the backup
+        logger.warning("Drift detection failed for %s: %s", host, exc, exc_info=True)
+        return None
+    if drift is None or not drift.has_changes:
+        return None
+    js.append_log(
+        job,
+        level="INFO",
+        host=host,
+        message=f"Config drift: +{drift.additions} -{drift.deletions} lines",
+        extra={"drift_id": drift.id},
+    )
+    return drift
+
+
 @shared_task(name="config_backup_job")
 def config_backup_job(
     job_id: int, targets: dict, source_label: str = "manual", auto_git_sync: bool = True
@@ -107,42 +290,90 @@ def config_backup_job(
     except Job.DoesNotExist:
         return
     js.set_status(job, "running")
-    inventory = build_inventory(targets, customer_id=job.customer_id)
+    inventory = _job_inventory(job, targets)
     if not inventory.hosts:
         js.append_log(job, level="ERROR", message="No devices matched targets")
         js.set_status(job, "failed", result_summary={"error": "no devices"})
         return
     nr = _nr_from_inventory(inventory)
     snapshot_ids: list[int] = []
-    try:
-        res = nr.run(napalm_get, getters=["config"])
-        for host, r in res.items():
-            if r.failed:
-                _log_host_result(js, job, host, r)
-                continue
-            cfg = (r.result.get("config") or {}).get("running") or ""
+    changed_device_ids: list[int] = []
+    unchanged: list[str] = []
+    drifts: list[ConfigDrift] = []
+    drift_service = DriftService() if getattr(settings, "CONFIG_DRIFT_ON_BACKUP", True) else None
+    latest_snapshot = ConfigSnapshot.objects.filter(device=OuterRef("pk")).order_by(
+        "-created_at", "-id"
+    )
+    devices = {
+        d.hostname: d
+        for d in devices_by_ids(resolve_job_device_ids(job, targets), job.customer_id).annotate(
+            latest_config_hash=Subquery(latest_snapshot.values("blob_id")[:1]),
+            latest_snapshot_id=Subquery(latest_snapshot.values("id")[:1]),
+        )
+    }
+
+    def _store_config(host: str, r) -> None:
+        if r.failed:
+            _log_host_result(js, job, host, r)
+            return
+        cfg = (r.result.get("config") or {}).get("running") or ""
+        device = devices.get(host)
+        if device and device.latest_config_hash == config_hash(cfg):
+            # Identical to the latest snapshot: nothing new to store or sync
+            unchanged.append(host)
             js.append_log(
-                job, level="INFO", host=host, message=f"Backed up config ({len(cfg)} bytes)"
+                job, level="INFO", host=host, message=f"Config unchanged ({len(cfg)} bytes)"
             )
-            device = Device.objects.filter(hostname=host, customer=job.customer).first()
-            if device:
-                snapshot = ConfigSnapshot.objects.create(
-                    device=device,
-                    job=job,
-                    source=source_label,
-                    config_text=cfg,
-                )
-                snapshot_ids.append(snapshot.id)
-        js.set_status(job, "success", result_summary={"targets": targets})
+            return
+        js.append_log(job, level="INFO", host=host, message=f"Backed up config ({len(cfg)} bytes)")
+        if device:
+            snapshot = ConfigSnapshot.objects.create(
+                device=device,
+                job=job,
+                source=source_label,
+                config_text=cfg,
+            )
+            snapshot_ids.append(snapshot.id)
+            changed_device_ids.append(device.id)
+            if drift_service and device.latest_snapshot_id:
+                drift = _record_backup_drift(js, job, host, drift_service, snapshot, device)
+                if drift is not None:
+                    drifts.append(drift)
+
+    try:
+        _run_streaming(
+            js, job, nr, len(inventory.hosts), napalm_get, _store_config, getters=["config"]
+        )
+        js.set_status(
+            job,
+            "success",
+            result_summary={
+                "targets": targets,
+                "snapshots_created": len(snapshot_ids),
+                "unchanged": len(unchanged),
+                "drifts_detected": len(drifts),
+            },
+        )
+        if drifts:
+            notify_drift_digests(drifts)
 
         # Auto-sync to Git if enabled and a Git repository is configured
         if auto_git_sync and snapshot_ids:
             from webnet.config_mgmt.models import GitRepository
 
-            if GitRepository.objects.filter(customer_id=job.customer_id, enabled=True).exists():
-                git_sync_job.delay(job.customer_id, snapshot_ids, job_id)
+            repository_id = (
+                GitRepository.objects.filter(customer_id=job.customer_id, enabled=True)
+                .values_list("id", flat=True)
+                .first()
+            )
+            if repository_id:
+                schedule_git_sync(repository_id, snapshot_ids, job_id)
                 js.append_log(job, level="INFO", message="Queued Git sync for backed up configs")
 
+        # Check the changed configs in one batch rather than one task per snapshot
+        if changed_device_ids and getattr(settings, "COMPLIANCE_ON_SNAPSHOT", True):
+            compliance_snapshot_check.delay(changed_device_ids)
+
     except Exception as exc:  # pragma: no cover
         js.append_log(job, level="ERROR", message=str(exc))
         js.set_status(job, "failed", result_summary={"error": str(exc)})
@@ -184,6 +415,116 @@ def git_sync_job(
     }
 
 
+def schedule_git_sync(
+    repository_id: int, snapshot_ids: list[int], triggering_job_id: int | None = None
+) -> None:
+    """Queue snapshots for the repository's next coalesced Git sync.
+
+    The first snapshots queued after a sync open a batch and schedule
+    ``git_sync_flush`` for the end of ``GIT_SYNC_WINDOW`` seconds; later
+    backups in the window join that batch and land in the same commit.
+    """
+    from webnet.config_mgmt.git_service import queue_git_sync
+
+    if queue_git_sync(repository_id, snapshot_ids):
+        window = getattr(settings, "GIT_SYNC_WINDOW", 60)
+        git_sync_flush.apply_async((repository_id, triggering_job_id), countdown=window)
+
+
+@shared_task(name="git_sync_flush")
+def git_sync_flush(repository_id: int, triggering_job_id: int | None = None) -> dict:
+    """Sync a repository's pending snapshot batch as one commit.
+
+    Only one flush per repository runs at a time; a flush that finds another
+    one running retries after another window, leaving the batch queued.
+
+    Args:
+        repository_id: GitRepository ID
+        triggering_job_id: Job that opened the batch (for the audit trail)
+
+    Returns:
+        Dict with sync result details
+    """
+    from webnet.config_mgmt.git_service import (
+        SYNC_BATCHES,
+        claim_git_sync,
+        release_git_sync,
+        sync_configs_to_git,
+    )
+
+    claim = claim_git_sync(repository_id)
+    if claim is None:
+        SYNC_BATCHES.labels(status="deferred").inc()
+        window = getattr(settings, "GIT_SYNC_WINDOW", 60)
+        git_sync_flush.apply_async((repository_id, triggering_job_id), countdown=max(window, 5))
+        return {"success": True, "deferred": True}
+
+    repository, snapshot_ids = claim
+    try:
+        if not snapshot_ids:
+            SYNC_BATCHES.labels(status="empty").inc()
+            return {"success": True, "files_synced": 0, "message": "No snapshots to sync"}
+        job = Job.objects.filter(pk=triggering_job_id).first() if triggering_job_id else None
+        result = sync_configs_to_git(
+            customer_id=repository.customer_id, snapshot_ids=snapshot_ids, job=job
+        )
+    finally:
+        release_git_sync(repository_id)
+
+    SYNC_BATCHES.labels(status="synced" if result.success else "failed").inc()
+    logger.info(
+        "Git sync of %d queued snapshots for repository %s: %s",
+        len(snapshot_ids),
+        repository_id,
+        result.message or result.error,
+    )
+    return {
+        "success": result.success,
+        "snapshots": len(snapshot_ids),
+        "commit_hash": result.commit_hash,
+        "files_synced": result.files_synced,
+        "message": result.message,
+        "error": result.error,
+    }
+
+
+@shared_task(name="drift_analysis_job")
+def drift_analysis_job(customer_id: int | None = None, user_id: int | None = None) -> dict:
+    """Backfill drift records for all consecutive snapshot pairs.
+
+    Snapshot pairs are streamed per device and only pairs whose config hashes
+    differ are diffed, so this is safe to run over years of history.
+
+    Args:
+        customer_id: Optional customer to limit the analysis to
+        user_id: Optional user recorded as having triggered the drifts
+
+    Returns:
+        Dict with pair and drift counts
+    """
+    from webnet.users.models import User
+
+    user = User.objects.filter(pk=user_id).first() if user_id else None
+    stats = DriftService().analyze_fleet(customer_id=customer_id, user=user)
+    logger.info("Drift analysis for customer %s: %s", customer_id or "all", stats)
+    return stats
+
+
+@shared_task(name="refresh_drift_summaries")
+def refresh_drift_summaries(full: bool = False) -> dict:
+    """Refresh the per-device daily drift rollups used by fleet churn reports.
+
+    Args:
+        full: Rebuild every summary row instead of only recently changed days
+
+    Returns:
+        Dict with bucket and row counts
+    """
+    stats = DriftService().refresh_daily_summaries(full=full)
+    logger.info("Drift summaries refreshed: %s", stats)
+    return stats
+
+
 @shared_task(name="config_deploy_preview_job")
 def config_deploy_preview_job(job_id: int, targets: dict, mode: str, snippet: str) -> None:
     js = JobService()
@@ -192,18 +533,24 @@ def config_deploy_preview_job(job_id: int, targets: dict, mode: str, snippet: st
     except Job.DoesNotExist:
         return
     js.set_status(job, "running")
-    inventory = build_inventory(targets, customer_id=job.customer_id)
+    inventory = _job_inventory(job, targets)
     if not inventory.hosts:
         js.append_log(job, level="ERROR", message="No devices matched targets")
         js.set_status(job, "failed", result_summary={"error": "no devices"})
         return
     nr = _nr_from_inventory(inventory)
     try:
-        res = nr.run(
-            napalm_configure, configuration=snippet, dry_run=True, replace=(mode == "replace")
+        _run_streaming(
+            js,
+            job,
+            nr,
+            len(inventory.hosts),
+            napalm_configure,
+            lambda host, r: _log_host_result(js, job, host, r),
+            configuration=snippet,
+            dry_run=True,
+            replace=(mode == "replace"),
         )
-        for host, r in res.items():
-            _log_host_result(js, job, host, r)
         js.set_status(job, "success", result_summary={"targets": targets, "mode": mode})
     except Exception as exc:  # pragma: no cover
         js.append_log(job, level="ERROR", message=str(exc))
@@ -218,18 +565,24 @@ def config_deploy_commit_job(job_id: int, targets: dict, mode: str, snippet: str
     except Job.DoesNotExist:
         return
     js.set_status(job, "running")
-    inventory = build_inventory(targets, customer_id=job.customer_id)
+    inventory = _job_inventory(job, targets)
     if not inventory.hosts:
         js.append_log(job, level="ERROR", message="No devices matched targets")
         js.set_status(job, "failed", result_summary={"error": "no devices"})
         return
     nr = _nr_from_inventory(inventory)
     try:
-        res = nr.run(
-            napalm_configure, configuration=snippet, dry_run=False, replace=(mode == "replace")
+        _run_streaming(
+            js,
+            job,
+            nr,
+            len(inventory.hosts),
+            napalm_configure,
+            lambda host, r: _log_host_result(js, job, host, r),
+            configuration=snippet,
+            dry_run=False,
+            replace=(mode == "replace"),
         )
-        for host, r in res.items():
-            _log_host_result(js, job, host, r)
         js.set_status(job, "success", result_summary={"targets": targets, "mode": mode})
     except Exception as exc:  # pragma: no cover
         js.append_log(job, level="ERROR", message=str(exc))
@@ -276,8 +629,76 @@ def config_rollback_commit_job(job_id: int, device_id: int, target_config: str)
     )
 
 
+def _queue_remediations(pairs: list[tuple[int, int]]) -> None:
+    """Enqueue remediation of each ``(rule_id, compliance_result_id)`` pair.
+
+    In batch mode (``REMEDIATION_BATCH_MODE``) a rule with several violations
+    gets pending ``RemediationAction`` rows and one ``batch_remediation_job``;
+    a single violation still runs through ``auto_remediation_job``. Otherwise
+    batches go out as one Celery group of ``auto_remediation_job`` chunks.
+    """
+    if len(pairs) == 1:
+        auto_remediation_job.delay(*pairs[0])
+        return
+    if not pairs:
+        return
+    if not getattr(settings, "REMEDIATION_BATCH_MODE", True):
+        chunk_size = max(1, getattr(settings, "REMEDIATION_DISPATCH_CHUNK_SIZE", 50))
+        auto_remediation_job.chunks(pairs, chunk_size).group().apply_async()
+        return
+
+    from webnet.compliance.models import ComplianceResult, RemediationAction
+
+    by_rule: dict[int, list[int]] = {}
+    for rule_id, result_id in pairs:
+        by_rule.setdefault(rule_id, []).append(result_id)
+    devices = dict(
+        ComplianceResult.objects.filter(id__in=[result_id for _, result_id in pairs]).values_list(
+            "id", "device_id"
+        )
+    )
+    for rule_id, result_ids in by_rule.items():
+        if len(result_ids) == 1:
+            auto_remediation_job.delay(rule_id, result_ids[0])
+            continue
+        actions = RemediationAction.objects.bulk_create(
+            RemediationAction(
+                rule_id=rule_id,
+                compliance_result_id=result_id,
+                device_id=devices[result_id],
+                status="pending",
+            )
+            for result_id in result_ids
+            if result_id in devices
+        )
+        batch_remediation_job.delay(rule_id, [action.id for action in actions])
+
+
+def _handle_compliance_violations(violations, js: JobService | None = None, job=None) -> None:
+    """Send violation digests and trigger auto-remediation for failed compliance results."""
+    from webnet.compliance.violations import group_by_policy, notify_digests, plan_remediations
+
+    try:
+        violations = list(violations.select_related("device", "policy", "policy__customer"))
+        if not violations:
+            return
+        if js and job:
+            js.append_log(
+                job,
+                level="INFO",
+                message=f"Found {len(violations)} violations, checking for auto-remediation rules",
+            )
+        notify_digests(group_by_policy(violations))
+        pairs = plan_remediations(violations)
+        _queue_remediations(pairs)
+        if js and job and pairs:
+            js.append_log(job, level="INFO", message=f"Queued {len(pairs)} auto-remediations")
+    except Exception as e:
+        logger.error(f"Error triggering auto-remediation: {e}")
+
+
 @shared_task(name="compliance_check_job")
-def compliance_check_job(job_id: int, policy_id: int) -> None:
+def compliance_check_job(job_id: int, policy_id: int, full: bool = False) -> None:
     js = JobService()
     try:
         job = Job.objects.get(pk=job_id)
@@ -286,51 +707,63 @@ def compliance_check_job(job_id: int, policy_id: int) -> None:
     js.set_status(job, "running")
     js.append_log(job, level="INFO", message=f"Compliance policy {policy_id} check started")
 
-    # TODO: Actual compliance check logic should go here to populate ComplianceResult records
-    # Currently this is a placeholder that assumes results are already created elsewhere
+    from webnet.compliance.engine import PolicyError
+    from webnet.compliance.models import CompliancePolicy, ComplianceResult
+    from webnet.compliance.services import run_policy
+    from webnet.compliance.violations import VIOLATION_STATUSES
 
-    # After compliance check completes and results are populated, trigger auto-remediation
     try:
-        from webnet.compliance.models import ComplianceResult
-        from webnet.notifications.services import notify_compliance_violation
+        policy = CompliancePolicy.objects.get(pk=policy_id, customer_id=job.customer_id)
+    except CompliancePolicy.DoesNotExist:
+        js.set_status(job, "failed", result_summary={"error": "policy not found"})
+        return
+    device_ids = resolve_job_device_ids(job, policy.scope_json)
+    try:
+        run = run_policy(policy, job, device_ids, full=full)
+    except PolicyError as exc:
+        js.append_log(job, level="ERROR", message=f"Invalid policy definition: {exc}")
+        js.set_status(job, "failed", result_summary={"policy_id": policy_id, "error": str(exc)})
+        return
+    js.append_log(
+        job,
+        level="INFO",
+        message=(
+            f"Evaluated {run.evaluated} devices: {run.passed} passed, {run.failed} failed; "
+            f"{run.unchanged} unchanged since their last result"
+        ),
+    )
+    if run.no_config:
+        js.append_log(
+            job,
+            level="WARNING",
+            message=f"{len(run.no_config)} devices have no config snapshot and were skipped",
+        )
 
-        # Get violations for this policy that were created by this job
-        # This ensures we only remediate violations from the current compliance check
-        violations = ComplianceResult.objects.filter(
-            policy_id=policy_id, job=job, status__in=["failed", "violation", "non-compliant"]
-        ).select_related("device", "policy")
+    # Only violations recorded by this run; unchanged devices keep their earlier results
+    _handle_compliance_violations(
+        ComplianceResult.objects.filter(
+            policy_id=policy_id, job=job, status__in=VIOLATION_STATUSES
+        ),
+        js,
+        job,
+    )
 
-        if violations.exists():
-            js.append_log(
-                job,
-                level="INFO",
-                message=f"Found {violations.count()} violations, checking for auto-remediation rules",
-            )
-            # Send ChatOps notifications for violations
-            try:
-                from webnet.chatops.slack_service import (
-                    notify_compliance_violation as chatops_notify_violation,
-                )
-                from webnet.chatops.teams_service import notify_compliance_violation_teams
+    js.set_status(job, "success", result_summary={"policy_id": policy_id, **run.as_dict()})
 
-                for violation in violations:
-                    chatops_notify_violation(violation)
-                    notify_compliance_violation_teams(violation)
-            except Exception as e:
-                logger.warning(f"Failed to send compliance violation notifications: {e}")
 
-            # Trigger auto-remediation and send email notifications for each violation
-            for violation in violations:
-                trigger_auto_remediation.delay(violation.id)
-                # Send email notification for compliance violation
-                try:
-                    notify_compliance_violation(violation)
-                except Exception as e:
-                    logger.error(f"Failed to send compliance violation notification: {e}")
-    except Exception as e:
-        logger.error(f"Error triggering auto-remediation: {e}")
+@shared_task(name="compliance_snapshot_check")
+def compliance_snapshot_check(device_ids: list[int]) -> None:
+    """Evaluate devices' new configs against the policies whose scope includes them.
+
+    The batch's violations are handled together, so they share one digest per
+    policy and one remediation dispatch.
+    """
+    from webnet.compliance.models import ComplianceResult
+    from webnet.compliance.services import evaluate_devices
 
-    js.set_status(job, "success", result_summary={"policy_id": policy_id})
+    failed_ids = evaluate_devices(device_ids)
+    if failed_ids:
+        _handle_compliance_violations(ComplianceResult.objects.filter(id__in=failed_ids))
 
 
 @shared_task(name="scheduled_config_backup")
@@ -417,13 +850,14 @@ def check_reachability_job(job_id: int, targets: dict | None = None) -> None:
         return
     try:
         js.set_status(job, "running")
-        inventory = build_inventory(targets or {}, customer_id=job.customer_id)
+        inventory = _job_inventory(job, targets)
         if not inventory.hosts:
             js.append_log(job, level="ERROR", message="No devices matched targets")
             js.set_status(job, "failed", result_summary={"error": "no devices"})
             return
-        nr = _nr_from_inventory(inventory)
-        res = nr.run(netmiko_send_command, command_string="ping 127.0.0.1")
+        nr = _with_runner_policy(_nr_from_inventory(inventory), job)
+        with _pooled_connections(nr):
+            res = nr.run(netmiko_send_command, command_string="ping 127.0.0.1")
         for host, r in res.items():
             _log_host_result(js, job, host, r)
         js.set_status(job, "success", result_summary={"targets": targets or {}})
@@ -592,6 +1026,61 @@ def _parse_lldp_neighbors(output: str) -> list[dict[str, str | None]]:
     return neighbors
 
 
+_LINK_KEY_FIELDS = [
+    "customer",
+    "local_device",
+    "local_interface",
+    "remote_hostname",
+    "remote_interface",
+]
+_LINK_UPDATE_FIELDS = ["remote_device", "remote_ip", "remote_platform", "protocol", "job_id"]
+_DISCOVERED_UPDATE_FIELDS = [
+    "mgmt_ip",
+    "platform",
+    "discovered_via_device",
+    "discovered_via_protocol",
+    "job_id",
+    "last_seen_at",
+]
+
+
+def _upsert_topology_links(links: list[TopologyLink]) -> int:
+    """Insert or update ``links`` on the link key in one statement; return how many are new."""
+    existing = set(
+        TopologyLink.objects.filter(
+            local_device_id__in={link.local_device_id for link in links}
+        ).values_list("local_device_id", "local_interface", "remote_hostname", "remote_interface")
+    )
+    TopologyLink.objects.bulk_create(
+        links,
+        update_conflicts=True,
+        unique_fields=_LINK_KEY_FIELDS,
+        update_fields=_LINK_UPDATE_FIELDS,
+    )
+    return sum(
+        (link.local_device_id, link.local_interface, link.remote_hostname, link.remote_interface)
+        not in existing
+        for link in links
+    )
+
+
+def _upsert_discovered_devices(customer, devices: dict, batch_size: int) -> list[str]:
+    """Insert or update unknown neighbors queued for review; return the new hostnames."""
+    existing = set(
+        DiscoveredDevice.objects.filter(customer=customer, hostname__in=list(devices)).values_list(
+            "hostname", flat=True
+        )
+    )
+    DiscoveredDevice.objects.bulk_create(
+        list(devices.values()),
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=["customer", "hostname"],
+        update_fields=_DISCOVERED_UPDATE_FIELDS,
+    )
+    return [hostname for hostname in devices if hostname not in existing]
+
+
 @shared_task(name="topology_discovery_job")
 def topology_discovery_job(
     job_id: int,
@@ -601,6 +1090,11 @@ def topology_discovery_job(
 ) -> None:
     """Run topology discovery using CDP and/or LLDP.
 
+    Neighbors are collected per host and upserted on the link key in batches
+    of ``TOPOLOGY_UPSERT_BATCH_SIZE``. After each protocol, links of the hosts
+    that answered which were not seen again are removed with one delete;
+    hosts whose command failed keep their links.
+
     Args:
         job_id: Job ID to track progress
         targets: Device filter targets
@@ -614,19 +1108,29 @@ def topology_discovery_job(
         return
 
     js.set_status(job, "running")
-    inventory = build_inventory(targets, customer_id=job.customer_id)
+    inventory = _job_inventory(job, targets)
     if not inventory.hosts:
         js.append_log(job, level="ERROR", message="No devices matched targets")
         js.set_status(job, "failed", result_summary={"error": "no devices"})
         return
 
     nr = _nr_from_inventory(inventory)
+    batch_size = max(1, getattr(settings, "TOPOLOGY_UPSERT_BATCH_SIZE", 1000))
     discovered_links = 0
-    discovered_devices_count = 0
+    removed_links = 0
+    # Keyed on the link key: one statement must not upsert the same row twice
+    pending_links: dict[tuple, TopologyLink] = {}
+    discovered: dict[str, DiscoveredDevice] = {}
 
     # Prefetch all customer devices to avoid N+1 queries
     customer_devices = {d.hostname: d for d in Device.objects.filter(customer=job.customer)}
 
+    def _flush_links() -> None:
+        nonlocal discovered_links
+        if pending_links:
+            discovered_links += _upsert_topology_links(list(pending_links.values()))
+            pending_links.clear()
+
     try:
         # Run discovery command(s) based on protocol preference
         protocols_to_run = []
@@ -646,78 +1150,105 @@ def topology_discovery_job(
                 level="INFO",
                 message=f"Running {proto_name.upper()} discovery: {cmd}",
             )
-            res = nr.run(netmiko_send_command, command_string=cmd)
-
-            for host, r in res.items():
-                _log_host_result(js, job, host, r)
+            polled: list[int] = []
+            neighbor_count = 0
+
+            def _process_neighbors(
+                host: str, r, proto_name=proto_name, parser=parser, polled=polled
+            ) -> None:
+                nonlocal neighbor_count
+                if r.failed:
+                    _log_host_result(js, job, host, r)
+                    return
                 device = customer_devices.get(host)
-                if not device or r.failed:
-                    continue
+                if not device:
+                    return
 
                 neighbors = parser(str(r.result))
-                js.append_log(
-                    job,
-                    level="INFO",
-                    host=host,
-                    message=f"Found {len(neighbors)} {proto_name.upper()} neighbors",
-                )
-
+                polled.append(device.id)
+                neighbor_count += len(neighbors)
                 for n in neighbors:
                     remote_hostname = n["remote_hostname"]
                     remote_dev = customer_devices.get(remote_hostname)
-
-                    # Create or update topology link
-                    _, created = TopologyLink.objects.update_or_create(
-                        customer=device.customer,
+                    key = (device.id, n["local_interface"], remote_hostname, n["remote_interface"])
+                    pending_links[key] = TopologyLink(
+                        customer_id=device.customer_id,
                         local_device=device,
                         local_interface=n["local_interface"],
                         remote_hostname=remote_hostname,
                         remote_interface=n["remote_interface"],
-                        defaults={
-                            "remote_device": remote_dev,
-                            "remote_ip": n.get("remote_ip"),
-                            "remote_platform": (
-                                n.get("remote_platform")
-                                or (remote_dev.platform if remote_dev else None)
-                            ),
-                            "protocol": proto_name,
-                            "job_id": job.id,
-                        },
+                        remote_device=remote_dev,
+                        remote_ip=n.get("remote_ip"),
+                        remote_platform=(
+                            n.get("remote_platform")
+                            or (remote_dev.platform if remote_dev else None)
+                        ),
+                        protocol=proto_name,
+                        job_id=job.id,
                     )
-                    if created:
-                        discovered_links += 1
 
-                    # Auto-create discovered device entry if enabled and device unknown
+                    # Queue a discovered device entry if enabled and device unknown
                     if auto_create_devices and not remote_dev:
-                        from webnet.devices.models import DiscoveredDevice
-
-                        disc_dev, disc_created = DiscoveredDevice.objects.update_or_create(
-                            customer=device.customer,
+                        discovered[remote_hostname] = DiscoveredDevice(
+                            customer_id=device.customer_id,
                             hostname=remote_hostname,
-                            defaults={
-                                "mgmt_ip": n.get("remote_ip"),
-                                "platform": n.get("remote_platform"),
-                                "discovered_via_device": device,
-                                "discovered_via_protocol": proto_name,
-                                "job_id": job.id,
-                            },
+                            mgmt_ip=n.get("remote_ip"),
+                            platform=n.get("remote_platform"),
+                            discovered_via_device=device,
+                            discovered_via_protocol=proto_name,
+                            job_id=job.id,
                         )
-                        if disc_created:
-                            discovered_devices_count += 1
-                            js.append_log(
-                                job,
-                                level="INFO",
-                                host=host,
-                                message=f"Queued new device for review: {remote_hostname}",
-                            )
+                if len(pending_links) >= batch_size:
+                    _flush_links()
+
+            _run_streaming(
+                js,
+                job,
+                nr,
+                len(inventory.hosts),
+                netmiko_send_command,
+                _process_neighbors,
+                command_string=cmd,
+            )
+            _flush_links()
+            if polled:
+                # Links of answering hosts that this run did not see again are gone
+                removed, _ = (
+                    TopologyLink.objects.filter(
+                        customer=job.customer, protocol=proto_name, local_device_id__in=polled
+                    )
+                    .exclude(job_id=job.id)
+                    .delete()
+                )
+                removed_links += removed
+            js.append_log(
+                job,
+                level="INFO",
+                message=(
+                    f"Found {neighbor_count} {proto_name.upper()} neighbors "
+                    f"on {len(polled)} devices"
+                ),
+            )
 
         result_summary = {
             "targets": targets,
             "protocol": protocol,
             "links_created": discovered_links,
+            "links_removed": removed_links,
         }
         if auto_create_devices:
-            result_summary["devices_discovered"] = discovered_devices_count
+            new_devices = []
+            if discovered:
+                new_devices = _upsert_discovered_devices(job.customer, discovered, batch_size)
+            if new_devices:
+                names = ", ".join(sorted(new_devices)[:20])
+                more = f" and {len(new_devices) - 20} more" if len(new_devices) > 20 else ""
+                js.append_log(
+                    job,
+                    level="INFO",
+                    message=f"Queued {len(new_devices)} new devices for review: {names}{more}",
+                )
+            result_summary["devices_discovered"] = len(new_devices)
 
         js.set_status(job, "success", result_summary=result_summary)
     except Exception as exc:  # pragma: no cover
@@ -1244,65 +1775,42 @@ def trigger_auto_remediation(compliance_result_id: int) -> None:
     Args:
         compliance_result_id: ID of the ComplianceResult with a violation
     """
-    from django.utils import timezone
-    from webnet.compliance.models import ComplianceResult, RemediationRule, RemediationAction
+    from webnet.compliance.models import ComplianceResult
+    from webnet.compliance.violations import plan_remediations
 
     try:
-        result = ComplianceResult.objects.select_related(
-            "policy", "device", "device__customer"
-        ).get(pk=compliance_result_id)
+        result = ComplianceResult.objects.get(pk=compliance_result_id)
     except ComplianceResult.DoesNotExist:
         logger.warning(f"ComplianceResult {compliance_result_id} not found")
         return
 
-    # Find enabled remediation rules for this policy
-    rules = RemediationRule.objects.filter(policy=result.policy, enabled=True)
+    pairs = plan_remediations([result])
+    for rule_id, result_id in pairs:
+        logger.info(f"Triggering auto-remediation for rule {rule_id} on device {result.device_id}")
+    _queue_remediations(pairs)
 
-    if not rules.exists():
-        logger.info(f"No remediation rules found for policy {result.policy_id}")
-        return
-
-    for rule in rules:
-        # Check if approval is required
-        if rule.approval_required == "manual":
-            logger.info(f"Rule {rule.id} requires manual approval, skipping auto-remediation")
-            continue
-        # Note: 'auto' approval means auto-approve for non-critical policies
-        # 'none' approval means no approval needed at all
-        # Both allow auto-remediation to proceed
 
-        # Check daily execution limit
-        # TODO: Consider using customer timezone instead of UTC for daily limit calculation
-        # Currently uses UTC midnight which may not align with customer business hours
-        today_start = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+def _verify_remediation(
+    js: JobService, job: Job, rule, action, config_text: str, host: str | None = None
+) -> list[str]:
+    """Check a remediated config against the rule's policy; return the rules still failing.
 
-        # Use atomic operations to prevent race condition where multiple concurrent
-        # tasks could exceed the daily limit
-        from django.db import transaction
-
-        try:
-            with transaction.atomic():
-                # Lock the rule to prevent concurrent modification
-                locked_rule = RemediationRule.objects.select_for_update().get(pk=rule.id)
-
-                executions_today = RemediationAction.objects.filter(
-                    rule=locked_rule, started_at__gte=today_start
-                ).count()
-
-                if executions_today >= locked_rule.max_daily_executions:
-                    logger.warning(
-                        f"Rule {locked_rule.id} has reached daily limit ({locked_rule.max_daily_executions})"
-                    )
-                    continue
+    The policy is evaluated in-process on the after-snapshot text, so no
+    second device login is needed. Sets ``action.verification_passed``
+    (unsaved); it stays ``None`` when the policy definition does not compile.
+    """
+    from webnet.compliance.engine import PolicyError
+    from webnet.compliance.services import verify_config
 
-                # Queue the auto-remediation job
-                logger.info(
-                    f"Triggering auto-remediation for rule {locked_rule.id} on device {result.device_id}"
-                )
-                auto_remediation_job.delay(locked_rule.id, result.id)
-        except RemediationRule.DoesNotExist:
-            logger.warning(f"Rule {rule.id} no longer exists")
-            continue
+    try:
+        passed, failed_rules = verify_config(rule.policy, config_text)
+    except PolicyError as exc:
+        js.append_log(job, level="WARNING", host=host, message=f"Cannot verify: {exc}")
+        return []
+    action.verification_passed = passed
+    if passed:
+        js.append_log(job, level="INFO", host=host, message="Verification passed")
+    return failed_rules
 
 
 @shared_task(name="auto_remediation_job")
@@ -1368,73 +1876,72 @@ def auto_remediation_job(rule_id: int, compliance_result_id: int) -> None:
 
         nr = _nr_from_inventory(inventory)
 
-        # Step 1: Take before snapshot
-        js.append_log(job, level="INFO", message="Taking before snapshot")
-        before_result = nr.run(napalm_get, getters=["config"])
+        with _pooled_connections(nr):
+            # Step 1: Take before snapshot
+            js.append_log(job, level="INFO", message="Taking before snapshot")
+            before_result = nr.run(napalm_get, getters=["config"])
 
-        for host, task_result in before_result.items():
-            if task_result.failed:
-                raise ValueError(f"Failed to get config from {host}: {task_result.exception}")
+            for host, task_result in before_result.items():
+                if task_result.failed:
+                    raise ValueError(f"Failed to get config from {host}: {task_result.exception}")
 
-            config_text = (task_result.result.get("config") or {}).get("running") or ""
-            before_snapshot = ConfigSnapshot.objects.create(
-                device=device,
-                job=job,
-                source="remediation_before",
-                config_text=config_text,
-            )
-            action.before_snapshot = before_snapshot
-            action.save(update_fields=["before_snapshot"])
-            js.append_log(
-                job, level="INFO", message=f"Before snapshot saved ({len(config_text)} bytes)"
-            )
+                config_text = (task_result.result.get("config") or {}).get("running") or ""
+                before_snapshot = ConfigSnapshot.objects.create(
+                    device=device,
+                    job=job,
+                    source="remediation_before",
+                    config_text=config_text,
+                )
+                action.before_snapshot = before_snapshot
+                action.save(update_fields=["before_snapshot"])
+                js.append_log(
+                    job, level="INFO", message=f"Before snapshot saved ({len(config_text)} bytes)"
+                )
 
-        # Step 2: Apply remediation configuration
-        js.append_log(job, level="INFO", message="Applying remediation configuration")
-        apply_result = nr.run(
-            napalm_configure,
-            configuration=rule.config_snippet,
-            dry_run=False,
-            replace=(rule.apply_mode == "replace"),
-        )
+            # Step 2: Apply remediation configuration
+            js.append_log(job, level="INFO", message="Applying remediation configuration")
+            apply_result = nr.run(
+                napalm_configure,
+                configuration=rule.config_snippet,
+                dry_run=False,
+                replace=(rule.apply_mode == "replace"),
+            )
 
-        for host, task_result in apply_result.items():
-            if task_result.failed:
-                raise ValueError(f"Failed to apply config to {host}: {task_result.exception}")
-            js.append_log(job, level="INFO", message=f"Configuration applied to {host}")
+            for host, task_result in apply_result.items():
+                if task_result.failed:
+                    raise ValueError(f"Failed to apply config to {host}: {task_result.exception}")
+                js.append_log(job, level="INFO", message=f"Configuration applied to {host}")
 
-        # Step 3: Take after snapshot
-        js.append_log(job, level="INFO", message="Taking after snapshot")
-        after_result = nr.run(napalm_get, getters=["config"])
+            # Step 3: Take after snapshot
+            js.append_log(job, level="INFO", message="Taking after snapshot")
+            after_result = nr.run(napalm_get, getters=["config"])
 
-        for host, task_result in after_result.items():
-            if task_result.failed:
-                raise ValueError(f"Failed to get config from {host}: {task_result.exception}")
+            for host, task_result in after_result.items():
+                if task_result.failed:
+                    raise ValueError(f"Failed to get config from {host}: {task_result.exception}")
 
-            config_text = (task_result.result.get("config") or {}).get("running") or ""
-            after_snapshot = ConfigSnapshot.objects.create(
-                device=device,
-                job=job,
-                source="remediation_after",
-                config_text=config_text,
-            )
-            action.after_snapshot = after_snapshot
-            action.save(update_fields=["after_snapshot"])
-            js.append_log(
-                job, level="INFO", message=f"After snapshot saved ({len(config_text)} bytes)"
-            )
+                config_text = (task_result.result.get("config") or {}).get("running") or ""
+                after_snapshot = ConfigSnapshot.objects.create(
+                    device=device,
+                    job=job,
+                    source="remediation_after",
+                    config_text=config_text,
+                )
+                action.after_snapshot = after_snapshot
+                action.save(update_fields=["after_snapshot"])
+                js.append_log(
+                    job, level="INFO", message=f"After snapshot saved ({len(config_text)} bytes)"
+                )
 
-        # Step 4: Verify if requested
-        if rule.verify_after:
+        # Step 4: Verify against the after snapshot if requested (no device round-trip)
+        if rule.verify_after and action.after_snapshot:
             js.append_log(job, level="INFO", message="Verifying compliance after remediation")
-            # TODO: Re-run compliance check to verify
-            # For now, we cannot automatically verify, so we leave it as None
-            # The user should manually verify or implement actual compliance re-check
-            js.append_log(
-                job,
-                level="WARNING",
-                message="Automatic verification not yet implemented - manual check recommended",
+            still_failing = _verify_remediation(
+                js, job, rule, action, action.after_snapshot.config_text
             )
+            action.save(update_fields=["verification_passed"])
+            if still_failing:
+                raise ValueError(f"Verification failed: {', '.join(still_failing)}")
 
         # Success
         action.status = "success"
@@ -1465,12 +1972,13 @@ def auto_remediation_job(rule_id: int, compliance_result_id: int) -> None:
             try:
                 js.append_log(job, level="INFO", message="Attempting rollback")
                 nr = _nr_from_inventory(inventory)
-                rollback_result = nr.run(
-                    napalm_configure,
-                    configuration=action.before_snapshot.config_text,
-                    dry_run=False,
-                    replace=True,
-                )
+                with _pooled_connections(nr):
+                    rollback_result = nr.run(
+                        napalm_configure,
+                        configuration=action.before_snapshot.config_text,
+                        dry_run=False,
+                        replace=True,
+                    )
 
                 rollback_failed = False
                 for host, task_result in rollback_result.items():
@@ -1502,6 +2010,273 @@ def auto_remediation_job(rule_id: int, compliance_result_id: int) -> None:
         js.set_status(job, "failed", result_summary={"error": str(e)})
 
 
+def _remediate_host(task, configuration: str, replace: bool = False) -> dict:
+    """Nornir task remediating one host: before snapshot, apply, after snapshot.
+
+    The three steps run back to back over the host's own session, so hosts
+    progress independently instead of waiting for every host at each step. A
+    failing step ends the host's pipeline. The result is ``{"before", "after",
+    "failed_step", "error"}`` with the configs captured so far (``None`` for
+    steps not reached).
+    """
+    outcome: dict = {"before": None, "after": None, "failed_step": None, "error": None}
+    steps = (
+        ("before", napalm_get, {"getters": ["config"]}),
+        (
+            "apply",
+            napalm_configure,
+            {"configuration": configuration, "dry_run": False, "replace": replace},
+        ),
+        ("after", napalm_get, {"getters": ["config"]}),
+    )
+    for step, step_task, kwargs in steps:
+        try:
+            sub = task.run(task=step_task, **kwargs)
+        except Exception as exc:
+            # NornirSubTaskError carries the failed subtask's MultiResult
+            failed_sub = getattr(exc, "result", None)
+            outcome["failed_step"] = step
+            outcome["error"] = str((failed_sub[0].exception if failed_sub else None) or exc)
+            return outcome
+        if step != "apply":
+            outcome[step] = ((sub[0].result or {}).get("config") or {}).get("running") or ""
+    return outcome
+
+
+def _rollback_host(task, configs: dict[str, str]):
+    """Nornir task restoring one host's captured before-config."""
+    return task.run(
+        task=napalm_configure, configuration=configs[task.host.name], dry_run=False, replace=True
+    )
+
+
+def _remediation_waves(items: list, canary: int, size: int) -> list[list]:
+    """Split ``items`` into a canary wave of ``canary`` items and waves of ``size``."""
+    size = max(1, size)
+    waves = [items[:canary]] if canary > 0 else []
+    rest = items[max(0, canary) :]
+    waves.extend(rest[start : start + size] for start in range(0, len(rest), size))
+    return [wave for wave in waves if wave]
+
+
+def _run_remediation_wave(
+    js: JobService, job: Job, rule, wave: list, progress: HostProgress, finish
+) -> None:
+    """Remediate one wave of actions in parallel, rolling back the hosts that failed.
+
+    ``finish(action, status, error)`` records each action's final state.
+    """
+    by_host = {action.device.hostname: action for action in wave}
+    rollback: dict[str, str] = {}
+    errors: dict[str, str] = {}
+
+    def _record(host: str, r) -> None:
+        action = by_host[host]
+        if r.failed or not isinstance(r.result, dict):
+            outcome = {"failed_step": "run", "error": str(r.exception or r.result)}
+        else:
+            outcome = r.result
+        for step in ("before", "after"):
+            if outcome.get(step) is not None:
+                snapshot = ConfigSnapshot.objects.create(
+                    device=action.device,
+                    job=job,
+                    source=f"remediation_{step}",
+                    config_text=outcome[step],
+                )
+                setattr(action, f"{step}_snapshot", snapshot)
+        if outcome.get("failed_step") is None and rule.verify_after:
+            still_failing = _verify_remediation(js, job, rule, action, outcome["after"], host)
+            if still_failing:
+                outcome = {"before": outcome["before"], "failed_step": "verify"}
+                outcome["error"] = f"rules still failing: {', '.join(still_failing)}"
+        if outcome.get("failed_step") is None:
+            js.append_log(job, level="INFO", host=host, message="Remediation applied")
+            finish(action, "success")
+            return
+        errors[host] = f"{outcome['failed_step']} failed: {outcome['error']}"
+        js.append_log(job, level="ERROR", host=host, message=errors[host])
+        if rule.rollback_on_failure and outcome.get("before") is not None:
+            rollback[host] = outcome["before"]
+        else:
+            finish(action, "failed", errors[host])
+
+    def _rolled_back(host: str, r) -> None:
+        if r.failed:
+            js.append_log(job, level="ERROR", host=host, message=f"Rollback failed: {r.exception}")
+            finish(by_host[host], "failed", errors[host])
+        else:
+            js.append_log(job, level="INFO", host=host, message="Rollback successful")
+            finish(by_host[host], "rolled_back", errors[host])
+
+    customer_id = rule.policy.customer_id
+    inventory = build_inventory(customer_id=customer_id, device_ids=[a.device_id for a in wave])
+    for host, action in by_host.items():
+        if host not in inventory.hosts:
+            js.append_log(job, level="ERROR", host=host, message="Device not in inventory")
+            finish(action, "failed", "Device not in inventory")
+    if inventory.hosts:
+        _run_streaming(
+            js,
+            job,
+            _nr_from_inventory(inventory),
+            progress.total,
+            _remediate_host,
+            _record,
+            progress=progress,
+            configuration=rule.config_snippet,
+            replace=rule.apply_mode == "replace",
+        )
+    if not rollback:
+        return
+
+    js.append_log(job, level="INFO", message=f"Rolling back {len(rollback)} devices")
+    try:
+        rollback_inventory = build_inventory(
+            customer_id=customer_id, device_ids=[by_host[host].device_id for host in rollback]
+        )
+        _run_streaming(
+            js,
+            job,
+            _nr_from_inventory(rollback_inventory),
+            len(rollback),
+            _rollback_host,
+            _rolled_back,
+            configs=rollback,
+        )
+    except Exception as exc:
+        logger.error(f"Rollback failed: {exc}", exc_info=True)
+        js.append_log(job, level="ERROR", message=f"Rollback failed: {exc}")
+    for host in rollback:
+        if by_host[host].status == "running":
+            finish(by_host[host], "failed", errors[host])
+
+
+@shared_task(name="batch_remediation_job")
+def batch_remediation_job(rule_id: int, action_ids: list[int] | None = None) -> None:
+    """Apply a remediation rule to many devices as one job.
+
+    Runs the rule's pending ``RemediationAction``s (all of them, or only
+    ``action_ids``) through ``_remediate_host`` in waves: a canary wave of
+    ``REMEDIATION_CANARY_SIZE`` devices, then waves of ``REMEDIATION_WAVE_SIZE``.
+    Hosts within a wave run in parallel. With ``verify_after`` each host's
+    after-snapshot is checked against the rule's policy in-process; a host
+    still failing counts as failed. Failed hosts of a wave with a captured
+    before-config are rolled back together when the rule asks for it. Once
+    the share of failed devices exceeds ``REMEDIATION_MAX_FAILURE_RATIO``
+    after a wave, the remaining devices are left untouched and their actions
+    fail.
+
+    Args:
+        rule_id: ID of the RemediationRule to apply
+        action_ids: IDs of the pending actions to run (default: all pending for the rule)
+    """
+    from django.db import transaction
+    from django.utils import timezone
+    from webnet.compliance.models import RemediationRule, RemediationAction
+
+    js = JobService()
+
+    try:
+        rule = RemediationRule.objects.select_related("policy", "policy__customer").get(pk=rule_id)
+    except RemediationRule.DoesNotExist:
+        logger.error(f"Remediation rule {rule_id} not found")
+        return
+
+    with transaction.atomic():
+        pending = RemediationAction.objects.select_for_update(of=("self",)).filter(
+            rule=rule, status="pending", job__isnull=True
+        )
+        if action_ids is not None:
+            pending = pending.filter(id__in=action_ids)
+        actions = list(pending.select_related("device").order_by("id"))
+        if not actions:
+            return
+        job = js.create_job(
+            job_type="auto_remediation",
+            user=rule.created_by,
+            customer=rule.policy.customer,
+            target_summary={"device_ids": [action.device_id for action in actions]},
+            payload={"rule_id": rule.id, "action_ids": [action.id for action in actions]},
+        )
+        RemediationAction.objects.filter(id__in=[action.id for action in actions]).update(
+            job=job, status="running"
+        )
+    for action in actions:
+        action.job, action.status = job, "running"
+
+    js.set_status(job, "running")
+    max_ratio = getattr(settings, "REMEDIATION_MAX_FAILURE_RATIO", 0.2)
+    waves = _remediation_waves(
+        actions,
+        getattr(settings, "REMEDIATION_CANARY_SIZE", 5),
+        getattr(settings, "REMEDIATION_WAVE_SIZE", 100),
+    )
+    js.append_log(
+        job,
+        level="INFO",
+        message=(
+            f"Starting auto-remediation: {rule.name} on {len(actions)} devices "
+            f"in {len(waves)} waves"
+        ),
+    )
+    progress = HostProgress(job, len(actions))
+    counts = {"success": 0, "failed": 0, "rolled_back": 0}
+
+    def _finish(action, status: str, error: str | None = None) -> None:
+        action.status = status
+        action.error_message = error
+        action.finished_at = timezone.now()
+        action.save(
+            update_fields=[
+                "status",
+                "error_message",
+                "finished_at",
+                "before_snapshot",
+                "after_snapshot",
+                "verification_passed",
+            ]
+        )
+        counts[status] += 1
+
+    try:
+        for number, wave in enumerate(waves, start=1):
+            _run_remediation_wave(js, job, rule, wave, progress, _finish)
+            done = sum(counts.values())
+            unsuccessful = done - counts["success"]
+            if number < len(waves) and unsuccessful > max_ratio * done:
+                remaining = [action.id for later in waves[number:] for action in later]
+                message = (
+                    f"Halted after wave {number}: {unsuccessful} of {done} devices failed "
+                    f"(limit {max_ratio:.0%}); {len(remaining)} devices not remediated"
+                )
+                js.append_log(job, level="ERROR", message=message)
+                RemediationAction.objects.filter(id__in=remaining).update(
+                    status="failed", error_message=message, finished_at=timezone.now()
+                )
+                counts["failed"] += len(remaining)
+                break
+    except Exception as e:
+        logger.error(f"Batch remediation failed: {e}", exc_info=True)
+        js.append_log(job, level="ERROR", message=f"Remediation failed: {str(e)}")
+        RemediationAction.objects.filter(job=job, status="running").update(
+            status="failed", error_message=str(e), finished_at=timezone.now()
+        )
+        js.set_status(job, "failed", result_summary={"rule_id": rule.id, "error": str(e)})
+        return
+
+    progress.send()
+    if counts["success"] == len(actions):
+        status = "success"
+    elif counts["success"]:
+        status = "partial"
+    else:
+        status = "failed"
+    js.set_status(
+        job, status, result_summary={"rule_id": rule.id, "devices": len(actions), **counts}
+    )
+
+
 @shared_task(name="ansible_playbook_job")
 def ansible_playbook_job(
     job_id: int,
@@ -1549,7 +2324,11 @@ def ansible_playbook_job(
     js.append_log(job, level="INFO", message=f"Executing playbook: {playbook.name}")
 
     # Generate Ansible inventory from webnet devices
-    inventory = generate_ansible_inventory(filters=targets, customer_id=job.customer_id)
+    inventory = generate_ansible_inventory(
+        filters=targets,
+        customer_id=job.customer_id,
+        device_ids=resolve_job_device_ids(job, targets or {}),
+    )
 
     # Check if any hosts matched
     if not inventory["_meta"]["hostvars"]:
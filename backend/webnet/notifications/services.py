@@ -13,6 +13,7 @@ from django.utils import timezone
 
 if TYPE_CHECKING:
     from webnet.compliance.models import ComplianceResult
+    from webnet.compliance.violations import ViolationDigest
     from webnet.jobs.models import Job
     from webnet.notifications.models import SMTPConfig
 
@@ -25,6 +26,7 @@ class EmailContext:
 
     job: Job | None = None
     compliance_result: ComplianceResult | None = None
+    violation_digest: ViolationDigest | None = None
     event_type: str = ""
     customer_name: str = ""
     webnet_url: str = ""
@@ -339,3 +341,46 @@ def notify_compliance_violation(compliance_result: ComplianceResult) -> None:
         preferences=preferences,
         related_compliance_result=compliance_result,
     )
+
+
+def notify_compliance_violation_digest(digest: ViolationDigest) -> None:
+    """Send one notification summarising all violations of a policy.
+
+    Recipients are the users subscribed to ``compliance_violation`` events.
+
+    Args:
+        digest: ViolationDigest grouping the policy's violations
+    """
+    from webnet.notifications.models import NotificationPreference
+
+    customer = digest.policy.customer
+
+    preferences = NotificationPreference.objects.filter(
+        customer=customer,
+        event_type="compliance_violation",
+        enabled=True,
+    ).select_related("user")
+
+    if not preferences:
+        logger.debug(
+            f"No notification preferences for compliance_violation in customer {customer.id}"
+        )
+        return
+
+    webnet_url = getattr(settings, "WEBNET_BASE_URL", "http://localhost:8000")
+    context = EmailContext(
+        violation_digest=digest,
+        event_type="compliance_violation_digest",
+        customer_name=customer.name,
+        webnet_url=webnet_url,
+    )
+
+    subject = f"[Webnet] Compliance Violations: {digest.summary()}"
+
+    _send_notifications(
+        customer=customer,
+        event_type="compliance_violation_digest",
+        subject=subject,
+        context=context,
+        preferences=preferences,
+    )
@@ -266,6 +266,29 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Caches. Rendered config diffs get their own bounded cache; point it at Redis
+# (CONFIG_DIFF_CACHE_BACKEND=django.core.cache.backends.redis.RedisCache,
+# CONFIG_DIFF_CACHE_LOCATION=redis://...) to share it between web workers.
+# Redis bounds the cache with its maxmemory-policy (use allkeys-lru); the local-memory
+# backend keeps at most CONFIG_DIFF_CACHE_MAX_ENTRIES diffs.
+CONFIG_DIFF_CACHE_BACKEND = env(
+    "CONFIG_DIFF_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+)
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "config_diffs": {
+        "BACKEND": CONFIG_DIFF_CACHE_BACKEND,
+        "LOCATION": env("CONFIG_DIFF_CACHE_LOCATION", "config-diffs"),
+        "TIMEOUT": int(env("CONFIG_DIFF_CACHE_TTL", str(7 * 24 * 3600))),
+    },
+}
+if CONFIG_DIFF_CACHE_BACKEND.endswith("LocMemCache"):
+    CACHES["config_diffs"]["OPTIONS"] = {
+        "MAX_ENTRIES": int(env("CONFIG_DIFF_CACHE_MAX_ENTRIES", "2000"))
+    }
+
 # Celery
 CELERY_BROKER_URL = env("CELERY_BROKER_URL", REDIS_URL)
 CELERY_RESULT_BACKEND = env("CELERY_RESULT_BACKEND", "redis://localhost:6379/1")
@@ -277,8 +300,83 @@ CELERY_BEAT_SCHEDULE = {
         "task": "process_due_schedules",
         "schedule": 60.0,  # Run every 60 seconds
     },
+    "refresh-drift-summaries": {
+        "task": "refresh_drift_summaries",
+        "schedule": 300.0,  # Run every 5 minutes
+    },
 }
 
+# Job logs are buffered per job and written in batches of JOB_LOG_BUFFER_SIZE entries
+# or every JOB_LOG_FLUSH_INTERVAL_MS milliseconds (a size of 1 disables buffering)
+JOB_LOG_BUFFER_SIZE = int(env("JOB_LOG_BUFFER_SIZE", "100"))
+JOB_LOG_FLUSH_INTERVAL_MS = int(env("JOB_LOG_FLUSH_INTERVAL_MS", "500"))
+
+# Nornir runner policy: worker threads per run, optional host chunking and a cap on
+# concurrent hosts per site. Overridable per job type (NORNIR_RUNNER_BY_JOB_TYPE),
+# per region (Region.worker_pool_config["nornir"]) and per job (payload_json["runner"]).
+NORNIR_NUM_WORKERS = int(env("NORNIR_NUM_WORKERS", "20"))
+NORNIR_CHUNK_SIZE = int(env("NORNIR_CHUNK_SIZE", "0"))  # 0 = run all hosts as one chunk
+NORNIR_PER_SITE_LIMIT = int(env("NORNIR_PER_SITE_LIMIT", "0"))  # 0 = no per-site cap
+NORNIR_RUNNER_BY_JOB_TYPE: dict[str, dict] = {}
+
+# Worker-local pool of device sessions reused across job tasks. Idle sessions are
+# closed after CONNECTION_POOL_IDLE_TTL seconds; at most CONNECTION_POOL_MAX_PER_HOST
+# idle sessions are kept per device.
+CONNECTION_POOL_ENABLED = env("CONNECTION_POOL_ENABLED", "true").lower() == "true"
+CONNECTION_POOL_IDLE_TTL = int(env("CONNECTION_POOL_IDLE_TTL", "300"))
+CONNECTION_POOL_MAX_PER_HOST = int(env("CONNECTION_POOL_MAX_PER_HOST", "1"))
+
+# Codec for new config blobs: "zlib", "zstd" (needs the zstandard package) or "none".
+# Existing blobs keep the codec they were written with.
+CONFIG_BLOB_COMPRESSION = env("CONFIG_BLOB_COMPRESSION", "zlib")
+CONFIG_BLOB_COMPRESSION_LEVEL = (
+    int(env("CONFIG_BLOB_COMPRESSION_LEVEL")) if env("CONFIG_BLOB_COMPRESSION_LEVEL") else None
+)
+# Store new configs as line deltas against the device's previous config, with a
+# full keyframe at least every CONFIG_DELTA_MAX_CHAIN versions.
+CONFIG_DELTA_STORAGE = env("CONFIG_DELTA_STORAGE", "false").lower() == "true"
+CONFIG_DELTA_MAX_CHAIN = int(env("CONFIG_DELTA_MAX_CHAIN", "50"))
+# Line diff engine for drift detection and config diffs: "histogram" (default),
+# "myers" or "difflib" (the original, slower on large repetitive configs).
+CONFIG_DIFF_ENGINE = env("CONFIG_DIFF_ENGINE", "histogram")
+# Cache alias holding rendered diffs, keyed by the two config hashes and diff mode
+CONFIG_DIFF_CACHE = "config_diffs"
+# Record drift against the previous snapshot whenever a backup stores a new config
+CONFIG_DRIFT_ON_BACKUP = env("CONFIG_DRIFT_ON_BACKUP", "true").lower() == "true"
+
+# Persistent per-repository Git working copies used by config backup sync; a sync
+# waits up to GIT_WORKDIR_LOCK_TIMEOUT seconds for another sync of the same repository.
+GIT_WORKDIR_ROOT = env("GIT_WORKDIR_ROOT", str(BASE_DIR / "var" / "git"))
+GIT_WORKDIR_LOCK_TIMEOUT = int(env("GIT_WORKDIR_LOCK_TIMEOUT", "600"))
+# Backups within GIT_SYNC_WINDOW seconds of each other are pushed as one commit per repository
+GIT_SYNC_WINDOW = int(env("GIT_SYNC_WINDOW", "60"))
+# "worktree" keeps a checked-out working copy; "plumbing" keeps a bare clone and writes
+# commits with git fast-import, touching only changed files (for very large fleets).
+GIT_SYNC_BACKEND = env("GIT_SYNC_BACKEND", "worktree")
+
+# Compliance policies are evaluated against stored snapshots in chunks of
+# COMPLIANCE_CHUNK_SIZE devices; runs of at least COMPLIANCE_PARALLEL_MIN_DEVICES
+# devices use a pool of COMPLIANCE_WORKERS processes (0 = one per CPU).
+COMPLIANCE_CHUNK_SIZE = int(env("COMPLIANCE_CHUNK_SIZE", "250"))
+COMPLIANCE_PARALLEL_MIN_DEVICES = int(env("COMPLIANCE_PARALLEL_MIN_DEVICES", "500"))
+COMPLIANCE_WORKERS = int(env("COMPLIANCE_WORKERS", "0"))
+# Re-check devices against the policies covering them when new snapshots are
+# stored; a backup job checks all of its changed devices in one batch
+COMPLIANCE_ON_SNAPSHOT = env("COMPLIANCE_ON_SNAPSHOT", "true").lower() == "true"
+# Without batch mode, auto-remediation for a batch of violations is enqueued as a
+# Celery group of task chunks, each running REMEDIATION_DISPATCH_CHUNK_SIZE of them.
+REMEDIATION_DISPATCH_CHUNK_SIZE = int(env("REMEDIATION_DISPATCH_CHUNK_SIZE", "50"))
+# In batch mode a rule's violations are remediated by one job that runs a canary
+# wave of REMEDIATION_CANARY_SIZE devices, then waves of REMEDIATION_WAVE_SIZE,
+# halting once more than REMEDIATION_MAX_FAILURE_RATIO of the devices failed.
+REMEDIATION_BATCH_MODE = env("REMEDIATION_BATCH_MODE", "true").lower() == "true"
+REMEDIATION_CANARY_SIZE = int(env("REMEDIATION_CANARY_SIZE", "5"))
+REMEDIATION_WAVE_SIZE = int(env("REMEDIATION_WAVE_SIZE", "100"))
+REMEDIATION_MAX_FAILURE_RATIO = float(env("REMEDIATION_MAX_FAILURE_RATIO", "0.2"))
+
+# Topology discovery upserts neighbor links (and discovered devices) in batches
+TOPOLOGY_UPSERT_BATCH_SIZE = int(env("TOPOLOGY_UPSERT_BATCH_SIZE", "1000"))
+
 # Multi-region deployment: Define task routes for regional queues
 # Workers can be started with specific queues using:
 # celery -A webnet.core.celery:celery_app worker -Q region_us-east-1,celery -l info
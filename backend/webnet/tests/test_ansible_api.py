@@ -257,10 +257,12 @@ def test_playbook_git_source():
 
 
 @pytest.mark.django_db
-def test_playbook_upload_source():
+def test_playbook_upload_source(settings, tmp_path):
     """Test creating a playbook with upload source."""
     from io import BytesIO
 
+    settings.MEDIA_ROOT = str(tmp_path)
+
     customer = Customer.objects.create(name="Acme")
     user = User.objects.create_user(username="admin", password="test123", role="admin")
     user.customers.add(customer)
@@ -0,0 +1,283 @@
+"""Tests for the compiled compliance engine and snapshot-based policy runs."""
+
+from unittest.mock import patch
+
+import pytest
+
+from webnet.compliance import engine
+from webnet.compliance.models import CompliancePolicy, ComplianceResult
+from webnet.compliance.services import run_policy
+from webnet.config_mgmt.models import ConfigSnapshot
+from webnet.devices.models import Device
+from webnet.jobs.models import Job
+from webnet.jobs.tasks import compliance_check_job
+
+DEFINITION = r"""
+rules:
+  - name: ntp
+    match: '^ntp server \S+'
+  - name: vty-ssh-only
+    section: '^line vty'
+    match: '^transport input ssh$'
+    not_match: telnet
+    severity: high
+  - name: uplinks-described
+    section: '^interface Gi'
+    match: '^description '
+    require_section: true
+"""
+
+COMPLIANT = """hostname edge
+ntp server 192.0.2.1
+interface Gi0/1
+ description uplink
+!
+line vty 0 4
+ transport input ssh
+!
+"""
+
+NON_COMPLIANT = """hostname edge
+interface Gi0/1
+ shutdown
+!
+line vty 0 4
+ transport input telnet
+!
+"""
+
+
+class TestEngine:
+    def test_compliant_config_passes_every_rule(self):
+        passed, rules = engine.compile_policy(DEFINITION).evaluate(COMPLIANT)
+
+        assert passed
+        assert [rule["rule"] for rule in rules] == ["ntp", "vty-ssh-only", "uplinks-described"]
+
+    def test_findings_name_the_offending_section_and_line(self):
+        passed, rules = engine.compile_policy(DEFINITION).evaluate(NON_COMPLIANT)
+
+        assert not passed
+        findings = {rule["rule"]: rule["findings"] for rule in rules}
+        assert findings["ntp"] == ["missing '^ntp server \\\\S+'"]
+        assert findings["vty-ssh-only"] == [
+            "line vty 0 4: missing '^transport input ssh$'",
+            "line vty 0 4: forbidden 'transport input telnet'",
+        ]
+        assert findings["uplinks-described"] == ["interface Gi0/1: missing '^description '"]
+
+    def test_absent_section_passes_unless_required(self):
+        policy = engine.compile_policy(DEFINITION)
+        _, rules = policy.evaluate("hostname edge\nntp server 192.0.2.1\n")
+
+        assert [rule["passed"] for rule in rules] == [True, True, False]
+
+    @pytest.mark.parametrize(
+        "definition",
+        [
+            "- get_interfaces: {}",
+            "rules: [{name: empty}]",
+            "rules: [{match: '('}]",
+            "rules: [{match: x, severity: urgent}]",
+            "rules: [",
+        ],
+    )
+    def test_invalid_definitions_are_rejected(self, definition):
+        with pytest.raises(engine.PolicyError):
+            engine.compile_policy(definition)
+
+    def test_process_pool_matches_serial_evaluation(self):
+        configs = [(i, COMPLIANT if i % 3 else NON_COMPLIANT) for i in range(15)]
+        chunks = [configs[n : n + 5] for n in (0, 5, 10)]
+
+        serial = list(engine.evaluate_many(DEFINITION, chunks, workers=1))
+        pooled = list(engine.evaluate_many(DEFINITION, iter(chunks), workers=2))
+
+        assert pooled == serial
+        assert [device_id for chunk in pooled for device_id, _, _ in chunk] == list(range(15))
+
+
+@pytest.mark.django_db
+class TestComplianceCheckJob:
+    @pytest.fixture
+    def policy(self, customer, admin_user):
+        return CompliancePolicy.objects.create(
+            customer=customer,
+            name="Baseline",
+            scope_json={"site": "lab"},
+            definition_yaml=DEFINITION,
+            created_by=admin_user,
+        )
+
+    @pytest.fixture
+    def devices(self, customer, credential):
+        devices = []
+        for i, (site, config) in enumerate(
+            [("lab", COMPLIANT), ("lab", NON_COMPLIANT), ("lab", None), ("prod", NON_COMPLIANT)]
+        ):
+            device = Device.objects.create(
+                customer=customer,
+                hostname=f"sw-{i}",
+                mgmt_ip=f"192.0.2.{i + 10}",
+                vendor="cisco",
+                platform="ios",
+                site=site,
+                credential=credential,
+            )
+            if config is not None:
+                ConfigSnapshot.objects.create(device=device, source="manual", config_text="old")
+                ConfigSnapshot.objects.create(device=device, source="manual", config_text=config)
+            devices.append(device)
+        return devices
+
+    def _job(self, policy, admin_user):
+        return Job.objects.create(
+            type="compliance_check",
+            status="queued",
+            user=admin_user,
+            customer=policy.customer,
+            target_summary_json=policy.scope_json,
+        )
+
+    @patch("webnet.compliance.violations.notify_digests")
+    def test_evaluates_latest_snapshot_of_in_scope_devices(
+        self, notify, policy, devices, admin_user
+    ):
+        job = self._job(policy, admin_user)
+
+        compliance_check_job(job.id, policy.id)
+
+        results = {r.device_id: r for r in ComplianceResult.objects.filter(job=job)}
+        assert set(results) == {devices[0].id, devices[1].id}
+        assert results[devices[0].id].status == "passed"
+        failed = results[devices[1].id]
+        assert failed.status == "failed"
+        assert failed.details_json["failed_rules"] == ["ntp", "vty-ssh-only", "uplinks-described"]
+        assert failed.details_json["snapshot_id"] == devices[1].config_snapshots.latest("id").id
+        (digests,), _ = notify.call_args
+        assert [digest.violations for digest in digests] == [[failed]]
+
+        job.refresh_from_db()
+        assert job.status == "success"
+        assert job.result_summary_json == {
+            "policy_id": policy.id,
+            "evaluated": 2,
+            "passed": 1,
+            "failed": 1,
+            "unchanged": 0,
+            "no_config": 1,
+        }
+
+    def test_invalid_definition_fails_the_job(self, policy, devices, admin_user):
+        policy.definition_yaml = "rules: [{name: broken}]"
+        policy.save()
+        job = self._job(policy, admin_user)
+
+        compliance_check_job(job.id, policy.id)
+
+        job.refresh_from_db()
+        assert job.status == "failed"
+        assert not ComplianceResult.objects.filter(job=job).exists()
+
+    def test_query_count_does_not_grow_with_devices(
+        self, policy, devices, admin_user, settings, django_assert_max_num_queries
+    ):
+        from webnet.compliance.services import run_policy
+
+        settings.COMPLIANCE_CHUNK_SIZE = 10
+        job = self._job(policy, admin_user)
+
+        # latest snapshots, blobs, bulk insert
+        with django_assert_max_num_queries(3):
+            run = run_policy(policy, job, [device.id for device in devices])
+        assert (run.passed, run.failed, run.no_config) == (1, 2, [devices[2].id])
+
+    def test_rerun_skips_devices_whose_config_and_policy_are_unchanged(
+        self, policy, devices, admin_user
+    ):
+        from webnet.compliance.services import run_policy
+
+        in_scope = [devices[0].id, devices[1].id]
+        first = run_policy(policy, self._job(policy, admin_user), in_scope)
+        assert (first.evaluated, first.unchanged) == (2, 0)
+
+        second = run_policy(policy, self._job(policy, admin_user), in_scope)
+        assert (second.evaluated, second.unchanged) == (0, 2)
+        assert ComplianceResult.objects.count() == 2
+
+        ConfigSnapshot.objects.create(device=devices[1], source="manual", config_text=COMPLIANT)
+        third = run_policy(policy, self._job(policy, admin_user), in_scope)
+        assert (third.passed, third.failed, third.unchanged) == (1, 0, 1)
+
+        policy.definition_yaml = DEFINITION + "  - name: banner\n    match: '^banner '\n"
+        policy.save()
+        fourth = run_policy(policy, self._job(policy, admin_user), in_scope)
+        assert (fourth.failed, fourth.unchanged) == (2, 0)
+
+        forced = run_policy(policy, self._job(policy, admin_user), in_scope, full=True)
+        assert (forced.evaluated, forced.unchanged) == (2, 0)
+
+    def test_new_snapshot_schedules_a_device_check(
+        self, devices, django_capture_on_commit_callbacks
+    ):
+        with patch("webnet.jobs.tasks.compliance_snapshot_check") as check:
+            with django_capture_on_commit_callbacks(execute=True):
+                ConfigSnapshot.objects.create(
+                    device=devices[0], source="manual", config_text=NON_COMPLIANT
+                )
+
+        check.delay.assert_called_once_with([devices[0].id])
+
+    def test_job_and_remediation_snapshots_are_not_rechecked(
+        self, devices, admin_user, django_capture_on_commit_callbacks
+    ):
+        job = Job.objects.create(
+            type="auto_remediation", status="running", user=admin_user, customer=devices[0].customer
+        )
+        with patch("webnet.jobs.tasks.compliance_snapshot_check") as check:
+            with django_capture_on_commit_callbacks(execute=True):
+                ConfigSnapshot.objects.create(
+                    device=devices[1], job=job, source="remediation_after", config_text="x"
+                )
+                ConfigSnapshot.objects.create(
+                    device=devices[1], source="remediation_before", config_text="y"
+                )
+
+        assert not check.delay.called
+
+    def test_snapshot_check_handles_the_batch_together(self, policy, devices):
+        from webnet.jobs.tasks import compliance_snapshot_check
+
+        with (
+            patch("webnet.compliance.services.run_policy", wraps=run_policy) as runs,
+            patch("webnet.jobs.tasks._handle_compliance_violations") as handle,
+        ):
+            compliance_snapshot_check([device.id for device in devices])
+
+        # One run for the in-scope devices; the prod device matches no policy
+        (run_args,) = [call.args for call in runs.call_args_list]
+        assert run_args[:2] == (policy, None)
+        assert sorted(run_args[2]) == [devices[0].id, devices[1].id, devices[2].id]
+        (violations,), _ = handle.call_args
+        assert [result.device_id for result in violations] == [devices[1].id]
+
+    def test_device_check_only_evaluates_policies_in_scope(
+        self, policy, devices, customer, admin_user
+    ):
+        from webnet.compliance.services import evaluate_device
+
+        CompliancePolicy.objects.create(
+            customer=customer,
+            name="Prod only",
+            scope_json={"site": "prod"},
+            definition_yaml=DEFINITION,
+            created_by=admin_user,
+        )
+
+        failed_ids = evaluate_device(devices[1].id)
+
+        result = ComplianceResult.objects.get(device=devices[1])
+        assert result.policy == policy
+        assert result.job is None
+        assert failed_ids == [result.id]
+        assert evaluate_device(devices[1].id) == []
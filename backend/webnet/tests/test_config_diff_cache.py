@@ -0,0 +1,75 @@
+"""Tests for cached config diffs."""
+
+import pytest
+from django.core.cache import caches
+
+from webnet.config_mgmt import diff_cache, diffing
+from webnet.config_mgmt.models import ConfigSnapshot
+from webnet.devices.models import Device
+
+
+@pytest.fixture(autouse=True)
+def clear_diff_cache(settings):
+    caches[settings.CONFIG_DIFF_CACHE].clear()
+    yield
+    caches[settings.CONFIG_DIFF_CACHE].clear()
+
+
+@pytest.fixture
+def snapshots(db, customer, credential):
+    device = Device.objects.create(
+        customer=customer,
+        hostname="edge-1",
+        mgmt_ip="192.0.2.20",
+        vendor="cisco",
+        platform="ios",
+        credential=credential,
+    )
+    old = "hostname edge-1\ninterface Gi0/1\n description old\n!"
+    new = "hostname edge-1\ninterface Gi0/1\n description new\n!"
+    return [
+        ConfigSnapshot.objects.create(device=device, source="manual", config_text=text)
+        for text in (old, new, old)
+    ]
+
+
+def test_cached_diff_matches_fresh_render(snapshots, monkeypatch):
+    first, second, _ = snapshots
+    expected = "\n".join(
+        diffing.diff_text(first.config_text, second.config_text).unified(
+            fromfile=f"snapshot-{first.id}", tofile=f"snapshot-{second.id}"
+        )
+    )
+
+    assert diff_cache.unified_diff(first, second) == expected
+
+    def fail(*args, **kwargs):
+        raise AssertionError("diff recomputed")
+
+    monkeypatch.setattr(diffing, "diff_text", fail)
+    assert diff_cache.unified_diff(first, second) == expected
+
+
+def test_cache_is_shared_by_snapshots_with_the_same_config(snapshots, monkeypatch):
+    first, second, third = snapshots
+    diff_cache.unified_diff(first, second)
+    monkeypatch.setattr(diffing, "diff_text", None)
+
+    reused = diff_cache.unified_diff(third, second)
+
+    assert reused.startswith(f"--- snapshot-{third.id}\n+++ snapshot-{second.id}\n")
+    assert diff_cache.unified_diff(first, third) == ""
+
+
+def test_api_diff_supports_conditional_requests(client, operator_user, snapshots):
+    first, second, _ = snapshots
+    client.force_login(operator_user)
+    url = f"/api/v1/config/devices/{first.device_id}/diff?from={first.id}&to={second.id}"
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert "+ description new" in response.json()["diff"]
+    etag = response["ETag"]
+
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+    assert client.get(url + "&context=0").json()["diff"].count("\n") == 4
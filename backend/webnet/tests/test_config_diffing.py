@@ -0,0 +1,87 @@
+"""Tests for the config line diff engines."""
+
+import difflib
+import random
+
+import pytest
+
+from webnet.config_mgmt.diffing import DIFF_ENGINES, diff_lines, diff_opcodes, unified_lines
+
+
+def _apply(opcodes, a, b):
+    out = []
+    for tag, i1, i2, j1, j2 in opcodes:
+        if tag == "equal":
+            assert a[i1:i2] == b[j1:j2]
+            out.extend(a[i1:i2])
+        else:
+            out.extend(b[j1:j2])
+    return out
+
+
+def _interfaces(count):
+    lines = []
+    for i in range(count):
+        lines += [f"interface Ethernet1/{i}", " description server", " no shutdown", "!"]
+    return lines
+
+
+@pytest.mark.parametrize("engine", sorted(DIFF_ENGINES))
+def test_engines_produce_valid_edit_scripts(engine):
+    rng = random.Random(7)
+    for _ in range(200):
+        a = [str(rng.randint(0, 12)) for _ in range(rng.randint(0, 40))]
+        b = list(a)
+        for _ in range(rng.randint(0, 6)):
+            if b and rng.random() < 0.5:
+                b[rng.randrange(len(b))] = str(rng.randint(0, 12))
+            else:
+                b.insert(rng.randint(0, len(b)), str(rng.randint(0, 12)))
+        assert _apply(diff_opcodes(a, b, engine), a, b) == b
+
+
+def test_histogram_matches_difflib_counts_on_repetitive_config():
+    a = _interfaces(500)
+    b = list(a)
+    b[1001] = " shutdown"
+    b.insert(40, "ip access-list extended EDGE")
+
+    fast = diff_lines(a, b, "histogram")
+    slow = diff_lines(a, b, "difflib")
+
+    assert (fast.additions, fast.deletions) == (slow.additions, slow.deletions) == (2, 1)
+    assert list(fast.unified("x", "y")) == list(difflib.unified_diff(a, b, "x", "y", lineterm=""))
+
+
+def test_unified_lines_renders_like_difflib():
+    a = ["hostname r1", "interface Gi0/1", " ip address 10.0.0.1 255.255.255.0", "!"]
+    b = ["hostname r2", "interface Gi0/1", " ip address 10.0.0.2 255.255.255.0", "!", "end"]
+    opcodes = difflib.SequenceMatcher(None, a, b).get_opcodes()
+
+    rendered = list(unified_lines(opcodes, a, b, fromfile="old", tofile="new", context=1))
+
+    assert rendered == list(difflib.unified_diff(a, b, "old", "new", lineterm="", n=1))
+
+
+@pytest.mark.parametrize("context", [0, 1, 3])
+def test_unified_lines_groups_hunks_like_difflib(context):
+    rng = random.Random(11)
+    for _ in range(200):
+        a = [str(rng.randint(0, 30)) for _ in range(rng.randint(0, 60))]
+        b = list(a)
+        for _ in range(rng.randint(0, 4)):
+            if b and rng.random() < 0.5:
+                del b[rng.randrange(len(b))]
+            else:
+                b.insert(rng.randint(0, len(b)), str(rng.randint(0, 30)))
+        opcodes = difflib.SequenceMatcher(None, a, b).get_opcodes()
+
+        rendered = list(unified_lines(opcodes, a, b, context=context))
+
+        assert rendered == list(difflib.unified_diff(a, b, "", "", lineterm="", n=context))
+
+
+def test_unknown_engine_is_rejected(settings):
+    settings.CONFIG_DIFF_ENGINE = "nope"
+    with pytest.raises(ValueError):
+        diff_opcodes(["a"], ["b"])
@@ -0,0 +1,217 @@
+"""Tests for content-addressed config snapshot storage."""
+
+import difflib
+import hashlib
+
+import pytest
+from django.contrib.auth import get_user_model
+
+from webnet.config_mgmt import compression
+from webnet.config_mgmt.models import ConfigBlob, ConfigDrift, ConfigSnapshot
+from webnet.customers.models import Customer
+from webnet.devices.models import Credential, Device
+from webnet.jobs import tasks
+from webnet.jobs.models import Job
+
+CONFIG = "hostname edge1\ninterface Gi0/1\n description uplink\n"
+
+
+@pytest.fixture
+def device():
+    customer = Customer.objects.create(name="Acme")
+    cred = Credential.objects.create(customer=customer, name="lab", username="netops")
+    return Device.objects.create(
+        customer=customer,
+        hostname="edge1",
+        mgmt_ip="192.0.2.10",
+        vendor="cisco",
+        platform="ios",
+        credential=cred,
+    )
+
+
+@pytest.mark.django_db
+def test_identical_snapshots_share_one_blob(device):
+    first = ConfigSnapshot.objects.create(device=device, config_text=CONFIG)
+    second = ConfigSnapshot.objects.create(device=device, config_text=CONFIG)
+    other = ConfigSnapshot.objects.create(device=device, config_text=CONFIG + "end\n")
+
+    assert first.hash == hashlib.sha256(CONFIG.encode()).hexdigest()
+    assert first.blob_id == second.blob_id == first.hash
+    assert other.blob_id != first.blob_id
+    assert ConfigBlob.objects.count() == 2
+    assert ConfigSnapshot.objects.get(pk=second.pk).config_text == CONFIG
+
+    stats = ConfigBlob.storage_stats(customer_id=device.customer_id)
+    assert stats["snapshots"] == 3
+    assert stats["blobs"] == 2
+    assert stats["unique_bytes"] == len(CONFIG) * 2 + len("end\n")
+    assert stats["saved_bytes"] == stats["logical_bytes"] - stats["stored_bytes"]
+
+
+@pytest.mark.django_db
+def test_blob_body_is_compressed_and_decompressed_lazily(device, settings):
+    settings.CONFIG_BLOB_COMPRESSION = "zlib"
+    text = "".join(f"interface Gi0/{i}\n description access\n" for i in range(200))
+    snapshot = ConfigSnapshot.objects.create(device=device, config_text=text)
+
+    blob = ConfigBlob.objects.get(pk=snapshot.blob_id)
+    assert blob.encoding == "zlib"
+    assert blob.stored_size == len(bytes(blob.data)) < blob.size // 5
+    assert "_text" not in blob.__dict__
+    assert blob.text == text
+    assert ConfigSnapshot.objects.get(pk=snapshot.pk).config_text == text
+    assert ConfigBlob.storage_stats()["compression_ratio"] > 5
+
+
+@pytest.mark.parametrize("encoding", ["none", "zlib"])
+def test_compression_round_trip(encoding):
+    stored_as, data = compression.compress(CONFIG, encoding)
+    assert stored_as == encoding
+    assert compression.decompress(stored_as, data) == CONFIG
+
+
+class _Result:
+    failed = False
+    exception = None
+
+    def __init__(self, config):
+        self.result = {"config": {"running": config}}
+
+
+class _Nornir:
+    def __init__(self, config):
+        self.config = config
+
+    def run(self, task, **kwargs):
+        return {"edge1": _Result(self.config)}
+
+
+class _Inventory:
+    hosts = {"edge1": object()}
+
+
+@pytest.mark.django_db
+def test_config_backup_skips_unchanged_config(device, monkeypatch):
+    user = get_user_model().objects.create_user(username="alice", password="x", role="admin")
+    ConfigSnapshot.objects.create(device=device, config_text=CONFIG)
+    monkeypatch.setattr(
+        tasks,
+        "build_inventory",
+        lambda targets=None, customer_id=None, device_ids=None: _Inventory(),
+    )
+
+    def _backup(config):
+        job = Job.objects.create(
+            type="config_backup", status="queued", user=user, customer=device.customer
+        )
+        monkeypatch.setattr(tasks, "_nr_from_inventory", lambda inv: _Nornir(config))
+        tasks.config_backup_job(job.id, {}, auto_git_sync=False)
+        job.refresh_from_db()
+        return job
+
+    notified, checked = [], []
+    monkeypatch.setattr(tasks, "notify_drift_digests", notified.append)
+    monkeypatch.setattr(tasks.compliance_snapshot_check, "delay", checked.append)
+
+    unchanged = _backup(CONFIG)
+    assert unchanged.status == "success"
+    assert unchanged.result_summary_json["unchanged"] == 1
+    assert ConfigSnapshot.objects.filter(device=device).count() == 1
+
+    changed = _backup(CONFIG + "end\n")
+    assert changed.result_summary_json["snapshots_created"] == 1
+    assert changed.result_summary_json["drifts_detected"] == 1
+    assert ConfigSnapshot.objects.filter(device=device).count() == 2
+    drift = ConfigDrift.objects.get(device=device)
+    assert (drift.additions, drift.deletions) == (1, 0)
+    assert notified == [[drift]]
+    # One batched compliance check for the backup's changed devices
+    assert checked == [[device.id]]
+
+
+def _config(version):
+    lines = [f"interface Gi0/{i}\n description access port {i}\n" for i in range(120)]
+    lines[version % 120] = f"interface Gi0/{version % 120}\n description changed {version}\n"
+    return f"hostname edge1\n! version {version}\n" + "".join(lines)
+
+
+@pytest.mark.django_db
+def test_delta_chain_is_bounded_and_reconstructs(device, settings):
+    settings.CONFIG_DELTA_STORAGE = True
+    settings.CONFIG_DELTA_MAX_CHAIN = 3
+    snapshots = [
+        ConfigSnapshot.objects.create(device=device, config_text=_config(v)) for v in range(6)
+    ]
+
+    blobs = [ConfigBlob.objects.get(pk=s.blob_id) for s in snapshots]
+    assert [b.chain_depth for b in blobs] == [0, 1, 2, 3, 0, 1]
+    assert blobs[1].base_id == blobs[0].hash
+    assert blobs[3].stored_size < blobs[0].stored_size
+    for version, snapshot in enumerate(snapshots):
+        assert ConfigSnapshot.objects.get(pk=snapshot.pk).config_text == _config(version)
+    assert ConfigBlob.storage_stats()["delta_blobs"] == 4
+
+
+@pytest.mark.django_db
+def test_drift_reads_adjacent_changes_from_delta(device, settings, monkeypatch):
+    from webnet.config_mgmt import drift_service
+
+    settings.CONFIG_DELTA_STORAGE = True
+    older = ConfigSnapshot.objects.create(device=device, config_text=_config(1))
+    newer = ConfigSnapshot.objects.create(device=device, config_text=_config(2))
+    expected = list(
+        difflib.unified_diff(_config(1).splitlines(), _config(2).splitlines(), lineterm="")
+    )
+
+    def _no_rediff(*args, **kwargs):
+        raise AssertionError("adjacent drift should not re-diff")
+
+    monkeypatch.setattr(drift_service, "diff_text", _no_rediff)
+    drift = drift_service.DriftService().detect_drift(
+        ConfigSnapshot.objects.get(pk=older.pk), ConfigSnapshot.objects.get(pk=newer.pk)
+    )
+
+    assert drift.additions == sum(1 for line in expected if line[:1] == "+") - 1
+    assert drift.deletions == sum(1 for line in expected if line[:1] == "-") - 1
+    assert drift.total_lines == len(expected)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "older, newer",
+    [(_config(1).rstrip("\n"), _config(1)), (_config(1).replace("\n", "\r\n"), _config(1))],
+    ids=["trailing-newline", "crlf"],
+)
+def test_line_ending_changes_are_not_drift(device, settings, older, newer):
+    from webnet.config_mgmt.drift_service import DriftService
+
+    settings.CONFIG_DELTA_STORAGE = True
+    first = ConfigSnapshot.objects.create(device=device, config_text=older)
+    second = ConfigSnapshot.objects.create(device=device, config_text=newer)
+
+    assert ConfigSnapshot.objects.get(pk=second.pk).config_text == newer
+    drift = DriftService().detect_drift(first, second)
+    assert (drift.additions, drift.deletions, drift.has_changes) == (0, 0, False)
+
+
+@pytest.mark.django_db
+def test_rollback_keyframes_delta_blobs(device, settings):
+    import importlib
+
+    from django.apps import apps
+
+    migration = importlib.import_module("webnet.config_mgmt.migrations.0009_config_blob_deltas")
+    settings.CONFIG_DELTA_STORAGE = True
+    snapshots = [
+        ConfigSnapshot.objects.create(device=device, config_text=_config(v)) for v in range(4)
+    ]
+    assert ConfigBlob.objects.filter(base__isnull=False).count() == 3
+
+    migration.keyframe_deltas(apps, None)
+
+    assert not ConfigBlob.objects.filter(base__isnull=False).exists()
+    for version, snapshot in enumerate(snapshots):
+        blob = ConfigBlob.objects.get(pk=snapshot.blob_id)
+        assert blob.chain_depth == 0
+        assert compression.decompress(blob.encoding, blob.data) == _config(version)
@@ -0,0 +1,133 @@
+"""Tests for the section-aware structural config diff."""
+
+from webnet.config_mgmt import structure
+from webnet.config_mgmt.structure import diff_trees, parse_config, structural_diff
+
+IOS = """!
+! Last configuration change at 10:00:00
+version 15.2
+hostname edge1
+!
+interface Gi0/1
+ description uplink
+ ip address 10.0.0.1 255.255.255.0
+ no shutdown
+!
+interface Gi0/2
+ shutdown
+!
+router ospf 1
+ network 10.0.0.0 0.0.0.255 area 0
+!
+end
+"""
+
+JUNOS = """system {
+    host-name edge1;
+}
+interfaces {
+    ge-0/0/0 {
+        unit 0 {
+            family inet {
+                address 10.0.0.1/24;
+            }
+        }
+    }
+}
+"""
+
+
+def _by_section(diff):
+    return {change.section: change for change in diff.changes}
+
+
+def test_reports_changes_per_section_and_skips_comments():
+    changed = (
+        IOS.replace("hostname edge1", "hostname edge2")
+        .replace("10.0.0.1 255", "10.0.0.2 255")
+        .replace("interface Gi0/2\n shutdown\n!\n", "")
+        .replace("! Last configuration change at 10:00:00", "! Last configuration change at 11:00")
+    )
+
+    diff = structural_diff(IOS, changed)
+    sections = _by_section(diff)
+
+    assert set(sections) == {"global", "interface Gi0/1", "interface Gi0/2"}
+    assert (sections["interface Gi0/1"].added, sections["interface Gi0/1"].removed) == (1, 1)
+    assert sections["interface Gi0/2"].status == "removed"
+    assert sections["interface Gi0/2"].removed == 2
+    assert "interface Gi0/1: 2 lines changed" in diff.summary()
+    assert not structural_diff(IOS, IOS).has_changes
+
+
+def test_unchanged_sections_are_not_parsed():
+    changed = IOS.replace(" network 10.0.0.0", " network 10.1.0.0")
+    old, new = parse_config(IOS), parse_config(changed)
+
+    diff = diff_trees(old, new)
+
+    assert [change.section for change in diff.changes] == ["router ospf 1"]
+    assert diff.sensitive_changes()
+    untouched = {child.line: child for child in old.children}["interface Gi0/1"]
+    assert untouched._children is None
+    assert old.digest != new.digest
+
+
+def test_large_section_change_builds_blocks_for_changed_lines_only(monkeypatch):
+    built = []
+
+    class CountingBlock(structure.ConfigBlock):
+        __slots__ = ()
+
+        def __init__(self, line, raw=None):
+            built.append(line)
+            super().__init__(line, raw)
+
+    monkeypatch.setattr(structure, "ConfigBlock", CountingBlock)
+    acl = "".join(f" {i * 10} permit tcp any host 10.0.{i // 250}.{i % 250}\n" for i in range(5000))
+    old_text = f"hostname edge1\nip access-list extended EDGE\n{acl}!\n"
+    new_text = old_text.replace(" 40 permit tcp", " 40 deny tcp").replace(" 49990 ", " 49995 ")
+    old, new = parse_config(old_text), parse_config(new_text)
+
+    diff = diff_trees(old, new)
+
+    (change,) = diff.changes
+    assert change.section == "ip access-list extended EDGE"
+    assert (change.added, change.removed) == (2, 2)
+    # Unchanged ACL entries are compared as raw text, never built into blocks
+    assert len(built) < 20
+
+
+def test_nested_sections_and_reordering():
+    bgp = (
+        "router bgp 65000\n"
+        " neighbor 10.0.0.1 remote-as 65001\n"
+        " address-family ipv4\n"
+        "  neighbor 10.0.0.1 activate\n"
+        "  network 10.1.0.0 mask 255.255.0.0\n"
+        " exit-address-family\n"
+        "!\n"
+    )
+    reordered = bgp.replace(
+        "  neighbor 10.0.0.1 activate\n  network 10.1.0.0 mask 255.255.0.0\n",
+        "  network 10.1.0.0 mask 255.255.0.0\n  neighbor 10.0.0.1 activate\n",
+    )
+    assert not structural_diff(bgp, reordered).has_changes
+
+    diff = structural_diff(bgp, bgp.replace("10.1.0.0 mask", "10.2.0.0 mask"))
+    assert [change.section for change in diff.changes] == ["router bgp 65000 > address-family ipv4"]
+    assert not structural_diff(bgp, bgp.replace("\n", "\r\n")).has_changes
+
+
+def test_junos_braces_and_set_syntax():
+    diff = structural_diff(JUNOS, JUNOS.replace("10.0.0.1", "10.0.0.9"), platform="junos")
+    assert [change.section for change in diff.changes] == [
+        "interfaces > ge-0/0/0 > unit 0 > family inet"
+    ]
+
+    flat = (
+        "set system host-name edge1\n"
+        "set interfaces ge-0/0/0 unit 0 family inet address 10.0.0.1/24\n"
+    )
+    diff = structural_diff(flat, flat.replace("edge1", "edge2"))
+    assert [change.section for change in diff.changes] == ["system host-name"]
@@ -0,0 +1,142 @@
+"""Tests for the worker-local device connection pool."""
+
+import pytest
+
+from webnet.jobs.connections import ConnectionPool
+
+
+class _Session:
+    def __init__(self, alive=True):
+        self.alive = alive
+
+    def is_alive(self):
+        return self.alive
+
+
+class _Plugin:
+    def __init__(self, alive=True):
+        self.connection = _Session(alive)
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class _Host:
+    def __init__(self, device_id=1, credential_id=10, password="secret", hostname="10.0.0.1"):
+        self.name = f"dev{device_id}"
+        self.hostname = hostname
+        self.platform = "ios"
+        self.username = "admin"
+        self.password = password
+        self.data = {"device_id": device_id, "credential_id": credential_id}
+        self.connections = {}
+
+
+def _run_and_release(pool, host, plugin):
+    with pool.lease([host]):
+        host.connections.setdefault("netmiko", plugin)
+
+
+def test_lease_reuses_session_for_next_run():
+    pool = ConnectionPool(idle_ttl=60, max_per_host=1, enabled=True)
+    plugin = _Plugin()
+    first = _Host()
+    _run_and_release(pool, first, plugin)
+
+    assert first.connections == {}
+    assert pool.size() == 1
+
+    second = _Host()
+    with pool.lease([second]):
+        assert second.connections["netmiko"] is plugin
+        assert pool.size() == 0
+    assert not plugin.closed
+    assert pool.size() == 1
+
+
+def test_checkout_drops_dead_expired_and_stale_sessions():
+    pool = ConnectionPool(idle_ttl=60, max_per_host=1, enabled=True)
+
+    dead = _Plugin(alive=False)
+    _run_and_release(pool, _Host(), dead)
+    fresh = _Host()
+    pool.checkout(fresh)
+    assert fresh.connections == {}
+    assert dead.closed
+
+    stale = _Plugin()
+    _run_and_release(pool, _Host(password="old"), stale)
+    rotated = _Host(password="new")
+    pool.checkout(rotated)
+    assert rotated.connections == {}
+    assert stale.closed
+
+    idle = _Plugin()
+    _run_and_release(pool, _Host(), idle)
+    for entry in pool._idle[(1, 10)]:
+        entry.last_used -= 120
+    pool.expire()
+    assert idle.closed
+    assert pool.size() == 0
+
+
+def test_release_enforces_max_per_host_and_invalidate_closes():
+    pool = ConnectionPool(idle_ttl=60, max_per_host=1, enabled=True)
+    a, b = _Plugin(), _Plugin()
+    host_a, host_b = _Host(), _Host()
+    pool.checkout(host_a)
+    pool.checkout(host_b)
+    host_a.connections["netmiko"] = a
+    host_b.connections["netmiko"] = b
+    pool.release(host_a)
+    pool.release(host_b)
+
+    assert a.closed
+    assert pool.size() == 1
+
+    pool.invalidate(credential_id=10)
+    assert b.closed
+    assert pool.size() == 0
+
+
+def test_lease_survives_checkout_failure(monkeypatch):
+    pool = ConnectionPool(idle_ttl=60, max_per_host=1, enabled=True)
+
+    def broken_checkout(host):
+        raise RuntimeError("pool bookkeeping failed")
+
+    monkeypatch.setattr(pool, "checkout", broken_checkout)
+    _run_and_release(pool, _Host(), _Plugin())
+
+    assert pool.size() == 1
+
+
+def test_pooled_connections_skips_duck_typed_inventories():
+    from unittest.mock import Mock
+
+    from webnet.jobs.tasks import _pooled_connections
+
+    nr = Mock()
+    with _pooled_connections(nr) as leased:
+        assert leased is nr
+
+
+@pytest.mark.django_db
+def test_credential_save_invalidates_pooled_sessions(monkeypatch):
+    from webnet.customers.models import Customer
+    from webnet.devices.models import Credential
+    from webnet.jobs import signals
+
+    pool = ConnectionPool(idle_ttl=60, max_per_host=1, enabled=True)
+    monkeypatch.setattr(signals, "connection_pool", pool)
+    customer = Customer.objects.create(name="Acme")
+    cred = Credential.objects.create(customer=customer, name="lab", username="admin")
+    plugin = _Plugin()
+    _run_and_release(pool, _Host(credential_id=cred.id), plugin)
+
+    cred.password = "rotated"
+    cred.save()
+
+    assert plugin.closed
+    assert pool.size() == 0
@@ -0,0 +1,94 @@
+"""Tests for the shared device target resolver."""
+
+import pytest
+from django.contrib.auth import get_user_model
+
+from webnet.customers.models import Customer
+from webnet.devices.models import Credential, Device, DeviceGroup, Tag
+from webnet.devices.targeting import (
+    filter_devices,
+    job_target_filters,
+    resolve_job_device_ids,
+)
+from webnet.jobs.models import Job
+
+
+@pytest.fixture
+def customer():
+    return Customer.objects.create(name="Acme")
+
+
+def _device(customer, hostname, **fields):
+    cred, _ = Credential.objects.get_or_create(
+        customer=customer, name="lab", defaults={"username": "netops"}
+    )
+    defaults = {"mgmt_ip": "192.0.2.1", "vendor": "cisco", "platform": "ios"}
+    defaults.update(fields)
+    return Device.objects.create(customer=customer, hostname=hostname, credential=cred, **defaults)
+
+
+@pytest.mark.django_db
+def test_filter_devices_matches_case_insensitively_and_combines_filters(customer):
+    core = _device(customer, "core1", site="DC1", role="core")
+    _device(customer, "edge1", site="dc1", role="edge")
+    _device(customer, "core2", site="DC2", role="core")
+    _device(customer, "core3", site="DC1", role="core", enabled=False)
+
+    matched = filter_devices({"site": "dc1", "role": "CORE"}, customer.id)
+
+    assert list(matched) == [core]
+
+
+@pytest.mark.django_db
+def test_filter_devices_supports_tags_and_groups(customer):
+    edge = _device(customer, "edge1", site="DC1")
+    core = _device(customer, "core1", site="DC2")
+    tag = Tag.objects.create(customer=customer, name="pci")
+    edge.device_tags.add(tag)
+    dynamic = DeviceGroup.objects.create(
+        customer=customer,
+        name="dc2",
+        group_type=DeviceGroup.TYPE_DYNAMIC,
+        filter_rules={"site": "dc2"},
+    )
+
+    assert list(filter_devices({"tags": ["pci"]}, customer.id)) == [edge]
+    assert list(filter_devices({"group_ids": [dynamic.id]}, customer.id)) == [core]
+    assert list(dynamic.get_devices()) == [core]
+
+
+@pytest.mark.django_db
+def test_resolve_job_device_ids_caches_on_job(customer, django_assert_num_queries):
+    user = get_user_model().objects.create_user(username="alice", password="x", role="admin")
+    edge = _device(customer, "edge1", site="DC1")
+    _device(customer, "edge2", site="DC2")
+    job = Job.objects.create(
+        type="run_commands",
+        status="queued",
+        user=user,
+        customer=customer,
+        target_summary_json={"filters": {"site": "DC1"}},
+    )
+
+    assert job_target_filters(job) == {"site": "DC1"}
+    assert resolve_job_device_ids(job) == [edge.id]
+
+    reloaded = Job.objects.get(pk=job.pk)
+    assert reloaded.target_device_ids == [edge.id]
+    _device(customer, "edge3", site="DC1")
+    with django_assert_num_queries(0):
+        assert resolve_job_device_ids(reloaded) == [edge.id]
+
+
+@pytest.mark.django_db
+def test_job_target_filters_accepts_flat_scope(customer):
+    user = get_user_model().objects.create_user(username="alice", password="x", role="admin")
+    job = Job.objects.create(
+        type="compliance_check",
+        status="queued",
+        user=user,
+        customer=customer,
+        target_summary_json={"vendor": "cisco", "note": "ignored"},
+    )
+
+    assert job_target_filters(job) == {"vendor": "cisco"}
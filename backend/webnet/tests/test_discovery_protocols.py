@@ -229,7 +229,11 @@ class TestTopologyDiscoveryJob:
             type="topology_discovery", status="queued", user=user, customer=customer
         )
 
-        monkeypatch.setattr(tasks, "build_inventory", lambda targets, customer_id: _FakeInventory())
+        monkeypatch.setattr(
+            tasks,
+            "build_inventory",
+            lambda targets, customer_id, device_ids=None: _FakeInventory(),
+        )
         monkeypatch.setattr(
             tasks,
             "_nr_from_inventory",
@@ -250,7 +254,11 @@ class TestTopologyDiscoveryJob:
             type="topology_discovery", status="queued", user=user, customer=customer
         )
 
-        monkeypatch.setattr(tasks, "build_inventory", lambda targets, customer_id: _FakeInventory())
+        monkeypatch.setattr(
+            tasks,
+            "build_inventory",
+            lambda targets, customer_id, device_ids=None: _FakeInventory(),
+        )
         monkeypatch.setattr(
             tasks,
             "_nr_from_inventory",
@@ -269,7 +277,11 @@ class TestTopologyDiscoveryJob:
             type="topology_discovery", status="queued", user=user, customer=customer
         )
 
-        monkeypatch.setattr(tasks, "build_inventory", lambda targets, customer_id: _FakeInventory())
+        monkeypatch.setattr(
+            tasks,
+            "build_inventory",
+            lambda targets, customer_id, device_ids=None: _FakeInventory(),
+        )
         monkeypatch.setattr(
             tasks,
             "_nr_from_inventory",
@@ -290,7 +302,11 @@ class TestTopologyDiscoveryJob:
             type="topology_discovery", status="queued", user=user, customer=customer
         )
 
-        monkeypatch.setattr(tasks, "build_inventory", lambda targets, customer_id: _FakeInventory())
+        monkeypatch.setattr(
+            tasks,
+            "build_inventory",
+            lambda targets, customer_id, device_ids=None: _FakeInventory(),
+        )
         monkeypatch.setattr(
             tasks,
             "_nr_from_inventory",
@@ -304,6 +320,82 @@ class TestTopologyDiscoveryJob:
         assert discovered.filter(hostname="switch01.example.com").exists()
         assert discovered.first().status == DiscoveredDevice.STATUS_PENDING
 
+    def _discover(self, monkeypatch, customer, user, nr, **kwargs):
+        job = Job.objects.create(
+            type="topology_discovery", status="queued", user=user, customer=customer
+        )
+        monkeypatch.setattr(
+            tasks,
+            "build_inventory",
+            lambda targets, customer_id, device_ids=None: _FakeInventory(),
+        )
+        monkeypatch.setattr(tasks, "_nr_from_inventory", lambda inv: nr)
+        tasks.topology_discovery_job(job.id, targets={}, protocol="cdp", **kwargs)
+        job.refresh_from_db()
+        return job
+
+    def test_rediscovery_upserts_links_and_removes_unseen(
+        self, monkeypatch, setup_customer_and_device
+    ):
+        """Test a repeat discovery updates links in place and deletes links not seen again."""
+        customer, user, device, cred = setup_customer_and_device
+        first = self._discover(monkeypatch, customer, user, _FakeNR(cdp_output=CDP_OUTPUT))
+        assert first.result_summary_json["links_created"] == 2
+        ids = set(TopologyLink.objects.values_list("id", flat=True))
+        TopologyLink.objects.create(
+            customer=customer,
+            local_device=device,
+            local_interface="GigabitEthernet0/9",
+            remote_hostname="retired-switch",
+            remote_interface="Gi0/1",
+            protocol="cdp",
+        )
+        lldp_link = TopologyLink.objects.create(
+            customer=customer,
+            local_device=device,
+            local_interface="Gi0/3",
+            remote_hostname="switch02.example.com",
+            remote_interface="Gi0/24",
+            protocol="lldp",
+        )
+
+        second = self._discover(monkeypatch, customer, user, _FakeNR(cdp_output=CDP_OUTPUT))
+
+        assert second.result_summary_json["links_created"] == 0
+        assert second.result_summary_json["links_removed"] == 1
+        # Same rows, refreshed by this run; the LLDP link was not part of a CDP run
+        refreshed = TopologyLink.objects.filter(job_id=second.id).values_list("id", flat=True)
+        assert set(refreshed) == ids
+        assert set(TopologyLink.objects.values_list("id", flat=True)) == ids | {lldp_link.id}
+
+    def test_failed_host_keeps_its_links(self, monkeypatch, setup_customer_and_device):
+        """Test links are only removed for hosts that answered."""
+        customer, user, device, cred = setup_customer_and_device
+        self._discover(monkeypatch, customer, user, _FakeNR(cdp_output=CDP_OUTPUT))
+
+        failing = _FakeNR()
+        failing.run = lambda task, **kwargs: {"h1": _FakeResult("timeout", failed=True)}
+        job = self._discover(monkeypatch, customer, user, failing)
+
+        assert job.result_summary_json["links_removed"] == 0
+        assert TopologyLink.objects.count() == 2
+
+    def test_rediscovered_devices_are_updated_not_duplicated(
+        self, monkeypatch, setup_customer_and_device
+    ):
+        """Test unknown neighbors are upserted on (customer, hostname)."""
+        customer, user, device, cred = setup_customer_and_device
+        nr = _FakeNR(cdp_output=CDP_OUTPUT)
+        first = self._discover(monkeypatch, customer, user, nr, auto_create_devices=True)
+        second = self._discover(monkeypatch, customer, user, nr, auto_create_devices=True)
+
+        assert first.result_summary_json["devices_discovered"] == 2
+        assert second.result_summary_json["devices_discovered"] == 0
+        assert set(DiscoveredDevice.objects.values_list("hostname", "job_id")) == {
+            ("switch01.example.com", second.id),
+            ("router01", second.id),
+        }
+
 
 @pytest.mark.django_db
 class TestDiscoveredDeviceModel:
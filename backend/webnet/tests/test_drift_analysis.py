@@ -1,8 +1,10 @@
 """Tests for configuration drift analysis feature."""
 
+from unittest.mock import patch
+
 import pytest
-from webnet.config_mgmt.models import ConfigSnapshot, ConfigDrift
-from webnet.config_mgmt.drift_service import DriftService
+from webnet.config_mgmt.models import ConfigSnapshot, ConfigDrift, DriftDailySummary
+from webnet.config_mgmt.drift_service import DriftService, notify_drift_digests
 from webnet.devices.models import Device
 
 
@@ -189,6 +191,44 @@ class TestDriftAlerts:
         assert alert.severity in ["warning", "critical"]
         assert alert.status == "open"
 
+    def test_drift_records_sections_and_flags_sensitive_changes(
+        self, drift_service, device_with_snapshots, operator_user
+    ):
+        """Small changes to sensitive lines or sections still raise a warning."""
+        device, snapshots = device_with_snapshots
+        base = snapshots[2].config_text
+        snap = ConfigSnapshot.objects.create(
+            device=device,
+            source="manual",
+            config_text=base + "\nsnmp-server community public RO\n",
+        )
+
+        drift = drift_service.detect_drift(snapshots[2], snap, operator_user)
+        alert = drift_service.analyze_drift_for_alert(drift, threshold=50)
+
+        assert drift.section_changes == [
+            {
+                "section": "global",
+                "status": "modified",
+                "added": 1,
+                "removed": 0,
+                "lines": ["+snmp-server community public RO"],
+            }
+        ]
+        assert alert.severity == "warning"
+
+        acl = ConfigSnapshot.objects.create(
+            device=device,
+            source="manual",
+            config_text=base + "\nip access-list extended MGMT\n permit ip any any\n",
+        )
+        drift = drift_service.detect_drift(snapshots[2], acl, operator_user)
+        alert = drift_service.analyze_drift_for_alert(drift, threshold=50)
+
+        assert drift.diff_summary == "ip access-list extended MGMT: section added (2 lines)"
+        assert alert.severity == "warning"
+        assert "ip access-list extended MGMT" in alert.message
+
     def test_analyze_drift_for_alert_idempotent(
         self, drift_service, device_with_snapshots, operator_user
     ):
@@ -328,6 +368,193 @@ class TestDriftAPI:
         assert "total_deletions" in data
 
 
+@pytest.mark.django_db
+class TestIncrementalDrift:
+    """Test drift computed at snapshot creation and in fleet backfills."""
+
+    def test_detect_drift_for_snapshot_uses_previous_snapshot(
+        self, drift_service, device_with_snapshots, operator_user
+    ):
+        """Only the previous snapshot of the same device is compared."""
+        device, (snap1, snap2, snap3) = device_with_snapshots
+
+        drift = drift_service.detect_drift_for_snapshot(snap3, operator_user)
+
+        assert drift.snapshot_from == snap2
+        assert drift.snapshot_to == snap3
+        assert drift.has_changes is True
+        assert drift_service.detect_drift_for_snapshot(snap1) is None
+
+    def test_detect_drift_for_snapshot_skips_identical_config(
+        self, drift_service, device_with_snapshots
+    ):
+        """Identical configs share a blob and produce no drift record."""
+        device, snapshots = device_with_snapshots
+        same = ConfigSnapshot.objects.create(
+            device=device, source="manual", config_text=snapshots[2].config_text
+        )
+
+        assert drift_service.detect_drift_for_snapshot(same) is None
+        assert not ConfigDrift.objects.filter(snapshot_to=same).exists()
+
+    def test_analyze_fleet_backfills_once(self, drift_service, device_with_snapshots):
+        """Fleet analysis creates missing drifts and is idempotent."""
+        device, snapshots = device_with_snapshots
+        drift_service.detect_drift(snapshots[0], snapshots[1])
+        ConfigSnapshot.objects.create(
+            device=device, source="manual", config_text=snapshots[2].config_text
+        )
+
+        stats = drift_service.analyze_fleet(customer_id=device.customer_id)
+
+        assert stats == {"devices": 1, "pairs": 3, "created": 1, "unchanged": 1, "existing": 1}
+        again = drift_service.analyze_fleet(customer_id=device.customer_id)
+        assert again["created"] == 0
+        assert ConfigDrift.objects.filter(device=device).count() == 2
+
+    def test_analyze_fleet_only_notifies_when_asked(self, drift_service, device_with_snapshots):
+        """A backfill records historical drifts without flooding ChatOps channels."""
+        device, _ = device_with_snapshots
+        with (
+            patch("webnet.chatops.slack_service.notify_drift_detected") as slack,
+            patch("webnet.chatops.teams_service.notify_drift_detected_teams") as teams,
+        ):
+            stats = drift_service.analyze_fleet(customer_id=device.customer_id)
+            assert stats["created"] == 2
+            assert not slack.called and not teams.called
+
+            ConfigDrift.objects.all().delete()
+            drift_service.analyze_fleet(customer_id=device.customer_id, notify=True)
+            assert slack.call_count == teams.call_count == 2
+
+    def test_snapshot_pairs_carry_the_device_platform(
+        self, drift_service, device_with_snapshots, django_assert_num_queries
+    ):
+        """Structural diffs read the platform without a query per pair."""
+        device, _ = device_with_snapshots
+        pairs = list(drift_service._snapshot_pairs(ConfigSnapshot.objects.filter(device=device)))
+
+        with django_assert_num_queries(0):
+            assert [current.device.platform for _, current in pairs] == ["ios", "ios"]
+
+    def test_drift_digests_send_one_message_per_customer(
+        self, drift_service, device_with_snapshots
+    ):
+        """Several drifts become one digest; a lone drift keeps the detailed message."""
+        _, snapshots = device_with_snapshots
+        drifts = [
+            drift_service.detect_drift(snapshots[0], snapshots[1]),
+            drift_service.detect_drift(snapshots[1], snapshots[2]),
+        ]
+        with (
+            patch("webnet.chatops.slack_service.notify_drift_detected") as slack,
+            patch("webnet.chatops.slack_service.notify_drift_digest") as slack_digest,
+            patch("webnet.chatops.teams_service.notify_drift_digest_teams") as teams_digest,
+        ):
+            notify_drift_digests(drifts)
+            assert not slack.called
+            assert slack_digest.call_count == teams_digest.call_count == 1
+            digest = slack_digest.call_args.args[0]
+            assert digest.count == 2
+            assert digest.hostnames() == ["test-router", "test-router"]
+
+            notify_drift_digests(drifts[:1])
+            slack.assert_called_once_with(drifts[0])
+            assert slack_digest.call_count == 1
+
+
+@pytest.mark.django_db
+class TestDriftRollups:
+    """Test SQL-side drift statistics and the daily summary table."""
+
+    def test_change_frequency_is_one_query(
+        self, drift_service, device_with_snapshots, django_assert_num_queries
+    ):
+        """Totals are aggregated in the database."""
+        device, _ = device_with_snapshots
+        drifts = drift_service.detect_consecutive_drifts(device.id)
+
+        with django_assert_num_queries(1):
+            stats = drift_service.get_change_frequency(device.id)
+
+        assert stats["total_changes"] == 2
+        assert stats["total_additions"] == sum(d.additions for d in drifts)
+        assert stats["total_deletions"] == sum(d.deletions for d in drifts)
+
+    def test_refresh_daily_summaries_is_incremental(self, drift_service, device_with_snapshots):
+        """A refresh only rewrites days that received new drift records."""
+        device, snapshots = device_with_snapshots
+        drift_service.detect_drift(snapshots[0], snapshots[1])
+
+        assert drift_service.refresh_daily_summaries() == {"buckets": 1, "rows": 1}
+        summary = DriftDailySummary.objects.get(device=device)
+        assert summary.drifts == 1
+
+        drift_service.detect_drift(snapshots[1], snapshots[2])
+        assert drift_service.refresh_daily_summaries() == {"buckets": 1, "rows": 1}
+        summary.refresh_from_db()
+        assert summary.drifts == 2
+        assert summary.churn == sum(
+            d.additions + d.deletions for d in ConfigDrift.objects.filter(device=device)
+        )
+
+    def test_fleet_rollups(self, drift_service, device_with_snapshots):
+        """Top devices and the site heatmap read from the summary table."""
+        device, _ = device_with_snapshots
+        device.site = "dc1"
+        device.save()
+        drift_service.detect_consecutive_drifts(device.id)
+        drift_service.refresh_daily_summaries(full=True)
+        churn = DriftDailySummary.objects.get(device=device).churn
+
+        top = drift_service.top_churning_devices(device.customer_id, days=7)
+        heatmap = drift_service.churn_heatmap(device.customer_id, days=7)
+
+        assert [(row["hostname"], row["churn"]) for row in top] == [(device.hostname, churn)]
+        assert len(heatmap["days"]) == 7
+        assert heatmap["sites"] == [
+            {"site": "dc1", "churn": [0] * 6 + [churn], "drifts": [0] * 6 + [2]}
+        ]
+
+    def test_fleet_api(self, client, operator_user, device_with_snapshots, drift_service):
+        """Fleet endpoints are scoped to a customer."""
+        device, _ = device_with_snapshots
+        drift_service.detect_consecutive_drifts(device.id)
+        drift_service.refresh_daily_summaries()
+
+        client.force_login(operator_user)
+        response = client.get(
+            f"/api/v1/config/drift/fleet/top-devices?customer_id={device.customer_id}"
+        )
+
+        assert response.status_code == 200
+        assert response.json()[0]["device_id"] == device.id
+        response = client.get(
+            f"/api/v1/config/drift/fleet/heatmap?customer_id={device.customer_id}"
+        )
+        assert response.status_code == 200
+        assert len(response.json()["days"]) == 30
+
+    def test_fleet_api_validates_query_params(self, client, operator_user, device_with_snapshots):
+        """Bad numbers are rejected and out-of-range ones clamped."""
+        device, _ = device_with_snapshots
+        client.force_login(operator_user)
+        base = "/api/v1/config/drift/fleet"
+        customer = f"customer_id={device.customer_id}"
+
+        for url in (
+            f"{base}/top-devices?{customer}&limit=ten",
+            f"{base}/top-devices?{customer}&days=x",
+            f"{base}/heatmap?{customer}&days=week",
+        ):
+            assert client.get(url).status_code == 400
+
+        assert client.get(f"{base}/top-devices?{customer}&limit=-5&days=-1").status_code == 200
+        response = client.get(f"{base}/heatmap?{customer}&days=0")
+        assert response.status_code == 200
+        assert len(response.json()["days"]) == 1
+
+
 @pytest.mark.django_db
 class TestDriftUI:
     """Test drift UI views."""
@@ -8,11 +8,13 @@ from webnet.users.models import User
 from webnet.customers.models import Customer
 from webnet.jobs.models import Job
 from webnet.compliance.models import CompliancePolicy, ComplianceResult
+from webnet.compliance.violations import ViolationDigest
 from webnet.devices.models import Device, Credential
 from webnet.notifications.models import SMTPConfig, NotificationPreference, NotificationEvent
 from webnet.notifications.services import (
     notify_job_event,
     notify_compliance_violation,
+    notify_compliance_violation_digest,
     EmailService,
 )
 
@@ -201,6 +203,55 @@ class TestEmailNotifications:
         assert len(mail.outbox) == 1
         assert "Compliance Violation" in mail.outbox[0].subject
 
+    def test_compliance_violation_digest(self, user, customer, smtp_config):
+        """Test one digest email covers every violation of a policy."""
+        settings.EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+
+        NotificationPreference.objects.create(
+            user=user,
+            customer=customer,
+            event_type="compliance_violation",
+            enabled=True,
+        )
+        policy = CompliancePolicy.objects.create(
+            customer=customer,
+            name="Test Policy",
+            scope_json={},
+            definition_yaml="rules: []",
+            created_by=user,
+        )
+        credential = Credential.objects.create(
+            customer=customer, name="test-cred", username="admin"
+        )
+        results = []
+        for i, failed_rules in enumerate([["ntp"], ["ntp", "banner"]]):
+            device = Device.objects.create(
+                customer=customer,
+                hostname=f"router-{i}",
+                mgmt_ip=f"192.168.1.{i + 1}",
+                vendor="cisco",
+                platform="ios",
+                credential=credential,
+            )
+            results.append(
+                ComplianceResult.objects.create(
+                    policy=policy,
+                    device=device,
+                    status="failed",
+                    details_json={"failed_rules": failed_rules},
+                )
+            )
+
+        notify_compliance_violation_digest(ViolationDigest(policy, results))
+
+        assert len(mail.outbox) == 1
+        assert mail.outbox[0].subject == (
+            "[Webnet] Compliance Violations: Test Policy: 2 devices in violation"
+        )
+        assert "router-0, router-1" in mail.outbox[0].body
+        assert "ntp: 2 devices" in mail.outbox[0].body
+        assert NotificationEvent.objects.get().event_type == "compliance_violation_digest"
+
     def test_no_smtp_config_no_notification(self, user, customer):
         """Test that no notification is sent when SMTP is not configured."""
         settings.EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
@@ -432,3 +432,269 @@ class TestConfigSnapshotGitFields:
         assert config_snapshot.git_synced is True
         assert config_snapshot.git_commit_hash == "abc123def456"
         assert config_snapshot.git_sync_log == log
+
+
+@pytest.fixture
+def local_remote(tmp_path, settings, customer):
+    """A bare Git repository with one commit, configured as the customer's remote."""
+    import subprocess
+
+    settings.GIT_WORKDIR_ROOT = str(tmp_path / "workdirs")
+    remote = tmp_path / "remote.git"
+    seed = tmp_path / "seed"
+    subprocess.run(["git", "init", "-q", "--bare", "-b", "main", str(remote)], check=True)
+    subprocess.run(["git", "clone", "-q", str(remote), str(seed)], check=True)
+    (seed / "README").write_text("configs\n")
+    for args in (
+        ["add", "README"],
+        ["-c", "user.email=t@test", "-c", "user.name=t", "commit", "-qm", "init"],
+        ["push", "-q", "origin", "main"],
+    ):
+        subprocess.run(["git", *args], cwd=seed, check=True)
+    repo = GitRepository.objects.create(
+        customer=customer, name="Local", remote_url=str(remote), branch="main"
+    )
+    return repo, remote
+
+
+@pytest.mark.django_db
+class TestGitWorkingCopy:
+    """Tests for syncs against a persistent working copy."""
+
+    def _remote_log(self, remote):
+        import subprocess
+
+        out = subprocess.run(
+            ["git", "log", "--format=%s", "main"], cwd=remote, capture_output=True, text=True
+        )
+        return out.stdout.splitlines()
+
+    def test_sync_reuses_working_copy_and_skips_unchanged(self, local_remote, config_snapshot):
+        """A second sync fetches into the same copy and commits only changed configs."""
+        from webnet.config_mgmt.git_service import GitService
+
+        repo, remote = local_remote
+        first = GitService(repo).sync_snapshots([config_snapshot], commit_message="first")
+        assert first.success and first.files_synced == 1
+
+        workdir = GitService(repo)._working_copy_dir()
+        marker = workdir / ".git" / "webnet-test-marker"
+        marker.write_text("kept")
+
+        again = GitService(repo).sync_snapshots([config_snapshot], commit_message="again")
+        assert again.success and again.commit_hash is None
+        assert marker.exists()
+        assert self._remote_log(remote) == ["first", "init"]
+
+        changed = ConfigSnapshot.objects.create(
+            device=config_snapshot.device, source="test", config_text="hostname router1-new\n"
+        )
+        result = GitService(repo).sync_snapshots([changed], commit_message="changed")
+        assert result.success and result.files_synced == 1
+        assert self._remote_log(remote) == ["changed", "first", "init"]
+        changed.refresh_from_db()
+        assert changed.git_commit_hash == result.commit_hash
+
+    def test_corrupt_working_copy_is_recloned(self, local_remote, config_snapshot):
+        """A broken working copy is replaced by a fresh clone."""
+        import shutil
+
+        from webnet.config_mgmt.git_service import GitService
+
+        repo, remote = local_remote
+        assert GitService(repo).sync_snapshots([config_snapshot]).success
+        shutil.rmtree(GitService(repo)._working_copy_dir() / ".git" / "objects")
+
+        changed = ConfigSnapshot.objects.create(
+            device=config_snapshot.device, source="test", config_text="hostname r1\n"
+        )
+        assert GitService(repo).sync_snapshots([changed]).success
+        assert len(self._remote_log(remote)) == 3
+
+    def test_retry_after_failed_push_pushes_the_config(
+        self, local_remote, config_snapshot, monkeypatch
+    ):
+        """A config whose push failed is pushed by the next sync, not left local."""
+        from webnet.config_mgmt.git_service import GitService
+
+        repo, remote = local_remote
+        assert GitService(repo).sync_snapshots([config_snapshot]).success
+
+        changed = ConfigSnapshot.objects.create(
+            device=config_snapshot.device, source="test", config_text="hostname r1\n"
+        )
+
+        def fail_push(self):
+            raise RuntimeError("Git push failed: rejected")
+
+        with monkeypatch.context() as patched:
+            patched.setattr(GitService, "_push_changes", fail_push)
+            assert not GitService(repo).sync_snapshots([changed], commit_message="lost").success
+        assert len(self._remote_log(remote)) == 2
+
+        retry = GitService(repo).sync_snapshots([changed], commit_message="retry")
+        assert retry.success and retry.commit_hash
+        assert self._remote_log(remote)[0] == "retry"
+        changed.refresh_from_db()
+        assert changed.git_commit_hash == retry.commit_hash
+
+
+@pytest.mark.django_db
+class TestCoalescedGitSync:
+    """Tests for the per-repository sync batch."""
+
+    def test_backups_in_one_window_share_a_flush(self, git_repository, monkeypatch, settings):
+        """Only the first queued batch schedules a flush."""
+        from webnet.jobs import tasks
+
+        settings.GIT_SYNC_WINDOW = 30
+        scheduled = []
+        monkeypatch.setattr(
+            tasks.git_sync_flush,
+            "apply_async",
+            lambda args, countdown: scheduled.append((args, countdown)),
+        )
+
+        tasks.schedule_git_sync(git_repository.id, [3, 1], triggering_job_id=7)
+        tasks.schedule_git_sync(git_repository.id, [2, 3])
+
+        git_repository.refresh_from_db()
+        assert scheduled == [((git_repository.id, 7), 30)]
+        assert git_repository.pending_snapshot_ids == [1, 2, 3]
+        assert git_repository.sync_pending_since is not None
+
+    def test_flush_syncs_batch_once_and_defers_while_busy(
+        self, git_repository, monkeypatch, settings
+    ):
+        """A flush takes the whole batch; a concurrent flush leaves it queued."""
+        from webnet.config_mgmt import git_service
+        from webnet.config_mgmt.git_service import SyncResult, claim_git_sync, queue_git_sync
+        from webnet.jobs import tasks
+
+        calls = []
+        monkeypatch.setattr(
+            git_service,
+            "sync_configs_to_git",
+            lambda customer_id, snapshot_ids, job: calls.append(snapshot_ids)
+            or SyncResult(success=True, files_synced=len(snapshot_ids)),
+        )
+        deferred = []
+        monkeypatch.setattr(
+            tasks.git_sync_flush, "apply_async", lambda args, countdown: deferred.append(args)
+        )
+        queue_git_sync(git_repository.id, [5, 6])
+
+        assert claim_git_sync(git_repository.id) == (git_repository, [5, 6])
+        queue_git_sync(git_repository.id, [8])
+        assert tasks.git_sync_flush(git_repository.id) == {"success": True, "deferred": True}
+        assert deferred == [(git_repository.id, None)]
+
+        git_service.release_git_sync(git_repository.id)
+        result = tasks.git_sync_flush(git_repository.id)
+
+        assert result["snapshots"] == 1
+        assert calls == [[8]]
+        git_repository.refresh_from_db()
+        assert git_repository.pending_snapshot_ids == []
+        assert git_repository.sync_started_at is None
+
+
+@pytest.mark.django_db
+class TestPlumbingGitBackend:
+    """Tests for commits written without a working tree."""
+
+    def test_plumbing_backend_commits_only_changed_configs(
+        self, local_remote, config_snapshot, settings
+    ):
+        """Configs are committed from a bare clone and unchanged ones are skipped."""
+        import subprocess
+
+        from webnet.config_mgmt.git_service import PlumbingGitService, get_git_service
+
+        settings.GIT_SYNC_BACKEND = "plumbing"
+        repo, remote = local_remote
+        service = get_git_service(repo)
+        assert isinstance(service, PlumbingGitService)
+
+        first = service.sync_snapshots([config_snapshot], commit_message="first")
+        assert first.success and first.files_synced == 1
+        assert (service._working_copy_dir() / "HEAD").is_file()
+        assert not (service._working_copy_dir() / "README").exists()
+
+        again = get_git_service(repo).sync_snapshots([config_snapshot], commit_message="again")
+        assert again.success and again.commit_hash is None
+
+        path = repo.get_config_path(config_snapshot.device)
+        shown = subprocess.run(
+            ["git", "show", f"main:{path}"], cwd=remote, capture_output=True, text=True
+        )
+        assert shown.stdout == config_snapshot.config_text
+        log = subprocess.run(
+            ["git", "log", "--format=%s", "main"], cwd=remote, capture_output=True, text=True
+        )
+        assert log.stdout.splitlines() == ["first", "init"]
+
+    def test_stored_hashes_reads_only_the_requested_paths(
+        self, local_remote, config_snapshot, settings
+    ):
+        """Metadata is looked up per synced path; missing and non-JSON files read as None."""
+        from pathlib import Path
+
+        from webnet.config_mgmt.git_service import get_git_service
+
+        settings.GIT_SYNC_BACKEND = "plumbing"
+        repo, _ = local_remote
+        assert get_git_service(repo).sync_snapshots([config_snapshot]).success
+        meta = str(Path(repo.get_config_path(config_snapshot.device)).with_suffix(".meta.json"))
+
+        service = get_git_service(repo)
+        with service._working_copy():
+            stored = service._stored_hashes(["README", "nowhere/gone.meta.json", meta])
+
+        assert stored == {
+            "README": None,
+            "nowhere/gone.meta.json": None,
+            meta: config_snapshot.hash,
+        }
+
+
+@pytest.mark.django_db
+class TestGitSyncQueries:
+    """Tests for the database work done by a sync."""
+
+    def _snapshots(self, customer, credential, start, count):
+        snapshot_ids = []
+        for i in range(start, start + count):
+            device = Device.objects.create(
+                customer=customer,
+                hostname=f"edge-{i}",
+                mgmt_ip=f"10.1.{i // 250}.{i % 250 + 1}",
+                vendor="cisco",
+                platform="ios",
+                credential=credential,
+            )
+            snapshot = ConfigSnapshot.objects.create(
+                device=device, source="test", config_text=f"hostname edge-{i}\n"
+            )
+            snapshot_ids.append(snapshot.id)
+        return snapshot_ids
+
+    @pytest.mark.parametrize("backend", ["worktree", "plumbing"])
+    def test_query_count_is_constant(self, local_remote, customer, credential, settings, backend):
+        """Syncing 40 snapshots costs as many queries as syncing 2."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from webnet.config_mgmt.git_service import sync_configs_to_git
+
+        settings.GIT_SYNC_BACKEND = backend
+        counts = []
+        for start, count in ((0, 2), (2, 40)):
+            snapshot_ids = self._snapshots(customer, credential, start, count)
+            with CaptureQueriesContext(connection) as queries:
+                result = sync_configs_to_git(customer.id, snapshot_ids)
+            assert result.success and result.files_synced == count
+            counts.append(len(queries))
+
+        assert counts[0] == counts[1]
+        assert not ConfigSnapshot.objects.filter(git_synced=False).exists()
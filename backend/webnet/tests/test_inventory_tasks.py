@@ -44,6 +44,66 @@ def test_build_inventory_scopes_by_customer_and_filters():
     assert host.extras["site"] == "DC1"
 
 
+@pytest.mark.django_db
+def test_build_inventory_supports_role_tag_and_group_filters():
+    from webnet.devices.models import DeviceGroup, Tag
+
+    customer = Customer.objects.create(name="Acme")
+    core = _make_device(customer, hostname="core1")
+    core.role = "core"
+    core.save()
+    edge = _make_device(customer, hostname="edge1")
+    pci = Tag.objects.create(customer=customer, name="pci")
+    edge.device_tags.add(pci)
+    group = DeviceGroup.objects.create(customer=customer, name="cores")
+    group.devices.add(core)
+
+    assert set(build_inventory({"role": "core"}, customer_id=customer.id).hosts) == {"core1"}
+    assert set(build_inventory({"tags": ["pci"]}, customer_id=customer.id).hosts) == {"edge1"}
+    assert set(build_inventory({"group_ids": [group.id]}, customer_id=customer.id).hosts) == {
+        "core1"
+    }
+
+
+@pytest.mark.django_db
+def test_build_inventory_decrypts_each_credential_once(monkeypatch):
+    from webnet import automation
+
+    customer = Customer.objects.create(name="Acme")
+    first = _make_device(customer, hostname="edge1")
+    Device.objects.create(
+        customer=customer,
+        hostname="edge2",
+        mgmt_ip="192.0.2.11",
+        vendor="cisco",
+        platform="ios",
+        credential=first.credential,
+    )
+    automation.inventory_cache.clear()
+    calls = []
+    real_decrypt = automation.decrypt_text
+    monkeypatch.setattr(
+        automation, "decrypt_text", lambda value: calls.append(value) or real_decrypt(value)
+    )
+
+    inv = build_inventory({}, customer_id=customer.id)
+    build_inventory({}, customer_id=customer.id)
+
+    assert len(calls) == 1
+    assert inv.hosts["edge1"].password == inv.hosts["edge2"].password == "password123"
+    assert (
+        inv.hosts["edge1"].connection_options["netmiko"]
+        is inv.hosts["edge2"].connection_options["netmiko"]
+    )
+
+    cred = first.credential
+    cred.password = "rotated"
+    cred.save()
+
+    assert build_inventory({}, customer_id=customer.id).hosts["edge1"].password == "rotated"
+    assert len(calls) == 2
+
+
 class _DummyResult:
     def __init__(self, result, failed: bool = False, exception=None):
         self.result = result
@@ -79,7 +139,9 @@ def test_run_commands_job_updates_status_and_logs(monkeypatch):
     job = Job.objects.create(type="run_commands", status="queued", user=user, customer=customer)
 
     monkeypatch.setattr(
-        tasks, "build_inventory", lambda targets=None, customer_id=None: _DummyInventory(["edge1"])
+        tasks,
+        "build_inventory",
+        lambda targets=None, customer_id=None, device_ids=None: _DummyInventory(["edge1"]),
     )
     monkeypatch.setattr(tasks, "_nr_from_inventory", lambda inv: _DummyNornir(inv.hosts.keys()))
 
@@ -101,7 +163,7 @@ def test_config_backup_job_creates_snapshot(monkeypatch):
     monkeypatch.setattr(
         tasks,
         "build_inventory",
-        lambda targets=None, customer_id=None: _DummyInventory([device.hostname]),
+        lambda targets=None, customer_id=None, device_ids=None: _DummyInventory([device.hostname]),
     )
     monkeypatch.setattr(tasks, "_nr_from_inventory", lambda inv: _DummyNornir(inv.hosts.keys()))
 
@@ -0,0 +1,91 @@
+import pytest
+from django.contrib.auth import get_user_model
+
+from webnet.customers.models import Customer
+from webnet.jobs.models import Job, JobLog
+from webnet.jobs.services import JobService, flush_pending_job_logs
+from webnet.jobs import services as job_services
+
+User = get_user_model()
+
+
+@pytest.fixture
+def job(db):
+    customer = Customer.objects.create(name="Acme")
+    user = User.objects.create_user(username="alice", password="secret123", role="admin")
+    user.customers.add(customer)
+    return Job.objects.create(type="run_commands", status="queued", user=user, customer=customer)
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    messages = []
+    monkeypatch.setattr(
+        job_services, "_broadcast_job_logs", lambda job_id, logs: messages.append(list(logs))
+    )
+    return messages
+
+
+@pytest.mark.django_db
+def test_append_log_buffers_until_batch_is_full(job, sent):
+    js = JobService(log_buffer_size=3, log_flush_interval_ms=60_000)
+
+    js.append_log(job, level="INFO", message="one")
+    js.append_log(job, level="INFO", message="two")
+    assert JobLog.objects.filter(job=job).count() == 0
+
+    js.append_log(job, level="INFO", message="three")
+
+    assert list(
+        JobLog.objects.filter(job=job).order_by("ts", "id").values_list("message", flat=True)
+    ) == [
+        "one",
+        "two",
+        "three",
+    ]
+    # One broadcast for the whole batch
+    assert len(sent) == 1
+    assert [log.message for log in sent[0]] == ["one", "two", "three"]
+
+
+@pytest.mark.django_db
+def test_append_log_flushes_after_interval(job, sent):
+    js = JobService(log_buffer_size=100, log_flush_interval_ms=0)
+
+    js.append_log(job, level="INFO", message="one")
+
+    assert JobLog.objects.filter(job=job).count() == 1
+
+
+@pytest.mark.django_db
+def test_set_status_flushes_pending_logs(job, sent):
+    js = JobService(log_buffer_size=100, log_flush_interval_ms=60_000)
+    js.append_log(job, level="INFO", host="edge1", message="done")
+    assert JobLog.objects.filter(job=job).count() == 0
+
+    js.set_status(job, "running")
+
+    log = JobLog.objects.get(job=job)
+    assert log.host == "edge1"
+    assert log.message == "done"
+
+
+@pytest.mark.django_db
+def test_unbuffered_mode_writes_immediately(job, sent):
+    js = JobService(log_buffer_size=1)
+
+    log = js.append_log(job, level="INFO", message="now")
+
+    assert log.pk is not None
+    assert len(sent) == 1
+
+
+@pytest.mark.django_db
+def test_flush_pending_job_logs_recovers_abandoned_buffers(job, sent):
+    js = JobService(log_buffer_size=100, log_flush_interval_ms=60_000)
+    js.append_log(job, level="ERROR", message="crashed before set_status")
+    del js
+
+    assert flush_pending_job_logs() == 1
+    assert JobLog.objects.filter(job=job, level="ERROR").count() == 1
+    assert flush_pending_job_logs() == 0
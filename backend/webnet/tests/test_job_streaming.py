@@ -0,0 +1,162 @@
+import threading
+
+import pytest
+from nornir.core import Nornir
+from nornir.core.inventory import Defaults, Groups, Host, Hosts, Inventory
+from nornir.plugins.runners import ThreadedRunner
+from nornir.core.task import Result
+
+from webnet.jobs.streaming import run_streaming
+
+
+def _nornir(*names: str) -> Nornir:
+    hosts = Hosts({name: Host(name=name) for name in names})
+    return Nornir(
+        inventory=Inventory(hosts=hosts, groups=Groups(), defaults=Defaults()),
+        runner=ThreadedRunner(num_workers=len(names)),
+    )
+
+
+def test_run_streaming_handles_hosts_before_slowest_finishes():
+    fast_handled = threading.Event()
+    slow_saw_fast = {}
+
+    def _task(task):
+        if task.host.name == "slow":
+            # Only finishes once the fast host's result was already handled
+            slow_saw_fast["value"] = fast_handled.wait(timeout=5)
+        return Result(host=task.host, result=f"out-{task.host.name}")
+
+    seen = []
+
+    def _on_result(host, result):
+        seen.append((host, result.result))
+        if host == "fast":
+            fast_handled.set()
+
+    run_streaming(_nornir("fast", "slow"), _task, _on_result, keep_results=True)
+
+    assert slow_saw_fast["value"] is True
+    assert seen == [("fast", "out-fast"), ("slow", "out-slow")]
+
+
+def test_run_streaming_releases_payloads_after_callback():
+    captured = []
+
+    def _task(task):
+        return Result(host=task.host, result="x" * 1000)
+
+    run_streaming(_nornir("a", "b"), _task, lambda host, r: captured.append((host, r)))
+
+    assert sorted(host for host, _ in captured) == ["a", "b"]
+    assert all(r.result is None for _, r in captured)
+
+
+def test_run_streaming_reports_failures_and_reraises_callback_errors():
+    def _task(task):
+        if task.host.name == "bad":
+            raise RuntimeError("unreachable")
+        return Result(host=task.host, result="ok")
+
+    failed = {}
+    run_streaming(_nornir("good", "bad"), _task, lambda host, r: failed.setdefault(host, r.failed))
+    assert failed == {"good": False, "bad": True}
+
+    def _boom(host, r):
+        raise ValueError("handler broke")
+
+    with pytest.raises(ValueError):
+        run_streaming(_nornir("good"), _task, _boom)
+
+
+def test_run_streaming_calls_idle_hook_while_waiting():
+    release = threading.Event()
+    idle_calls = []
+
+    def _task(task):
+        release.wait(timeout=5)
+        return Result(host=task.host, result="ok")
+
+    def _on_idle():
+        idle_calls.append(1)
+        release.set()
+
+    run_streaming(_nornir("a"), _task, lambda host, r: None, on_idle=_on_idle, idle_interval=0.01)
+
+    assert idle_calls
+
+
+@pytest.mark.django_db
+def test_run_commands_job_streams_results_from_real_runner(monkeypatch):
+    from django.contrib.auth import get_user_model
+
+    from webnet.customers.models import Customer
+    from webnet.jobs import tasks
+    from webnet.jobs.models import Job, JobLog
+
+    customer = Customer.objects.create(name="Acme")
+    user = get_user_model().objects.create_user(
+        username="alice", password="secret123", role="admin"
+    )
+    job = Job.objects.create(type="run_commands", status="queued", user=user, customer=customer)
+
+    def fake_send_command(task, command_string, timeout=None):
+        return Result(host=task.host, result=f"{task.host.name}: {command_string}")
+
+    nr = _nornir("edge1", "edge2")
+    monkeypatch.setattr(
+        tasks,
+        "build_inventory",
+        lambda targets=None, customer_id=None, device_ids=None: nr.inventory,
+    )
+    monkeypatch.setattr(tasks, "_nr_from_inventory", lambda inv: nr)
+    monkeypatch.setattr(tasks, "netmiko_send_command", fake_send_command)
+
+    tasks.run_commands_job(job.id, {}, ["show version"], timeout=5)
+
+    job.refresh_from_db()
+    assert job.status == "success"
+    messages = set(JobLog.objects.filter(job=job).values_list("host", "message"))
+    assert messages == {("edge1", "edge1: show version"), ("edge2", "edge2: show version")}
+
+
+def test_send_command_batch_runs_hosts_without_barrier_between_commands(monkeypatch):
+    from webnet.jobs import tasks
+
+    fast_done = threading.Event()
+    slow_saw_fast = {}
+
+    def fake_send_command(task, command_string, timeout=None):
+        if task.host.name == "slow" and command_string == "show version":
+            # Only returns once the fast host already finished its whole command list
+            slow_saw_fast["value"] = fast_done.wait(timeout=5)
+        if command_string == "show bad":
+            raise RuntimeError("invalid input")
+        return Result(host=task.host, result=f"{task.host.name}: {command_string}")
+
+    monkeypatch.setattr(tasks, "netmiko_send_command", fake_send_command)
+    outputs = {}
+
+    def _on_result(host, result):
+        outputs[host] = result[0].result
+        if host == "fast":
+            fast_done.set()
+
+    run_streaming(
+        _nornir("fast", "slow"),
+        tasks._send_command_batch,
+        _on_result,
+        commands=["show version", "show bad", "show clock"],
+        timeout=5,
+        keep_results=True,
+    )
+
+    assert slow_saw_fast["value"] is True
+    assert [entry["command"] for entry in outputs["slow"]] == [
+        "show version",
+        "show bad",
+        "show clock",
+    ]
+    assert [entry["failed"] for entry in outputs["fast"]] == [False, True, False]
+    assert outputs["fast"][2]["output"] == "fast: show clock"
+    assert all(entry["duration_ms"] >= 0 for entry in outputs["fast"])
@@ -0,0 +1,117 @@
+"""Tests for the Nornir runner policy layer."""
+
+import threading
+import time
+
+import pytest
+from django.contrib.auth import get_user_model
+from nornir.core import Nornir
+from nornir.core.inventory import Defaults, Groups, Host, Hosts, Inventory
+from nornir.core.task import Result
+
+from webnet.core.models import Region
+from webnet.customers.models import Customer
+from webnet.jobs.models import Job
+from webnet.jobs.runners import (
+    PolicyRunner,
+    RunnerPolicy,
+    interleave_by_site,
+    resolve_runner_policy,
+)
+
+
+def _nornir(runner, **sites):
+    hosts = Hosts({name: Host(name=name, data={"site": site}) for name, site in sites.items()})
+    return Nornir(
+        inventory=Inventory(hosts=hosts, groups=Groups(), defaults=Defaults()), runner=runner
+    )
+
+
+@pytest.fixture
+def job():
+    customer = Customer.objects.create(name="Acme")
+    user = get_user_model().objects.create_user(
+        username="alice", password="secret123", role="admin"
+    )
+    return Job.objects.create(type="config_backup", status="queued", user=user, customer=customer)
+
+
+@pytest.mark.django_db
+def test_resolve_runner_policy_layers_overrides(settings, job):
+    settings.NORNIR_NUM_WORKERS = 10
+    settings.NORNIR_CHUNK_SIZE = 0
+    settings.NORNIR_PER_SITE_LIMIT = 0
+    settings.NORNIR_RUNNER_BY_JOB_TYPE = {"config_backup": {"num_workers": 50, "chunk_size": 500}}
+
+    assert resolve_runner_policy(None) == RunnerPolicy(num_workers=10)
+    assert resolve_runner_policy(job) == RunnerPolicy(num_workers=50, chunk_size=500)
+
+    job.region = Region.objects.create(
+        customer=job.customer,
+        name="EU",
+        identifier="eu-1",
+        worker_pool_config={"nornir": {"per_site_limit": 4, "num_workers": 30}},
+    )
+    job.payload_json = {"runner": {"num_workers": 5, "chunk_size": 0, "bogus": 1}}
+    job.save()
+
+    assert resolve_runner_policy(job) == RunnerPolicy(
+        num_workers=5, chunk_size=None, per_site_limit=4
+    )
+
+
+def test_interleave_by_site_round_robins_hosts():
+    hosts = [
+        Host(name="a1", data={"site": "a"}),
+        Host(name="a2", data={"site": "a"}),
+        Host(name="a3", data={"site": "a"}),
+        Host(name="b1", data={"site": "b"}),
+    ]
+    assert [h.name for h in interleave_by_site(hosts)] == ["a1", "b1", "a2", "a3"]
+
+
+def test_policy_runner_caps_concurrency_per_site():
+    lock = threading.Lock()
+    active: dict[str, int] = {}
+    peak: dict[str, int] = {}
+
+    def _task(task):
+        site = task.host.data["site"]
+        with lock:
+            active[site] = active.get(site, 0) + 1
+            peak[site] = max(peak.get(site, 0), active[site])
+        time.sleep(0.02)
+        with lock:
+            active[site] -= 1
+        return Result(host=task.host, result="ok")
+
+    runner = PolicyRunner(RunnerPolicy(num_workers=8, per_site_limit=2))
+    sites = {f"hq{i}": "hq" for i in range(6)}
+    sites.update({f"br{i}": "branch" for i in range(2)})
+    result = _nornir(runner, **sites).run(_task)
+
+    assert set(result) == set(sites)
+    assert not result.failed
+    assert peak["hq"] == 2
+    assert peak["branch"] <= 2
+
+
+def test_policy_runner_runs_hosts_in_bounded_chunks():
+    lock = threading.Lock()
+    in_flight = {"now": 0, "peak": 0}
+
+    def _task(task):
+        with lock:
+            in_flight["now"] += 1
+            in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+        time.sleep(0.01)
+        with lock:
+            in_flight["now"] -= 1
+        return Result(host=task.host, result=task.host.name)
+
+    runner = PolicyRunner(RunnerPolicy(num_workers=10, chunk_size=3))
+    result = _nornir(runner, **{f"h{i}": None for i in range(7)}).run(_task)
+
+    assert sorted(result) == sorted(f"h{i}" for i in range(7))
+    assert result["h5"][0].result == "h5"
+    assert in_flight["peak"] <= 3
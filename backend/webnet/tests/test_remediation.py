@@ -348,6 +348,268 @@ class TestAutoRemediationTrigger:
             mock_job.delay.assert_not_called()
 
 
+@pytest.mark.django_db
+class TestViolationBatching:
+    """Test aggregated violation handling for whole compliance runs."""
+
+    @pytest.fixture
+    def violations(self, policy, customer, credential):
+        violations = []
+        for i in range(5):
+            device = Device.objects.create(
+                customer=customer,
+                hostname=f"edge-{i}",
+                mgmt_ip=f"192.0.2.{i + 10}",
+                vendor="cisco",
+                platform="ios",
+                credential=credential,
+            )
+            violations.append(
+                ComplianceResult.objects.create(
+                    policy=policy,
+                    device=device,
+                    status="failed",
+                    details_json={"failed_rules": ["ntp"]},
+                )
+            )
+        return violations
+
+    def test_batch_is_digested_and_remediated_within_budget(
+        self, remediation_rule, violations, device, settings
+    ):
+        from webnet.jobs.tasks import _handle_compliance_violations
+
+        settings.REMEDIATION_BATCH_MODE = False
+        settings.REMEDIATION_DISPATCH_CHUNK_SIZE = 2
+        remediation_rule.max_daily_executions = 4
+        remediation_rule.save()
+        RemediationAction.objects.create(
+            rule=remediation_rule,
+            compliance_result=violations[0],
+            device=device,
+            status="success",
+        )
+
+        with (
+            patch("webnet.jobs.tasks.auto_remediation_job") as mock_job,
+            patch("webnet.compliance.violations.notify_digests") as notify,
+        ):
+            _handle_compliance_violations(
+                ComplianceResult.objects.filter(id__in=[v.id for v in violations])
+            )
+
+        (digests,), _ = notify.call_args
+        assert [(d.policy, d.count, d.top_rules()) for d in digests] == [
+            (remediation_rule.policy, 5, [("ntp", 5)])
+        ]
+        mock_job.delay.assert_not_called()
+        pairs, chunk_size = mock_job.chunks.call_args.args
+        assert chunk_size == 2
+        assert len(pairs) == 3
+        assert {rule_id for rule_id, _ in pairs} == {remediation_rule.id}
+        mock_job.chunks.return_value.group.return_value.apply_async.assert_called_once_with()
+
+    def test_daily_limits_are_counted_once_for_all_rules(
+        self, remediation_rule, violations, admin_user, django_assert_max_num_queries
+    ):
+        from webnet.compliance.violations import plan_remediations
+
+        second = RemediationRule.objects.create(
+            policy=remediation_rule.policy,
+            name="Fix banner",
+            config_snippet="banner motd ^Authorized only^",
+            approval_required="auto",
+            max_daily_executions=2,
+            created_by=admin_user,
+        )
+
+        # savepoint, locked rules, aggregated count, release
+        with django_assert_max_num_queries(4):
+            pairs = plan_remediations(violations)
+
+        assert sum(rule_id == remediation_rule.id for rule_id, _ in pairs) == 5
+        assert sum(rule_id == second.id for rule_id, _ in pairs) == 2
+
+
+class _SubResult:
+    def __init__(self, result):
+        self.result = result
+        self.exception = None
+
+
+class _HostResult:
+    def __init__(self, result):
+        self.result = result
+        self.failed = False
+        self.exception = None
+
+
+class _Task:
+    def __init__(self, name):
+        self.host = Mock()
+        self.host.name = name
+
+    def run(self, task, **kwargs):
+        return [_SubResult(task(self, **kwargs))]
+
+
+class _PipelineNornir:
+    """Runs a host-level task per hostname, like Nornir without worker threads."""
+
+    def __init__(self, hostnames):
+        self.hostnames = list(hostnames)
+
+    def run(self, task, **kwargs):
+        return {host: _HostResult(task(_Task(host), **kwargs)) for host in self.hostnames}
+
+
+@pytest.mark.django_db
+class TestBatchRemediation:
+    """Test batched multi-device remediation in canary waves."""
+
+    @pytest.fixture
+    def actions(self, remediation_rule, policy, customer, credential):
+        actions = []
+        for i in range(6):
+            device = Device.objects.create(
+                customer=customer,
+                hostname=f"edge-{i}",
+                mgmt_ip=f"192.0.2.{i + 10}",
+                vendor="cisco",
+                platform="ios",
+                credential=credential,
+            )
+            result = ComplianceResult.objects.create(
+                policy=policy, device=device, status="failed", details_json={}
+            )
+            actions.append(
+                RemediationAction.objects.create(
+                    rule=remediation_rule, compliance_result=result, device=device
+                )
+            )
+        return actions
+
+    @pytest.fixture
+    def network(self, monkeypatch):
+        """Fake devices: configs per host, and hosts whose configure call fails."""
+        from webnet.jobs import tasks
+
+        state = {"configs": {}, "broken": set(), "ignored": set(), "applied": []}
+
+        def fake_get(task, getters):
+            return {"config": {"running": state["configs"].get(task.host.name, "base")}}
+
+        def fake_configure(task, configuration, dry_run, replace):
+            host = task.host.name
+            state["applied"].append((host, replace))
+            if host in state["broken"] and not replace:
+                raise RuntimeError("commit rejected")
+            if host in state["ignored"] and not replace:
+                return
+            state["configs"][host] = configuration if replace else f"base\n{configuration}"
+
+        def fake_inventory(filters=None, customer_id=None, device_ids=None):
+            inventory = Mock()
+            hostnames = Device.objects.filter(id__in=device_ids).values_list("hostname", flat=True)
+            inventory.hosts = {hostname: Mock() for hostname in hostnames}
+            return inventory
+
+        monkeypatch.setattr(tasks, "napalm_get", fake_get)
+        monkeypatch.setattr(tasks, "napalm_configure", fake_configure)
+        monkeypatch.setattr(tasks, "build_inventory", fake_inventory)
+        monkeypatch.setattr(tasks, "_nr_from_inventory", lambda inv: _PipelineNornir(inv.hosts))
+        return state
+
+    def test_violations_of_one_rule_become_one_batch_job(self, remediation_rule, actions):
+        from webnet.jobs.tasks import _queue_remediations
+
+        RemediationAction.objects.all().delete()
+        results = list(ComplianceResult.objects.order_by("id"))
+
+        with (
+            patch("webnet.jobs.tasks.batch_remediation_job") as batch,
+            patch("webnet.jobs.tasks.auto_remediation_job") as single,
+        ):
+            _queue_remediations([(remediation_rule.id, r.id) for r in results])
+
+        single.delay.assert_not_called()
+        pending = list(RemediationAction.objects.filter(status="pending").order_by("id"))
+        assert [a.compliance_result_id for a in pending] == [r.id for r in results]
+        batch.delay.assert_called_once_with(remediation_rule.id, [a.id for a in pending])
+
+    def test_all_waves_run_with_before_and_after_snapshots(
+        self, remediation_rule, actions, network, settings
+    ):
+        from webnet.jobs.tasks import batch_remediation_job
+
+        settings.REMEDIATION_CANARY_SIZE = 1
+        settings.REMEDIATION_WAVE_SIZE = 2
+
+        batch_remediation_job(remediation_rule.id)
+
+        job = Job.objects.get(type="auto_remediation")
+        assert job.status == "success"
+        assert job.result_summary_json["success"] == 6
+        assert len(network["applied"]) == 6
+        for action in RemediationAction.objects.select_related("before_snapshot", "after_snapshot"):
+            assert action.status == "success"
+            assert action.job == job
+            assert action.before_snapshot.config_text == "base"
+            assert action.after_snapshot.config_text.endswith("ntp server 192.0.2.101")
+
+    def test_failed_canary_rolls_back_and_halts_remaining_waves(
+        self, remediation_rule, actions, network, settings
+    ):
+        from webnet.jobs.tasks import batch_remediation_job
+
+        settings.REMEDIATION_CANARY_SIZE = 2
+        settings.REMEDIATION_WAVE_SIZE = 2
+        settings.REMEDIATION_MAX_FAILURE_RATIO = 0.4
+        network["broken"] = {"edge-1"}
+
+        batch_remediation_job(remediation_rule.id, [action.id for action in actions])
+
+        statuses = dict(RemediationAction.objects.values_list("device__hostname", "status"))
+        assert statuses == {
+            "edge-0": "success",
+            "edge-1": "rolled_back",
+            "edge-2": "failed",
+            "edge-3": "failed",
+            "edge-4": "failed",
+            "edge-5": "failed",
+        }
+        assert network["applied"] == [("edge-0", False), ("edge-1", False), ("edge-1", True)]
+        assert network["configs"]["edge-1"] == "base"
+        halted = RemediationAction.objects.get(device__hostname="edge-5")
+        assert halted.error_message.startswith("Halted after wave 1")
+        assert halted.before_snapshot is None
+        job = Job.objects.get(type="auto_remediation")
+        assert job.status == "partial"
+
+    def test_after_snapshots_are_verified_against_the_policy(
+        self, remediation_rule, actions, network, settings
+    ):
+        from webnet.jobs.tasks import batch_remediation_job
+
+        settings.REMEDIATION_MAX_FAILURE_RATIO = 0.5
+        policy = remediation_rule.policy
+        policy.definition_yaml = "rules: [{name: ntp, match: '^ntp server 192.0.2.100$'}]"
+        policy.save()
+        network["ignored"] = {"edge-3"}
+
+        batch_remediation_job(remediation_rule.id)
+
+        verified = dict(
+            RemediationAction.objects.values_list("device__hostname", "verification_passed")
+        )
+        assert verified == {f"edge-{i}": i != 3 for i in range(6)}
+        failed = RemediationAction.objects.get(device__hostname="edge-3")
+        assert failed.status == "rolled_back"
+        assert failed.error_message == "verify failed: rules still failing: ntp"
+        assert failed.after_snapshot.config_text == "base"
+        assert ("edge-3", True) in network["applied"]
+
+
 @pytest.mark.django_db
 class TestAutoRemediationJob:
     """Test auto-remediation job execution."""
@@ -399,8 +661,8 @@ class TestAutoRemediationJob:
         assert action.status == "success"
         assert action.before_snapshot is not None
         assert action.after_snapshot is not None
-        # Verification is not implemented yet, so it should be None
-        assert action.verification_passed is None
+        # The policy has no rules, so the after snapshot verifies
+        assert action.verification_passed is True
 
     @patch("webnet.jobs.tasks._nr_from_inventory")
     @patch("webnet.jobs.tasks.build_inventory")
@@ -454,3 +716,46 @@ class TestAutoRemediationJob:
         assert action.status in ["failed", "rolled_back"]
         assert action.before_snapshot is not None
         assert action.error_message is not None
+
+    @patch("webnet.jobs.tasks._nr_from_inventory")
+    @patch("webnet.jobs.tasks.build_inventory")
+    def test_failed_verification_rolls_back(
+        self, mock_build_inventory, mock_nr, remediation_rule, device, admin_user
+    ):
+        """Test the after snapshot is verified offline and a failure is rolled back."""
+        from webnet.jobs.tasks import auto_remediation_job
+
+        policy = remediation_rule.policy
+        policy.definition_yaml = "rules: [{name: ntp, match: '^ntp server 192.0.2.100$'}]"
+        policy.save()
+        result = ComplianceResult.objects.create(
+            policy=policy, device=device, status="failed", details_json={}
+        )
+        mock_inventory = Mock()
+        mock_inventory.hosts = {"test-router": Mock()}
+        mock_build_inventory.return_value = mock_inventory
+        calls = []
+
+        def mock_run(task, **kwargs):
+            calls.append(kwargs)
+            task_result = Mock()
+            task_result.failed = False
+            # The device accepts the change but its running config never shows it
+            task_result.result = {"config": {"running": "hostname test-router"}}
+            return {"test-router": task_result}
+
+        mock_nr.return_value.run = mock_run
+
+        auto_remediation_job(remediation_rule.id, result.id)
+
+        action = RemediationAction.objects.get(rule=remediation_rule, compliance_result=result)
+        assert action.verification_passed is False
+        assert action.status == "rolled_back"
+        assert action.error_message == "Verification failed: ntp"
+        # before, apply, after, rollback: verification needs no extra device call
+        assert len(calls) == 4
+        assert calls[-1] == {
+            "configuration": "hostname test-router",
+            "dry_run": False,
+            "replace": True,
+        }
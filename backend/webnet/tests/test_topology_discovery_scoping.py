@@ -51,7 +51,11 @@ def test_topology_discovery_scopes_device_lookup(monkeypatch):
 
     job = Job.objects.create(type="topology_discovery", status="queued", user=user, customer=c1)
 
-    monkeypatch.setattr(tasks, "build_inventory", lambda targets, customer_id: _FakeInventory())
+    monkeypatch.setattr(
+        tasks,
+        "build_inventory",
+        lambda targets, customer_id, device_ids=None: _FakeInventory(),
+    )
     monkeypatch.setattr(
         tasks,
         "_nr_from_inventory",
@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-from difflib import unified_diff
 import json
 import logging
 
@@ -9,6 +8,7 @@ from django.db.models import Q, Count
 from django.http import HttpResponseForbidden, HttpResponseBadRequest, HttpResponse
 from django.shortcuts import render, get_object_or_404, redirect
 from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
 from django.views import View
 
 from django import forms
@@ -24,6 +24,7 @@ from webnet.compliance.models import (
     RemediationRule,
     RemediationAction,
 )
+from webnet.config_mgmt import diff_cache
 from webnet.config_mgmt.models import (
     ConfigSnapshot,
     GitRepository,
@@ -671,14 +672,15 @@ class ConfigDiffView(TenantScopedView):
         diff_text = None
         snap_from = snap_to = None
         error = None
+        etag = None
 
         if from_id and to_id:
             try:
-                snap_from = ConfigSnapshot.objects.get(pk=from_id)
+                snap_from = ConfigSnapshot.objects.select_related("device", "blob").get(pk=from_id)
             except ConfigSnapshot.DoesNotExist:
                 error = f"Snapshot {from_id} not found"
             try:
-                snap_to = ConfigSnapshot.objects.get(pk=to_id)
+                snap_to = ConfigSnapshot.objects.select_related("device", "blob").get(pk=to_id)
             except ConfigSnapshot.DoesNotExist:
                 error = f"Snapshot {to_id} not found"
 
@@ -692,22 +694,31 @@ class ConfigDiffView(TenantScopedView):
                 if forbidden:
                     error = "Access denied to one or both snapshots"
                 else:
-                    diff_lines = unified_diff(
-                        (snap_from.config_text or "").splitlines(),
-                        (snap_to.config_text or "").splitlines(),
-                        fromfile=f"snapshot-{snap_from.id}",
-                        tofile=f"snapshot-{snap_to.id}",
-                        lineterm="",
+                    etag = diff_cache.diff_etag(
+                        snap_from,
+                        snap_to,
+                        diff_cache.diff_mode(),
+                        request.user.pk,
+                        bool(request.headers.get("HX-Request")),
                     )
-                    diff_text = "\n".join(diff_lines)
+                    not_modified = get_conditional_response(request, etag=etag)
+                    if not_modified is not None:
+                        return not_modified
+                    diff_text = diff_cache.unified_diff(snap_from, snap_to)
                     if not diff_text:
                         diff_text = "No differences found between snapshots."
 
         context = {"snap_from": snap_from, "snap_to": snap_to, "diff": diff_text, "error": error}
 
         if request.headers.get("HX-Request"):
-            return render(request, self.partial_name, context)
-        return render(request, self.template_name, context)
+            response = render(request, self.partial_name, context)
+        else:
+            response = render(request, self.template_name, context)
+        if etag:
+            response["ETag"] = etag
+            patch_cache_control(response, private=True)
+            patch_vary_headers(response, ["HX-Request"])
+        return response
 
 
 class DriftTimelineView(TenantScopedView):
@@ -797,8 +808,8 @@ class DriftDetailView(TenantScopedView):
         try:
             drift = ConfigDrift.objects.select_related(
                 "device__customer",
-                "snapshot_from",
-                "snapshot_to",
+                "snapshot_from__blob",
+                "snapshot_to__blob",
                 "triggered_by",
             ).get(pk=drift_id)
         except ConfigDrift.DoesNotExist:
@@ -814,14 +825,7 @@ class DriftDetailView(TenantScopedView):
             return forbidden
 
         # Generate diff with highlighting
-        diff_lines = unified_diff(
-            drift.snapshot_from.config_text.splitlines(),
-            drift.snapshot_to.config_text.splitlines(),
-            fromfile=f"snapshot-{drift.snapshot_from_id}",
-            tofile=f"snapshot-{drift.snapshot_to_id}",
-            lineterm="",
-        )
-        diff_text = "\n".join(diff_lines)
+        diff_text = diff_cache.unified_diff(drift.snapshot_from, drift.snapshot_to)
 
         context = {
             "drift": drift,